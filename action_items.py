@@ -0,0 +1,280 @@
+"""Structured action items parsed from meeting notes.
+
+Whenever a meeting is saved (or imported), its free-text action_items field
+is split into items and written to the action_items table in the same
+transaction, one row per item with its owner, description, due date, done
+flag and source meeting. Items are separated by semicolons or new lines and
+may carry:
+
+- a checkbox: "[ ] ..." or "[x] ..." (done);
+- an owner: "@Sarah ...", "Sarah Johnson: ...", or "... (Sarah)". A first
+  name is expanded to the team member's full name when it is unambiguous;
+  prefixes and suffixes are only read as owners when they name a member;
+- a due date: "by 2025-04-05", "due 4/5" (month/day in the meeting's year).
+
+Re-saving a meeting keeps the done flag and task link of items whose text
+did not change, and items stay when their meeting is archived. The table is
+indexed on (owner, done, due_date), so "what am I on the hook for" is an
+index lookup instead of a scan of every meeting. Items can be promoted to
+tasks in one transaction; when the task is later marked Done, a trigger
+marks its item done too.
+
+    python action_items.py --db masterflo_dashboard.db --owner "Sarah Johnson"
+"""
+import argparse
+import re
+import sqlite3
+from datetime import date, datetime
+
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+
+ITEM_SEPARATOR = re.compile(r"[;\n]+")
+BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+CHECKBOX = re.compile(r"^\[([ xX])\]\s*")
+NAME = r"[A-Z][\w'-]*(?: [A-Z][\w'-]*)?"
+OWNER_PREFIX = re.compile(rf"^({NAME})\s*:\s+")
+OWNER_MENTION = re.compile(r"(?:^|\s)@([A-Za-z][\w'-]*)(?:[ .]([A-Z][\w'-]*))?")
+OWNER_SUFFIX = re.compile(rf"\s*[(\[]\s*({NAME})\s*[)\]]\s*$")
+DUE_DATE = re.compile(r"[\s,(]*\b(?:by|due(?:\s+(?:by|on))?:?)\s+(\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?)\)?",
+                      re.IGNORECASE)
+
+def create_action_items(conn):
+    """Create action_items, its indexes and the trigger closing items whose task is done"""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'action_items'").fetchone()
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS action_items (
+        id INTEGER PRIMARY KEY,
+        meeting_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        owner TEXT,
+        description TEXT NOT NULL,
+        due_date TEXT,
+        done INTEGER NOT NULL DEFAULT 0,
+        task_id INTEGER,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_owner_done ON action_items (owner, done, due_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_done ON action_items (done, due_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_meeting ON action_items (meeting_id, position)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_action_items_task ON action_items (task_id) WHERE task_id IS NOT NULL")
+
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_action_items_done
+    AFTER UPDATE OF status ON tasks
+    WHEN NEW.status = 'Done' AND OLD.status IS NOT 'Done'
+    BEGIN
+        UPDATE action_items SET done = 1 WHERE task_id = NEW.id AND done = 0;
+    END
+    ''')
+
+    if not exists:
+        sync_all_meetings(conn)
+
+def member_lookup(conn):
+    """Map lowercased full names, and first names shared by no one else, to full names"""
+    names = [row[0] for row in conn.execute("SELECT name FROM team_directory WHERE name IS NOT NULL")]
+    lookup = {name.lower(): name for name in names}
+    first_names = pd.Series([name.split()[0].lower() for name in names], dtype=object)
+    for first, name in zip(first_names, names):
+        if (first_names == first).sum() == 1:
+            lookup.setdefault(first, name)
+    return lookup
+
+def parse_due_date(text, meeting_date=None):
+    """An ISO or month/day[/year] date as YYYY-MM-DD, or None if it isn't a valid date"""
+    try:
+        if "-" in text:
+            return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+        parts = [int(part) for part in text.split("/")]
+        year = parts[2] if len(parts) == 3 else pd.Timestamp(meeting_date or date.today()).year
+        return date(year + 2000 if year < 100 else year, parts[0], parts[1]).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+def parse_action_items(text, meeting_date=None, members=None):
+    """Split an action items blob into [{"owner", "description", "due_date", "done"}]"""
+    members = members or {}
+    items = []
+    for raw in ITEM_SEPARATOR.split(text or ""):
+        item = BULLET.sub("", raw.strip())
+        done = False
+        checkbox = CHECKBOX.match(item)
+        if checkbox:
+            done = checkbox.group(1).lower() == "x"
+            item = item[checkbox.end():]
+
+        due_date = None
+        due = DUE_DATE.search(item)
+        if due:
+            due_date = parse_due_date(due.group(1), meeting_date)
+            item = (item[:due.start()] + item[due.end():]).strip()
+
+        owner = None
+        mention = OWNER_MENTION.search(item)
+        prefix = OWNER_PREFIX.match(item)
+        suffix = OWNER_SUFFIX.search(item)
+        if mention:
+            # "@Sarah Johnson" only when that's a member; otherwise the next word is the item's
+            full_name = f"{mention.group(1)} {mention.group(2)}"
+            if mention.group(2) and full_name.lower() in members:
+                owner, end = members[full_name.lower()], mention.end()
+            else:
+                owner, end = members.get(mention.group(1).lower(), mention.group(1)), mention.end(1)
+            item = (item[:mention.start()] + item[end:]).strip()
+        elif prefix and prefix.group(1).lower() in members:
+            owner = members[prefix.group(1).lower()]
+            item = item[prefix.end():]
+        elif suffix and suffix.group(1).lower() in members:
+            owner = members[suffix.group(1).lower()]
+            item = item[:suffix.start()]
+
+        description = item.strip(" \t-:,.")
+        if description:
+            items.append({"owner": owner, "description": description, "due_date": due_date, "done": done})
+    return items
+
+def sync_meeting(conn, meeting_id, text, meeting_date=None, members=None):
+    """Replace one meeting's action items with those parsed from its text.
+
+    Runs inside the caller's transaction. Items whose owner and description
+    are unchanged keep their row, done flag and task link.
+    """
+    if members is None:
+        members = member_lookup(conn)
+    parsed = parse_action_items(text, meeting_date, members)
+
+    existing = {}
+    for item_id, owner, description in conn.execute(
+            "SELECT id, owner, description FROM action_items WHERE meeting_id = ?", (meeting_id,)):
+        existing.setdefault((owner, description), item_id)
+
+    kept, added = [], []
+    for position, item in enumerate(parsed):
+        item_id = existing.pop((item["owner"], item["description"]), None)
+        if item_id is None:
+            added.append((meeting_id, position, item["owner"], item["description"], item["due_date"], int(item["done"])))
+        else:
+            kept.append((position, item["due_date"], int(item["done"]), item_id))
+
+    conn.executemany("DELETE FROM action_items WHERE id = ?", [(item_id,) for item_id in existing.values()])
+    conn.executemany('''
+    UPDATE action_items SET position = ?, due_date = ?, done = MAX(done, ?)
+    WHERE id = ?
+    ''', kept)
+    conn.executemany('''
+    INSERT INTO action_items (meeting_id, position, owner, description, due_date, done)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', added)
+    return len(parsed)
+
+def sync_all_meetings(conn):
+    """Re-parse every meeting's action items (inside the caller's transaction)"""
+    members = member_lookup(conn)
+    meetings = conn.execute("SELECT id, action_items, date FROM meeting_notes").fetchall()
+    return sum(sync_meeting(conn, meeting_id, text, meeting_date, members)
+               for meeting_id, text, meeting_date in meetings)
+
+def resync(db_path=DB_PATH):
+    """Re-parse every meeting in one transaction; returns the number of items"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        count = sync_all_meetings(conn)
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_action_items(db_path=DB_PATH, owner=None, include_done=False):
+    """Action items with their source meeting, soonest due first.
+
+    owner=None returns everyone's items; owner="" returns items with no owner.
+    """
+    conditions, params = [], []
+    if owner is not None:
+        conditions.append("a.owner IS ?")
+        params.append(owner or None)
+    if not include_done:
+        conditions.append("a.done = 0")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f'''
+    SELECT a.id, a.owner, a.description, a.due_date, a.done, a.task_id,
+           a.meeting_id, m.title AS meeting_title, m.date AS meeting_date
+    FROM action_items a
+    LEFT JOIN meeting_notes m ON m.id = a.meeting_id
+    {where}
+    ORDER BY a.due_date IS NULL, a.due_date, a.meeting_id DESC, a.position
+    ''', conn, params=params)
+    conn.close()
+    return df
+
+def get_owners(db_path=DB_PATH):
+    """Everyone with at least one open action item"""
+    conn = sqlite3.connect(db_path)
+    owners = [row[0] for row in conn.execute(
+        "SELECT DISTINCT owner FROM action_items WHERE owner IS NOT NULL AND done = 0 ORDER BY owner")]
+    conn.close()
+    return owners
+
+def set_done(item_ids, done=True, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE action_items SET done = ? WHERE id = ?", [(int(done), int(i)) for i in item_ids])
+    conn.commit()
+    conn.close()
+
+def promote_to_tasks(item_ids, related_client="Internal", priority="Medium", task_type="Internal",
+                     estimated_hours=1.0, db_path=DB_PATH):
+    """Create one To Do task per action item in one transaction and link them.
+
+    Items that were already promoted are skipped. Returns the number of tasks created.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        items = conn.execute(f'''
+        SELECT a.id, a.owner, a.description, a.due_date, m.title
+        FROM action_items a
+        LEFT JOIN meeting_notes m ON m.id = a.meeting_id
+        WHERE a.task_id IS NULL AND a.id IN ({','.join('?' * len(item_ids))})
+        ''', [int(i) for i in item_ids]).fetchall()
+
+        for item_id, owner, description, due_date, meeting_title in items:
+            task_id = conn.execute('''
+            INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority,
+                              task_type, estimated_hours, notes)
+            VALUES (?, ?, ?, ?, 'To Do', ?, ?, ?, ?)
+            ''', (description, related_client, owner, due_date, priority, task_type, estimated_hours,
+                  f"Action item from meeting: {meeting_title}" if meeting_title else "Action item")).lastrowid
+            conn.execute("UPDATE action_items SET task_id = ? WHERE id = ?", (task_id, item_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return len(items)
+
+def main():
+    parser = argparse.ArgumentParser(description="List action items parsed from meeting notes.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--owner", help="Only this person's items")
+    parser.add_argument("--all", action="store_true", help="Include done items")
+    parser.add_argument("--resync", action="store_true", help="Re-parse every meeting first")
+    args = parser.parse_args()
+
+    if args.resync:
+        print(f"Parsed {resync(args.db)} action item(s)")
+    print(get_action_items(args.db, args.owner, args.all).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Analytical reporting engine for campaign and revenue data.
+
+Report queries (ROAS by manager by month, spend vs. budget, dashboard
+totals) are aggregate scans that row-oriented SQLite handles poorly as
+campaign history grows. When DuckDB is installed (`pip install duckdb`),
+each database gets an in-memory columnar mirror of the tables a report
+reads, and report queries run there. A mirrored table is reloaded only when
+its version in the table_versions table changes.
+
+Without DuckDB, or if DuckDB fails on a query, the same SQL runs directly
+against SQLite, so every report is written in the SQL subset both engines
+share.
+
+Set MASTERFLO_ANALYTICS_ENGINE=sqlite to force the fallback.
+"""
+import logging
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+ANALYTICS_ENGINE = os.environ.get("MASTERFLO_ANALYTICS_ENGINE", "auto")
+
+logger = logging.getLogger(__name__)
+
+# Reports. Each entry is (SQL, tables the query reads).
+REPORTS = {
+    "campaign_totals": ('''
+    SELECT COUNT(*) AS campaigns,
+           COALESCE(SUM(meta_ads_spend), 0) AS meta_ads_spend,
+           COALESCE(SUM(google_ads_spend), 0) AS google_ads_spend,
+           COALESCE(SUM(meta_ads_leads), 0) AS meta_ads_leads,
+           COALESCE(SUM(google_ads_leads), 0) AS google_ads_leads
+    FROM campaigns
+    ''', ("campaigns",)),
+
+    "roas_by_manager_month": ('''
+    SELECT campaign_manager, month, spend, revenue, leads,
+           revenue / NULLIF(spend, 0) AS roas,
+           spend / NULLIF(leads, 0) AS cost_per_lead
+    FROM (
+        SELECT campaign_manager,
+               substr(last_review_date, 1, 7) AS month,
+               SUM(COALESCE(meta_ads_spend, 0) + COALESCE(google_ads_spend, 0)) AS spend,
+               SUM(COALESCE(meta_ads_spend, 0) * COALESCE(meta_ads_roas, 0)
+                   + COALESCE(google_ads_spend, 0) * COALESCE(google_ads_roas, 0)) AS revenue,
+               SUM(COALESCE(meta_ads_leads, 0) + COALESCE(google_ads_leads, 0)) AS leads
+        FROM campaigns
+        WHERE last_review_date IS NOT NULL
+        GROUP BY campaign_manager, substr(last_review_date, 1, 7)
+    ) AS monthly
+    ORDER BY month, campaign_manager
+    ''', ("campaigns",)),
+
+    "spend_vs_budget": ('''
+    SELECT client_name, assigned_team, billing_status, monthly_budget, ad_spend,
+           ad_spend / NULLIF(monthly_budget, 0) AS budget_used
+    FROM (
+        SELECT cl.name AS client_name,
+               cl.assigned_team,
+               cl.billing_status,
+               COALESCE(cl.monthly_budget, 0) AS monthly_budget,
+               COALESCE(SUM(COALESCE(ca.meta_ads_spend, 0) + COALESCE(ca.google_ads_spend, 0)), 0) AS ad_spend
+        FROM clients cl
+        LEFT JOIN campaigns ca ON ca.client_name = cl.name
+        GROUP BY cl.id, cl.name, cl.assigned_team, cl.billing_status, cl.monthly_budget
+    ) AS per_client
+    ORDER BY budget_used DESC
+    ''', ("clients", "campaigns")),
+}
+
+def duckdb_available():
+    return duckdb is not None and ANALYTICS_ENGINE != "sqlite"
+
+def duckdb_type(declared_type):
+    """DuckDB column type for a SQLite declared type, by SQLite's affinity rules (untyped columns as text)"""
+    declared = declared_type.upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if any(word in declared for word in ("CHAR", "CLOB", "TEXT")) or not declared:
+        return "VARCHAR"
+    if "BLOB" in declared:
+        return "BLOB"
+    return "DOUBLE"
+
+def mirror_columns(conn, table):
+    """(name, DuckDB type) of every column of a SQLite table, generated ones included"""
+    return [(row[1], duckdb_type(row[2])) for row in conn.execute(f"PRAGMA table_xinfo({table})")]
+
+class ColumnarMirror:
+    """In-memory DuckDB copy of one SQLite database, refreshed per table version"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.con = duckdb.connect(":memory:")
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self, tables):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("BEGIN")
+            versions = dict(conn.execute("SELECT table_name, version FROM table_versions").fetchall())
+            stale = [t for t in tables if t not in self._versions or self._versions[t] != versions.get(t)]
+
+            for table in stale:
+                columns = mirror_columns(conn, table)
+                names = ", ".join(name for name, _ in columns)
+                frame = pd.read_sql_query(f"SELECT {names} FROM {table}", conn)
+                # Create the table from the declared types rather than letting
+                # DuckDB guess them from the frame, which fails on empty and
+                # all-NULL columns
+                self.con.execute(f"CREATE OR REPLACE TABLE {table} ({', '.join(f'{name} {type_}' for name, type_ in columns)})")
+                self.con.register("mirror_source", frame)
+                self.con.execute(f"INSERT INTO {table} SELECT {names} FROM mirror_source")
+                self.con.unregister("mirror_source")
+                self._versions[table] = versions.get(table)
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def query(self, sql, params=(), tables=()):
+        with self._lock:
+            self._refresh(tables)
+            cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, list(params)).fetchdf()
+        finally:
+            cursor.close()
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+def get_mirror(db_path):
+    """Process-wide columnar mirror for a database file"""
+    with _mirrors_lock:
+        if db_path not in _mirrors:
+            _mirrors[db_path] = ColumnarMirror(db_path)
+        return _mirrors[db_path]
+
+def query_sqlite(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+    return df
+
+def run_query(db_path, sql, params=(), tables=()):
+    """Run an analytical query, returning (DataFrame, engine name).
+
+    `tables` lists the tables the query reads so the columnar mirror can
+    refresh just those before running it.
+    """
+    if duckdb_available():
+        try:
+            return get_mirror(db_path).query(sql, params, tables), "duckdb"
+        except duckdb.Error as e:
+            logger.warning("Analytics engine failed, falling back to SQLite: %s", e)
+
+    return query_sqlite(db_path, sql, params), "sqlite"
+
+def run_report(db_path, name, params=()):
+    """Run one of the named REPORTS"""
+    sql, tables = REPORTS[name]
+    return run_query(db_path, sql, params, tables)
@@ -0,0 +1,248 @@
+"""Campaign anomaly detection for the MasterFLO.ai dashboard.
+
+Every change to a campaign's spend, ROAS or leads is recorded in
+campaign_metrics_history (see init_db in app.py). This module scans that
+history with per-campaign rolling statistics and flags:
+
+- CPL spikes: cost per lead well above the campaign's recent average;
+- ROAS collapses: return on ad spend well below its recent average;
+- lead droughts: consecutive snapshots with spend but no leads on a
+  campaign that normally produces them.
+
+Alerts go to the campaign_alerts table, which the dashboard lists. The scan
+is incremental: the only state kept between runs is the id of the last
+history row processed, and each run loads the new rows plus a short window
+of older rows per changed campaign to seed the rolling baselines.
+
+Run it from cron (or any scheduler) with:
+
+    python anomalies.py --db masterflo_dashboard.db
+"""
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+
+# Snapshots in the rolling baseline, and how many are needed before flagging
+ROLLING_WINDOW = 6
+MIN_BASELINE_SNAPSHOTS = 3
+
+# A snapshot is flagged when it is this far from the baseline mean...
+CPL_SPIKE_RATIO = 1.5
+ROAS_COLLAPSE_RATIO = 0.5
+# ...and more than this many standard deviations away (when the baseline varies)
+MIN_Z_SCORE = 2.0
+
+# A lead drought is this many snapshots in a row with spend but no leads,
+# on a campaign that averaged at least MIN_BASELINE_LEADS
+DROUGHT_SNAPSHOTS = 2
+MIN_BASELINE_LEADS = 3
+
+ALERT_TYPES = ("CPL Spike", "ROAS Collapse", "Lead Drought")
+
+STATE_NAME = "campaign_metrics"
+
+HISTORY_SQL = '''
+WITH changed AS (
+    SELECT DISTINCT campaign_id FROM campaign_metrics_history WHERE id > :after
+),
+context AS (
+    SELECT h.id, h.campaign_id, h.recorded_at, h.spend, h.revenue, h.leads,
+           ROW_NUMBER() OVER (PARTITION BY h.campaign_id ORDER BY h.id DESC) AS rn
+    FROM campaign_metrics_history h
+    JOIN changed ON changed.campaign_id = h.campaign_id
+    WHERE h.id <= :after
+)
+SELECT id, campaign_id, recorded_at, spend, revenue, leads FROM context WHERE rn <= :context
+UNION ALL
+SELECT id, campaign_id, recorded_at, spend, revenue, leads
+FROM campaign_metrics_history
+WHERE id > :after
+'''
+
+def get_watermark(conn):
+    row = conn.execute("SELECT last_history_id FROM anomaly_scan_state WHERE name = ?",
+                       (STATE_NAME,)).fetchone()
+    return row[0] if row else 0
+
+def load_history(conn, after_id):
+    """New history rows, plus the rows before them needed for rolling baselines"""
+    context = ROLLING_WINDOW + DROUGHT_SNAPSHOTS
+    history = pd.read_sql_query(HISTORY_SQL, conn, params={"after": after_id, "context": context})
+    return history.sort_values(["campaign_id", "id"], ignore_index=True)
+
+def _rolling_baseline(history, column):
+    """Mean and std of the previous ROLLING_WINDOW snapshots of each campaign"""
+    previous = history.groupby("campaign_id")[column].shift()
+    rolling = previous.groupby(history["campaign_id"]).rolling(ROLLING_WINDOW, min_periods=MIN_BASELINE_SNAPSHOTS)
+    mean = rolling.mean().reset_index(level=0, drop=True)
+    std = rolling.std().reset_index(level=0, drop=True)
+    return mean, std
+
+def _beyond_z(value, mean, std, direction):
+    """True where value is MIN_Z_SCORE std devs past the mean (or the baseline is flat)"""
+    z = direction * (value - mean) / std.replace(0, np.nan)
+    return z.gt(MIN_Z_SCORE) | std.fillna(0).eq(0)
+
+def detect_anomalies(history, after_id=0):
+    """Return (alerts, latest_flags) for the history rows with id > after_id.
+
+    `history` holds campaign_id, id, spend, revenue and leads, sorted by
+    campaign_id and id; older rows only serve as baseline. `alerts` has one
+    row per anomaly, `latest_flags` which alert types hold on each
+    campaign's latest snapshot.
+    """
+    spend = history["spend"].fillna(0)
+    leads = history["leads"].fillna(0)
+    history = history.assign(
+        cpl=(spend / leads.replace(0, np.nan)),
+        roas=(history["revenue"].fillna(0) / spend.replace(0, np.nan)),
+        leads=leads,
+        spend=spend,
+    )
+
+    cpl_mean, cpl_std = _rolling_baseline(history, "cpl")
+    roas_mean, roas_std = _rolling_baseline(history, "roas")
+    leads_mean, _ = _rolling_baseline(history, "leads")
+
+    cpl_spike = (history["cpl"] > cpl_mean * CPL_SPIKE_RATIO) & _beyond_z(history["cpl"], cpl_mean, cpl_std, 1)
+    roas_collapse = ((history["roas"] < roas_mean * ROAS_COLLAPSE_RATIO)
+                     & _beyond_z(history["roas"], roas_mean, roas_std, -1))
+
+    # Length of the current run of snapshots with spend but no leads
+    dry = history["spend"].gt(0) & history["leads"].eq(0)
+    run_id = (~dry).groupby(history["campaign_id"]).cumsum()
+    dry_run = dry.groupby([history["campaign_id"], run_id]).cumsum()
+    drought_baseline = leads_mean.groupby(history["campaign_id"]).shift(DROUGHT_SNAPSHOTS - 1)
+    # Alert when a drought reaches DROUGHT_SNAPSHOTS; it stays open while the run lasts
+    lead_drought = dry_run.eq(DROUGHT_SNAPSHOTS) & drought_baseline.ge(MIN_BASELINE_LEADS)
+    in_drought = dry_run.ge(DROUGHT_SNAPSHOTS)
+
+    flagged = []
+    for alert_type, mask, value, baseline, label in (
+        ("CPL Spike", cpl_spike, history["cpl"], cpl_mean, "Cost per lead ${value:,.2f} vs ${baseline:,.2f} average"),
+        ("ROAS Collapse", roas_collapse, history["roas"], roas_mean, "ROAS {value:.2f}x vs {baseline:.2f}x average"),
+        ("Lead Drought", lead_drought, dry_run.astype(float), drought_baseline,
+         "{value:.0f} updates with spend and no leads (averaged {baseline:.1f})"),
+    ):
+        mask = mask & history["id"].gt(after_id)
+        if not mask.any():
+            continue
+        hits = pd.DataFrame({
+            "campaign_id": history.loc[mask, "campaign_id"],
+            "history_id": history.loc[mask, "id"],
+            "alert_type": alert_type,
+            "metric_value": value[mask],
+            "baseline": baseline[mask],
+        })
+        hits["message"] = [label.format(value=v, baseline=b)
+                           for v, b in zip(hits["metric_value"], hits["baseline"])]
+        flagged.append(hits)
+
+    columns = ["campaign_id", "history_id", "alert_type", "metric_value", "baseline", "message"]
+    alerts = pd.concat(flagged, ignore_index=True) if flagged else pd.DataFrame(columns=columns)
+
+    # Latest state per campaign, used to resolve alerts that have cleared
+    latest = history.groupby("campaign_id").tail(1).index
+    latest_flags = pd.DataFrame({
+        "campaign_id": history.loc[latest, "campaign_id"],
+        "CPL Spike": cpl_spike[latest],
+        "ROAS Collapse": roas_collapse[latest],
+        "Lead Drought": in_drought[latest],
+    })
+
+    return alerts[columns], latest_flags
+
+def run_scan(db_path=DB_PATH, full=False):
+    """Scan history added since the last run and record alerts.
+
+    Returns {"snapshots": rows scanned, "alerts": new alerts, "resolved": alerts cleared}.
+    With full=True the whole history is rescanned (existing alerts are kept).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        after_id = 0 if full else get_watermark(conn)
+        history = load_history(conn, after_id)
+        new_rows = history["id"].gt(after_id)
+
+        if not new_rows.any():
+            conn.commit()
+            return {"snapshots": 0, "alerts": 0, "resolved": 0}
+
+        alerts, latest_flags = detect_anomalies(history, after_id)
+
+        before = conn.total_changes
+        conn.executemany('''
+        INSERT OR IGNORE INTO campaign_alerts
+            (campaign_id, client_name, alert_type, metric_value, baseline, message, history_id)
+        SELECT ?, client_name, ?, ?, ?, ?, ? FROM campaigns
+        WHERE id = ? AND NOT EXISTS (
+            SELECT 1 FROM campaign_alerts
+            WHERE resolved = 0 AND campaign_id = ? AND alert_type = ?
+        )
+        ''', [(int(row.campaign_id), row.alert_type, float(row.metric_value), float(row.baseline),
+               row.message, int(row.history_id), int(row.campaign_id), int(row.campaign_id), row.alert_type)
+              for row in alerts.itertuples(index=False)])
+        created = conn.total_changes - before
+
+        # Close open alerts whose condition no longer holds on the latest snapshot
+        cleared = [(int(campaign_id), alert_type)
+                   for alert_type in ALERT_TYPES
+                   for campaign_id in latest_flags.loc[~latest_flags[alert_type], "campaign_id"]]
+        before = conn.total_changes
+        conn.executemany('''
+        UPDATE campaign_alerts SET resolved = 1
+        WHERE resolved = 0 AND campaign_id = ? AND alert_type = ?
+        ''', cleared)
+        resolved = conn.total_changes - before
+
+        conn.execute('''
+        INSERT INTO anomaly_scan_state (name, last_history_id, scanned_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(name) DO UPDATE SET last_history_id = excluded.last_history_id,
+                                        scanned_at = excluded.scanned_at
+        ''', (STATE_NAME, int(history["id"].max())))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {"snapshots": int(new_rows.sum()), "alerts": created, "resolved": resolved}
+
+def get_open_alerts(db_path=DB_PATH):
+    """Unresolved alerts, newest first"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query('''
+    SELECT id, campaign_id, client_name, alert_type, message, detected_at
+    FROM campaign_alerts
+    WHERE resolved = 0
+    ORDER BY detected_at DESC, id DESC
+    ''', conn)
+    conn.close()
+    return df
+
+def resolve_alerts(alert_ids, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE campaign_alerts SET resolved = 1 WHERE id = ?", [(int(i),) for i in alert_ids])
+    conn.commit()
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag campaign CPL spikes, ROAS collapses and lead droughts.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--full", action="store_true", help="Rescan the whole history, not just new snapshots")
+    args = parser.parse_args()
+
+    result = run_scan(args.db, full=args.full)
+    print(f"Scanned {result['snapshots']} snapshot(s): {result['alerts']} new alert(s), "
+          f"{result['resolved']} resolved")
+
+if __name__ == "__main__":
+    main()
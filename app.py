@@ -1,12 +1,42 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
-import sqlite3
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import threading
 import os
 
+import anomalies
+import archive
+import assignment
+import audit
+import backup
+import database
+import forecast
+import linkcheck
+import team_search
+import tenants
+import workload
+from database import (
+    DATE_FORMAT, LEADS_CHART_TOP_N, AT_RISK_HOURS_PER_DAY, AT_RISK_HORIZON_DAYS,
+    TASK_STATUSES, TASK_PRIORITIES, GHL_STATUSES, CLIENT_CAMPAIGN_STATUSES, BILLING_STATUSES,
+    get_db_path, init_db, get_snapshot_store, format_date, format_date_columns,
+    get_memory_report, get_clients, get_tasks, get_campaigns, get_sop_list, get_team_directory,
+    get_meeting_list, get_record_body, get_quick_links, get_archived_tasks, get_archived_meeting_notes,
+    get_leads_by_client, get_other_clients_leads, get_task_deadline_counts, get_upcoming_tasks,
+    get_campaign_alerts, get_last_anomaly_scan, get_link_checks, get_record_history, get_report,
+    get_action_items, get_action_item_owners, set_action_items_done, promote_action_items,
+    add_client, update_client, delete_client, add_task, update_task, delete_task,
+    add_campaign, update_campaign, delete_campaign,
+    bulk_patch, set_task_status, set_task_priority, set_campaign_ghl_status,
+    FIELD_CHOICES, to_grid_frame, diff_grid, validate_grid_changes, save_grid_changes,
+    save_sop, save_team_member, save_meeting, save_quick_link,
+)
+
 # Set page configuration
 st.set_page_config(
     page_title="MasterFLO.ai Dashboard",
@@ -15,453 +45,310 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Database setup
-DB_PATH = "masterflo_dashboard.db"
+# Route every data access to the agency selected in this session
+def session_tenant():
+    return st.session_state.get("current_tenant")
+
+tenants.set_tenant_resolver(session_tenant)
+
+def authorized_tenants(router):
+    """Agencies this session may open: those without an access code, plus
+    those whose code has been entered in the sidebar"""
+    unlocked = st.session_state.setdefault("unlocked_tenants", [])
+    if len(router.open_tenants()) < len(router.tenants):
+        code = st.sidebar.text_input("Agency access code", type="password", key="access_code")
+        if code:
+            matches = router.tenants_for_code(code)
+            if not matches:
+                st.sidebar.error("Unknown access code")
+            unlocked.extend(tenant for tenant in matches if tenant not in unlocked)
+    
+    open_tenants = router.open_tenants()
+    return [tenant for tenant in router.tenants if tenant in open_tenants or tenant in unlocked]
+
+# Process-wide jobs and cached reports
+@st.cache_resource
+def migrate_all_shards():
+    """Bring every agency's shard up to the current schema once per process"""
+    database.migrate_all_shards()
+    return True
 
-def init_db():
-    """Initialize the database with tables if they don't exist"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Create Clients table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS clients (
-        id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        services TEXT,
-        start_date TEXT,
-        campaign_status TEXT,
-        assigned_team TEXT,
-        contract_end_date TEXT,
-        billing_status TEXT,
-        monthly_budget REAL,
-        notes TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Tasks table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS tasks (
-        id INTEGER PRIMARY KEY,
-        title TEXT NOT NULL,
-        related_client TEXT,
-        assigned_to TEXT,
-        due_date TEXT,
-        status TEXT,
-        priority TEXT,
-        task_type TEXT,
-        estimated_hours REAL,
-        actual_hours REAL,
-        notes TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Campaigns table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS campaigns (
-        id INTEGER PRIMARY KEY,
-        client_name TEXT NOT NULL,
-        campaign_manager TEXT,
-        last_review_date TEXT,
-        next_review_date TEXT,
-        meta_ads_spend REAL,
-        meta_ads_roas REAL,
-        meta_ads_leads INTEGER,
-        meta_ads_notes TEXT,
-        google_ads_spend REAL,
-        google_ads_roas REAL,
-        google_ads_leads INTEGER,
-        google_ads_notes TEXT,
-        ghl_status TEXT,
-        landing_page_url TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Operations table for SOPs
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS sops (
-        id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        category TEXT,
-        content TEXT,
-        last_updated TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Team Directory table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS team_directory (
-        id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        role TEXT,
-        email TEXT,
-        phone TEXT,
-        department TEXT,
-        skills TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Meeting Notes table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS meeting_notes (
-        id INTEGER PRIMARY KEY,
-        title TEXT NOT NULL,
-        date TEXT,
-        attendees TEXT,
-        meeting_type TEXT,
-        notes TEXT,
-        action_items TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create Quick Links table
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS quick_links (
-        id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        category TEXT,
-        url TEXT,
-        description TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    conn.commit()
-    
-    # Check if we need to insert sample data (only if tables are empty)
-    c.execute("SELECT COUNT(*) FROM clients")
-    if c.fetchone()[0] == 0:
-        insert_sample_data(conn)
-    
-    conn.close()
+@st.cache_resource
+def init_database(db_path, seed=True):
+    """Create or upgrade a database once per process instead of on every rerun"""
+    init_db(db_path, seed=seed)
+    return True
 
-def insert_sample_data(conn):
-    """Insert sample data for a martial arts marketing agency"""
-    c = conn.cursor()
-    
-    # Sample Clients
-    clients = [
-        ("Dragon Martial Arts Academy", "Meta Ads, Google Ads, GHL", "2025-01-15", "Active", "John Smith", 
-         "2026-01-15", "Current", 1500, "Client recently expanded to second location. Need to update ad targeting."),
-        ("Elite Taekwondo Center", "Meta Ads, SEO", "2025-02-01", "Needs Attention", "Sarah Johnson", 
-         "2026-02-01", "Current", 1200, "Website traffic dropping. Need to review SEO strategy."),
-        ("Warrior Jiu-Jitsu", "Google Ads, Web", "2024-12-01", "Active", "Michael Brown", 
-         "2025-12-01", "Current", 1000, "New landing page performing well. Consider upselling Meta Ads."),
-        ("Master Kim's Karate", "Meta Ads, GHL", "2025-03-01", "Paused", "Sarah Johnson", 
-         "2026-03-01", "Overdue", 800, "Client requested pause due to renovation. Follow up on 4/15."),
-        ("Victory MMA & Fitness", "Meta Ads, Google Ads, SEO, Web, GHL", "2024-11-15", "Active", "John Smith", 
-         "2025-11-15", "Current", 2500, "Our highest-value client. Monthly strategy call scheduled for 4/5.")
-    ]
-    
-    c.executemany('''
-    INSERT INTO clients (name, services, start_date, campaign_status, assigned_team, 
-                        contract_end_date, billing_status, monthly_budget, notes)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', clients)
-    
-    # Sample Tasks
-    tasks = [
-        ("Create April Ad Creative for Elite Taekwondo", "Elite Taekwondo Center", "Michael Brown", 
-         "2025-04-01", "To Do", "High", "Ad Creation", 3, None, "Focus on summer camp promotion"),
-        ("Optimize Google Ads Campaign for Dragon Martial Arts", "Dragon Martial Arts Academy", "John Smith", 
-         "2025-03-28", "In Progress", "Medium", "Ad Creation", 2, 1.5, "Targeting new location, adjust geographic settings"),
-        ("Monthly Performance Report - Victory MMA", "Victory MMA & Fitness", "Sarah Johnson", 
-         "2025-04-05", "To Do", "Medium", "Reporting", 2, None, "Include comparison to previous quarter"),
-        ("Update Landing Page for Warrior Jiu-Jitsu", "Warrior Jiu-Jitsu", "Michael Brown", 
-         "2025-03-25", "Review", "High", "Website", 4, 5, "Added testimonials section and lead form"),
-        ("Follow up with Master Kim about payment", "Master Kim's Karate", "John Smith", 
-         "2025-03-30", "To Do", "Urgent", "Client Communication", 0.5, None, "Billing is overdue for March"),
-        ("Team Meeting - April Planning", "Internal", "Sarah Johnson", 
-         "2025-04-02", "To Do", "Medium", "Internal", 1, None, "Prepare agenda and quarterly goals")
-    ]
-    
-    c.executemany('''
-    INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority, 
-                      task_type, estimated_hours, actual_hours, notes)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', tasks)
-    
-    # Sample Campaigns
-    campaigns = [
-        ("Dragon Martial Arts Academy", "John Smith", "2025-03-15", "2025-04-15", 
-         750, 3.2, 25, "Strong performance on parent-targeted ads. Increase budget for April.",
-         650, 2.8, 18, "Keywords performing well, but CTR dropping. Review ad copy.",
-         "Active", "https://dragonmartialarts.com/special-offer"),
-        ("Elite Taekwondo Center", "Sarah Johnson", "2025-03-10", "2025-04-10", 
-         600, 1.8, 12, "Performance declining. Need to refresh creative and targeting.",
-         0, 0, 0, "Not currently running Google Ads.",
-         "Issues", "https://elitetaekwondo.com/trial"),
-        ("Warrior Jiu-Jitsu", "Michael Brown", "2025-03-20", "2025-04-20", 
-         0, 0, 0, "Not currently running Meta Ads.",
-         450, 3.5, 15, "New landing page conversion rate up 25%. Increase budget.",
-         "Active", "https://warriorjiujitsu.com/free-class"),
-        ("Master Kim's Karate", "Sarah Johnson", "2025-03-01", "2025-04-15", 
-         400, 1.2, 8, "Campaign paused on 3/15 due to client request.",
-         0, 0, 0, "Not currently running Google Ads.",
-         "Needs Setup", "https://masterkimskarate.com/special"),
-        ("Victory MMA & Fitness", "John Smith", "2025-03-25", "2025-04-25", 
-         1200, 4.1, 35, "Excellent performance. New creative resonating well with audience.",
-         950, 3.8, 28, "Strong performance across all ad groups. Consider expanding keywords.",
-         "Active", "https://victorymma.com/membership")
-    ]
-    
-    c.executemany('''
-    INSERT INTO campaigns (client_name, campaign_manager, last_review_date, next_review_date,
-                          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-                          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-                          ghl_status, landing_page_url)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', campaigns)
-    
-    # Sample Team Directory
-    team = [
-        ("John Smith", "Senior Account Manager", "john@masterflo.ai", "555-123-4567", 
-         "Client Services", "Meta Ads, Google Ads, Client Management"),
-        ("Sarah Johnson", "Marketing Strategist", "sarah@masterflo.ai", "555-234-5678", 
-         "Strategy", "SEO, Content Strategy, Analytics"),
-        ("Michael Brown", "Creative Director", "michael@masterflo.ai", "555-345-6789", 
-         "Creative", "Ad Design, Web Development, Copywriting"),
-        ("Lisa Chen", "Operations Manager", "lisa@masterflo.ai", "555-456-7890", 
-         "Operations", "Project Management, Process Optimization"),
-        ("David Wilson", "PPC Specialist", "david@masterflo.ai", "555-567-8901", 
-         "Paid Media", "Google Ads, Meta Ads, Analytics")
-    ]
-    
-    c.executemany('''
-    INSERT INTO team_directory (name, role, email, phone, department, skills)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', team)
-    
-    # Sample SOPs
-    sops = [
-        ("Client Onboarding Process", "Onboarding", 
-         "1. Initial consultation call\n2. Collect client assets\n3. Set up ad accounts\n4. Create initial campaign strategy\n5. Client approval\n6. Launch campaigns\n7. Schedule first review", 
-         "2025-03-01"),
-        ("Meta Ads Optimization SOP", "Ads Optimization", 
-         "1. Review performance metrics\n2. Analyze audience insights\n3. Check ad creative performance\n4. Adjust budgets based on ROAS\n5. Update targeting if needed\n6. Create new ad variations\n7. Document changes and results", 
-         "2025-02-15"),
-        ("Google Ads Optimization SOP", "Ads Optimization", 
-         "1. Review search terms report\n2. Analyze keyword performance\n3. Check quality scores\n4. Adjust bids based on performance\n5. Update ad copy if needed\n6. Test new extensions\n7. Document changes and results", 
-         "2025-02-15"),
-        ("Landing Page Optimization Guide", "Ads Optimization", 
-         "1. Review current conversion rate\n2. Analyze user behavior with heatmaps\n3. Check mobile responsiveness\n4. Improve page load speed\n5. Clarify call-to-action\n6. Add social proof\n7. A/B test variations", 
-         "2025-03-10"),
-        ("Client Welcome Email", "Communication Templates", 
-         "Subject: Welcome to MasterFLO.ai Marketing Services!\n\nDear [Client Name],\n\nWe're thrilled to welcome you to the MasterFLO.ai family! As martial arts marketing specialists, we understand the unique challenges and opportunities in growing your school...", 
-         "2025-01-05"),
-        ("Monthly Report Template", "Communication Templates", 
-         "# Monthly Marketing Performance Report\n\n## Executive Summary\n[Brief overview of performance]\n\n## Campaign Performance\n### Meta Ads\n- Spend: $X,XXX\n- Leads: XX\n- Cost per Lead: $XX\n- ROAS: X.X\n\n### Google Ads\n[Similar metrics]\n\n## Recommendations\n[List of recommendations]", 
-         "2025-03-01")
-    ]
-    
-    c.executemany('''
-    INSERT INTO sops (name, category, content, last_updated)
-    VALUES (?, ?, ?, ?)
-    ''', sops)
-    
-    # Sample Meeting Notes
-    meetings = [
-        ("Weekly Team Huddle", "2025-03-21", "All Staff", "Internal", 
-         "Discussed current client performance and upcoming deadlines. Sarah raised concerns about Elite Taekwondo's declining performance. Michael presented new creative concepts for April campaigns.", 
-         "Update campaign creative for Elite Taekwondo; Review SEO strategy for Dragon Martial Arts"),
-        ("Victory MMA Strategy Session", "2025-03-25", "John Smith, Sarah Johnson", "Client", 
-         "Met with client to discuss Q2 strategy. Client wants to focus on summer membership promotion. Agreed to increase Meta Ads budget by 20% and develop new creative focusing on family packages.", 
-         "Increase Meta Ads budget; Develop summer promotion campaign"),
-        ("Q2 Planning Meeting", "2025-03-28", "All Staff", "Internal", 
-         "Reviewed Q1 performance and set goals for Q2. Key focus areas: improving client retention, optimizing ad performance, and launching new service offerings for martial arts schools.", 
-         "Finalize Q2 goals; Assign new client acquisition targets")
-    ]
-    
-    c.executemany('''
-    INSERT INTO meeting_notes (title, date, attendees, meeting_type, notes, action_items)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', meetings)
-    
-    # Sample Quick Links
-    links = [
-        ("Meta Ads Manager", "External Tools", "https://business.facebook.com/", 
-         "Meta Ads management platform"),
-        ("Google Ads Dashboard", "External Tools", "https://ads.google.com/", 
-         "Google Ads management platform"),
-        ("Google Analytics", "External Tools", "https://analytics.google.com/", 
-         "Website analytics platform"),
-        ("Go High Level", "External Tools", "https://app.gohighlevel.com/", 
-         "Marketing automation platform"),
-        ("WordPress Admin", "External Tools", "https://clientwebsite.com/wp-admin/", 
-         "Website management platform")
-    ]
-    
-    c.executemany('''
-    INSERT INTO quick_links (name, category, url, description)
-    VALUES (?, ?, ?, ?)
-    ''', links)
-    
-    conn.commit()
+@st.cache_resource
+def start_archive_scheduler(db_path):
+    """Start one background archival job per database for the whole process"""
+    return archive.start_scheduler(db_path)
 
-# Database functions
-def get_clients():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM clients", conn)
-    conn.close()
-    return df
+@st.cache_resource
+def start_backup_scheduler(db_path):
+    """Start one background snapshot job per database for the whole process"""
+    return backup.start_scheduler(db_path)
 
-def get_tasks():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM tasks", conn)
-    conn.close()
-    return df
+@st.cache_resource
+def start_audit_compactor(db_path):
+    """Start one background audit log compaction job per database for the whole process"""
+    return audit.start_scheduler(db_path)
 
-def get_campaigns():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM campaigns", conn)
-    conn.close()
-    return df
+@st.cache_resource
+def start_link_checker(db_path):
+    """Start one background link checker per database for the whole process"""
+    return linkcheck.start_scheduler(db_path)
 
-def get_sops():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM sops", conn)
-    conn.close()
-    return df
+@st.cache_data(ttl=60)
+def get_cross_tenant_kpis():
+    """Headline KPIs for every agency, queried from all shards in parallel"""
+    return database.get_cross_tenant_kpis()
 
-def get_team_directory():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM team_directory", conn)
-    conn.close()
-    return df
+# Chart caching
+FIGURE_CACHE_MAX_ENTRIES = 64
 
-def get_meeting_notes():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM meeting_notes", conn)
-    conn.close()
-    return df
+def frame_fingerprint(df):
+    """Return a stable hash of a DataFrame's columns, dtypes and values"""
+    digest = hashlib.sha1()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
 
-def get_quick_links():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM quick_links", conn)
-    conn.close()
-    return df
+class FigureCache:
+    """Bounded LRU cache of Plotly figures keyed by a hash of their input frame.
+    
+    Only figure construction is cached. st.plotly_chart accepts a figure, not
+    a prebuilt spec, so it still serializes the figure to JSON on every rerun
+    (a few ms, against tens of ms to build one with plotly.express).
+    """
+    
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_create(self, chart_name, data, build_figure):
+        """Return the cached figure for this chart and data, building it on a miss"""
+        key = (chart_name, frame_fingerprint(data))
+        
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig
+            self.misses += 1
+        
+        # Build outside the lock so slow figures don't block other sessions
+        fig = build_figure(data)
+        
+        with self._lock:
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        
+        return fig
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._figures),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
 
-def add_client(name, services, start_date, campaign_status, assigned_team, 
-              contract_end_date, billing_status, monthly_budget, notes):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    INSERT INTO clients (name, services, start_date, campaign_status, assigned_team, 
-                        contract_end_date, billing_status, monthly_budget, notes)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (name, services, start_date, campaign_status, assigned_team, 
-          contract_end_date, billing_status, monthly_budget, notes))
-    conn.commit()
-    conn.close()
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide figure cache shared by every session"""
+    return FigureCache()
 
-def update_client(id, name, services, start_date, campaign_status, assigned_team, 
-                 contract_end_date, billing_status, monthly_budget, notes):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    UPDATE clients
-    SET name = ?, services = ?, start_date = ?, campaign_status = ?, assigned_team = ?,
-        contract_end_date = ?, billing_status = ?, monthly_budget = ?, notes = ?
-    WHERE id = ?
-    ''', (name, services, start_date, campaign_status, assigned_team, 
-          contract_end_date, billing_status, monthly_budget, notes, id))
-    conn.commit()
-    conn.close()
+# Long text rendering
+def show_text_body(text, plain=False):
+    """Display a stored body as Markdown.
+    
+    Dollar signs are escaped so amounts like $1,500 aren't typeset as math,
+    and plain text (meeting notes) keeps its line breaks. The browser does the
+    Markdown rendering, so there is nothing worth caching here.
+    """
+    text = (text if isinstance(text, str) else "").replace("$", "\\$")
+    if plain:
+        text = text.replace("\n", "  \n")
+    st.markdown(text)
 
-def delete_client(id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM clients WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+def build_campaign_status_pie(campaign_status_counts):
+    return px.pie(campaign_status_counts, values='Count', names='Status', 
+                  color='Status', 
+                  color_discrete_map={'Active': '#34A853', 
+                                      'Paused': '#FBBC05', 
+                                      'Needs Attention': '#EA4335'})
 
-def add_task(title, related_client, assigned_to, due_date, status, priority, 
-            task_type, estimated_hours, actual_hours, notes):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority, 
-                      task_type, estimated_hours, actual_hours, notes)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (title, related_client, assigned_to, due_date, status, priority, 
-          task_type, estimated_hours, actual_hours, notes))
-    conn.commit()
-    conn.close()
+def build_task_status_pie(task_status_counts):
+    return px.pie(task_status_counts, values='Count', names='Status',
+                  color='Status',
+                  color_discrete_map={'To Do': '#E0E0E0',
+                                      'In Progress': '#4285F4',
+                                      'Review': '#FBBC05',
+                                      'Done': '#34A853'})
 
-def update_task(id, title, related_client, assigned_to, due_date, status, priority, 
-               task_type, estimated_hours, actual_hours, notes):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    UPDATE tasks
-    SET title = ?, related_client = ?, assigned_to = ?, due_date = ?, status = ?, priority = ?,
-        task_type = ?, estimated_hours = ?, actual_hours = ?, notes = ?
-    WHERE id = ?
-    ''', (title, related_client, assigned_to, due_date, status, priority, 
-          task_type, estimated_hours, actual_hours, notes, id))
-    conn.commit()
-    conn.close()
+def build_revenue_by_agency_bar(kpis_df):
+    return px.bar(kpis_df, x='tenant_name', y='monthly_revenue',
+                  labels={'tenant_name': 'Agency', 'monthly_revenue': 'Monthly Revenue ($)'},
+                  title='Monthly Revenue by Agency',
+                  color_discrete_sequence=['#4285F4'])
 
-def delete_task(id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM tasks WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+def build_roas_by_manager_line(roas_df):
+    return px.line(roas_df, x='month', y='roas', color='campaign_manager', markers=True,
+                   labels={'month': 'Month', 'roas': 'ROAS', 'campaign_manager': 'Campaign Manager'},
+                   title='ROAS by Campaign Manager by Month')
 
-def add_campaign(client_name, campaign_manager, last_review_date, next_review_date,
-                meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-                google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-                ghl_status, landing_page_url):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    INSERT INTO campaigns (client_name, campaign_manager, last_review_date, next_review_date,
-                          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-                          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-                          ghl_status, landing_page_url)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (client_name, campaign_manager, last_review_date, next_review_date,
-          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-          ghl_status, landing_page_url))
-    conn.commit()
-    conn.close()
+def build_capacity_heatmap(capacity_grid):
+    fig = px.imshow(capacity_grid, text_auto='.0%', aspect='auto',
+                    color_continuous_scale=['#34A853', '#FBBC05', '#EA4335'], zmin=0, zmax=1.5,
+                    labels={'x': 'Week', 'y': 'Team Member', 'color': 'Utilization'},
+                    title='Committed Hours as a Share of Weekly Capacity')
+    fig.update_coloraxes(colorbar_tickformat='.0%')
+    return fig
 
-def update_campaign(id, client_name, campaign_manager, last_review_date, next_review_date,
-                   meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-                   google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-                   ghl_status, landing_page_url):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-    UPDATE campaigns
-    SET client_name = ?, campaign_manager = ?, last_review_date = ?, next_review_date = ?,
-        meta_ads_spend = ?, meta_ads_roas = ?, meta_ads_leads = ?, meta_ads_notes = ?,
-        google_ads_spend = ?, google_ads_roas = ?, google_ads_leads = ?, google_ads_notes = ?,
-        ghl_status = ?, landing_page_url = ?
-    WHERE id = ?
-    ''', (client_name, campaign_manager, last_review_date, next_review_date,
-          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
-          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
-          ghl_status, landing_page_url, id))
-    conn.commit()
-    conn.close()
+def build_revenue_forecast_chart(monthly_forecast):
+    fig = px.line(monthly_forecast, x='month', y=['best_case', 'expected', 'contracted'], markers=True,
+                  labels={'month': 'Month', 'value': 'Monthly Revenue ($)', 'variable': 'Scenario'},
+                  title='Monthly Recurring Revenue Forecast',
+                  color_discrete_map={'best_case': '#34A853', 'expected': '#4285F4', 'contracted': '#9E9E9E'})
+    fig.update_traces(selector={'name': 'contracted'}, line_dash='dot')
+    fig.update_yaxes(rangemode='tozero', tickprefix='$')
+    return fig
 
-def delete_campaign(id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM campaigns WHERE id = ?", (id,))
-    conn.commit()
-    conn.close()
+def build_leads_by_client_bar(leads_by_client):
+    return px.bar(leads_by_client, x='client_name', y=['meta_ads_leads', 'google_ads_leads'],
+                  labels={'value': 'Leads', 'client_name': 'Client', 'variable': 'Source'},
+                  title='Leads by Client',
+                  color_discrete_map={'meta_ads_leads': '#4285F4', 'google_ads_leads': '#EA4335'})
 
 # UI Functions
+def rerun_fragment():
+    """Rerun only the fragment this is called from.
+    
+    Falls back to a full rerun when the fragment is running as part of one
+    (st.rerun(scope="fragment") is only allowed during a fragment's own rerun).
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def show_record_history(table, record_id):
+    """Collapsible list of the audit log entries for one record"""
+    with st.expander("History"):
+        history_df = get_record_history(table, record_id)
+        
+        if history_df.empty:
+            st.info("No changes recorded yet.")
+            return
+        
+        # Old and new values mix text and numbers, so show them all as text
+        for column in ['old', 'new']:
+            history_df[column] = history_df[column].map(lambda v: "" if v is None else str(v))
+        
+        history_df.columns = ['Changed At', 'Action', 'Field', 'Old Value', 'New Value']
+        st.dataframe(history_df, hide_index=True, use_container_width=True)
+
+@st.fragment
+def show_campaign_alerts():
+    """Open campaign alerts, with Scan Now and dismissal rerunning only this section"""
+    st.subheader("Campaign Alerts")
+    col1, col2 = st.columns([3, 1])
+    
+    with col2:
+        if st.button("Scan Now", key="scan_anomalies_btn"):
+            result = anomalies.run_scan(get_db_path())
+            st.success(f"Scanned {result['snapshots']} update(s): {result['alerts']} new alert(s), "
+                       f"{result['resolved']} resolved")
+    
+    with col1:
+        last_scan = get_last_anomaly_scan()
+        st.caption(f"Last scanned: {last_scan}" if last_scan else "Campaign history has not been scanned yet.")
+    
+    alerts_df = get_campaign_alerts()
+    if alerts_df.empty:
+        st.info("No open campaign alerts.")
+    else:
+        alerts_view = alerts_df[['client_name', 'alert_type', 'message', 'detected_at']]
+        alerts_view.columns = ['Client', 'Alert', 'Details', 'Detected']
+        st.dataframe(alerts_view, use_container_width=True, hide_index=True)
+        
+        dismiss_ids = st.multiselect(
+            "Dismiss alerts",
+            options=alerts_df['id'].tolist(),
+            format_func=lambda alert_id: " - ".join(
+                alerts_df.loc[alerts_df['id'] == alert_id, ['client_name', 'alert_type']].iloc[0].astype(str)),
+            key="dismiss_alerts"
+        )
+        if dismiss_ids and st.button("Dismiss Selected", key="dismiss_alerts_btn"):
+            anomalies.resolve_alerts(dismiss_ids, get_db_path())
+            rerun_fragment()
+
+@st.fragment
+def show_leads_by_client():
+    """Leads by Client chart and its drill-down; the controls rerun only this section"""
+    campaigns_df = get_campaigns()
+    figure_cache = get_figure_cache()
+    
+    # Create leads by client chart (top N clients plus one bucket for the rest)
+    top_n = st.slider("Clients shown in Leads by Client", min_value=3, max_value=50,
+                      value=LEADS_CHART_TOP_N, key="leads_top_n")
+    leads_by_client = get_leads_by_client(top_n)
+    
+    fig = figure_cache.get_or_create("leads_by_client", leads_by_client, build_leads_by_client_bar)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Drill down into a single bar
+    drill_down = st.selectbox("Drill Down", options=["None"] + leads_by_client['client_name'].tolist(),
+                              key="leads_drill_down")
+    
+    other_rows = leads_by_client[leads_by_client['is_other']]
+    
+    if not other_rows.empty and drill_down == other_rows['client_name'].iloc[0]:
+        other_row = other_rows.iloc[0]
+        page_size = 50
+        page_count = max(1, -(-int(other_row['client_count']) // page_size))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1,
+                               key="leads_other_page")
+        
+        other_df = get_other_clients_leads(top_n, limit=page_size, offset=(page - 1) * page_size)
+        other_df.columns = ['Client', 'Meta Ads Leads', 'Google Ads Leads', 'Total Leads']
+        st.caption(f"{int(other_row['client_count'])} clients grouped under \"{other_row['client_name']}\" (page {page} of {page_count})")
+        st.dataframe(other_df, use_container_width=True)
+    elif drill_down != "None":
+        client_campaigns = format_date_columns(campaigns_df[campaigns_df['client_name'] == drill_down])[
+            ['campaign_manager', 'meta_ads_leads', 'google_ads_leads', 'meta_ads_spend', 'google_ads_spend', 'next_review_date']]
+        client_campaigns.columns = ['Campaign Manager', 'Meta Ads Leads', 'Google Ads Leads',
+                                    'Meta Ads Spend', 'Google Ads Spend', 'Next Review']
+        st.dataframe(client_campaigns, use_container_width=True)
+
+@st.fragment
+def show_memory_footprint():
+    """Shared snapshot sizes, and per-table savings on demand"""
+    with st.expander("Session Memory Footprint"):
+        st.caption("Snapshots shared by all sessions in this process")
+        st.dataframe(get_snapshot_store().stats().style.format({"Shared (KB)": "{:,.1f}"}),
+                     use_container_width=True)
+        
+        if st.button("Measure Memory", key="measure_memory_btn"):
+            memory_report = get_memory_report()
+            st.dataframe(memory_report.style.format({"Before (KB)": "{:,.1f}",
+                                                     "After (KB)": "{:,.1f}",
+                                                     "Saved": "{:.0%}"}),
+                         use_container_width=True)
+
 def show_dashboard():
     st.title("MasterFLO.ai Dashboard")
     st.subheader("Martial Arts Digital Marketing Agency")
@@ -469,7 +356,7 @@ def show_dashboard():
     # Get data
     clients_df = get_clients()
     tasks_df = get_tasks()
-    campaigns_df = get_campaigns()
+    figure_cache = get_figure_cache()
     
     # Create metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -489,6 +376,21 @@ def show_dashboard():
         monthly_revenue = clients_df['monthly_budget'].sum()
         st.metric("Monthly Revenue", f"${monthly_revenue:,.2f}")
     
+    # Task deadline metrics
+    deadline_counts = get_task_deadline_counts()
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Overdue Tasks", int(deadline_counts['overdue'].sum()))
+    
+    with col2:
+        st.metric("Due This Week", int(deadline_counts['due_this_week'].sum()))
+    
+    with col3:
+        st.metric("At-Risk Tasks", int(deadline_counts['at_risk'].sum()),
+                  help=f"Due within {AT_RISK_HORIZON_DAYS} days with more remaining estimated hours "
+                       f"than {AT_RISK_HOURS_PER_DAY} per day left")
+    
     # Create two columns for charts
     col1, col2 = st.columns(2)
     
@@ -497,11 +399,7 @@ def show_dashboard():
         campaign_status_counts = clients_df['campaign_status'].value_counts().reset_index()
         campaign_status_counts.columns = ['Status', 'Count']
         
-        fig = px.pie(campaign_status_counts, values='Count', names='Status', 
-                    color='Status', 
-                    color_discrete_map={'Active': '#34A853', 
-                                        'Paused': '#FBBC05', 
-                                        'Needs Attention': '#EA4335'})
+        fig = figure_cache.get_or_create("campaign_status", campaign_status_counts, build_campaign_status_pie)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -509,14 +407,40 @@ def show_dashboard():
         task_status_counts = tasks_df['status'].value_counts().reset_index()
         task_status_counts.columns = ['Status', 'Count']
         
-        fig = px.pie(task_status_counts, values='Count', names='Status',
-                    color='Status',
-                    color_discrete_map={'To Do': '#E0E0E0',
-                                        'In Progress': '#4285F4',
-                                        'Review': '#FBBC05',
-                                        'Done': '#34A853'})
+        fig = figure_cache.get_or_create("task_status", task_status_counts, build_task_status_pie)
         st.plotly_chart(fig, use_container_width=True)
     
+    # Revenue forecast (recomputed only when clients change)
+    st.subheader("Revenue Forecast")
+    revenue_forecast = forecast.get_forecast(get_db_path())
+    monthly_forecast = revenue_forecast['monthly']
+    renewals_df = revenue_forecast['renewals']
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(f"Expected Revenue, Next {len(monthly_forecast)} Months", f"${monthly_forecast['expected'].sum():,.2f}")
+    
+    with col2:
+        st.metric("Expected MRR in " + monthly_forecast['month'].iloc[-1].strftime("%b %Y"),
+                  f"${monthly_forecast['expected'].iloc[-1]:,.2f}",
+                  delta=f"{monthly_forecast['expected'].iloc[-1] - monthly_forecast['expected'].iloc[0]:,.2f}")
+    
+    with col3:
+        st.metric("Contracts Ending", int(monthly_forecast['contracts_ending'].sum()),
+                  help=f"Contracts ending in the next {len(monthly_forecast)} months")
+    
+    fig = figure_cache.get_or_create("revenue_forecast", monthly_forecast, build_revenue_forecast_chart)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Renewals are weighted by billing status ({', '.join(f'{status} {p:.0%}' for status, p in forecast.RENEWAL_PROBABILITY.items() if status != 'Free Trial')}); "
+               f"free trials convert at {forecast.FREE_TRIAL_CONVERSION:.0%} after {forecast.FREE_TRIAL_DAYS} days")
+    
+    if len(renewals_df):
+        with st.expander(f"Upcoming Renewals ({len(renewals_df)})"):
+            renewals_view = format_date_columns(renewals_df)
+            renewals_view.columns = ['Client', 'Contract End', 'Billing Status', 'Monthly Budget', 'Renewal Chance']
+            st.dataframe(renewals_view.style.format({'Monthly Budget': '${:,.2f}', 'Renewal Chance': '{:.0%}'}),
+                         use_container_width=True, hide_index=True)
+    
     # Create two columns for tables
     col1, col2 = st.columns(2)
     
@@ -528,19 +452,23 @@ def show_dashboard():
     
     with col2:
         st.subheader("Upcoming Tasks")
-        upcoming_tasks_df = tasks_df[(tasks_df['status'] == 'To Do') | (tasks_df['status'] == 'In Progress')]
-        upcoming_tasks_df = upcoming_tasks_df.sort_values('due_date')[['title', 'due_date', 'assigned_to']]
+        upcoming_tasks_df = get_upcoming_tasks()
         upcoming_tasks_df.columns = ['Task', 'Due Date', 'Assigned To']
         st.dataframe(upcoming_tasks_df, use_container_width=True)
     
+    # Campaign Alerts
+    show_campaign_alerts()
+    
     # Campaign Performance
     st.subheader("Campaign Performance")
     
     # Calculate total leads and spend
-    total_meta_leads = campaigns_df['meta_ads_leads'].sum()
-    total_google_leads = campaigns_df['google_ads_leads'].sum()
-    total_meta_spend = campaigns_df['meta_ads_spend'].sum()
-    total_google_spend = campaigns_df['google_ads_spend'].sum()
+    campaign_totals, _ = get_report("campaign_totals")
+    totals = campaign_totals.iloc[0]
+    total_meta_leads = int(totals['meta_ads_leads'])
+    total_google_leads = int(totals['google_ads_leads'])
+    total_meta_spend = float(totals['meta_ads_spend'])
+    total_google_spend = float(totals['google_ads_spend'])
     
     # Create metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -556,18 +484,72 @@ def show_dashboard():
         st.metric("Avg. Cost Per Lead", f"${cost_per_lead:,.2f}")
         
     with col4:
-        st.metric("Campaigns", len(campaigns_df))
+        st.metric("Campaigns", int(totals['campaigns']))
     
-    # Create leads by client chart
-    leads_by_client = campaigns_df[['client_name', 'meta_ads_leads', 'google_ads_leads']].copy()
-    leads_by_client['total_leads'] = leads_by_client['meta_ads_leads'] + leads_by_client['google_ads_leads']
-    leads_by_client = leads_by_client.sort_values('total_leads', ascending=False)
+    show_leads_by_client()
     
-    fig = px.bar(leads_by_client, x='client_name', y=['meta_ads_leads', 'google_ads_leads'],
-                labels={'value': 'Leads', 'client_name': 'Client', 'variable': 'Source'},
-                title='Leads by Client',
-                color_discrete_map={'meta_ads_leads': '#4285F4', 'google_ads_leads': '#EA4335'})
-    st.plotly_chart(fig, use_container_width=True)
+    # Chart cache statistics
+    with st.expander("Chart Cache"):
+        cache_stats = figure_cache.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        
+        with col2:
+            st.metric("Hits", cache_stats['hits'])
+        
+        with col3:
+            st.metric("Misses", cache_stats['misses'])
+        
+        with col4:
+            st.metric("Cached Figures", f"{cache_stats['entries']}/{cache_stats['max_entries']}")
+    
+    # Per-session memory footprint of the loaded tables
+    show_memory_footprint()
+
+@st.fragment
+def show_client_details():
+    """Details of one client; picking another reruns only this pane"""
+    clients_df = get_clients()
+    
+    st.subheader("Client Details")
+    selected_client = st.selectbox("Select Client", options=clients_df['name'].tolist())
+    
+    if selected_client:
+        client_data = clients_df[clients_df['name'] == selected_client].iloc[0]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"**Client Name:** {client_data['name']}")
+            st.markdown(f"**Services:** {client_data['services']}")
+            st.markdown(f"**Campaign Status:** {client_data['campaign_status']}")
+            st.markdown(f"**Assigned Team:** {client_data['assigned_team']}")
+        
+        with col2:
+            st.markdown(f"**Start Date:** {format_date(client_data['start_date'])}")
+            st.markdown(f"**Contract End Date:** {format_date(client_data['contract_end_date'])}")
+            st.markdown(f"**Billing Status:** {client_data['billing_status']}")
+            st.markdown(f"**Monthly Budget:** ${client_data['monthly_budget']:,.2f}")
+        
+        st.markdown("**Notes/To-Dos:**")
+        st.text_area("", value=client_data['notes'], height=100, key="client_notes_view", disabled=True)
+        
+        # Actions
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("Edit Client", key="edit_client_btn"):
+                st.session_state.edit_client_id = client_data['id']
+                st.session_state.active_tab = "Add/Edit Client"
+                st.rerun()
+        
+        with col2:
+            if st.button("Delete Client", key="delete_client_btn"):
+                delete_client(client_data['id'])
+                st.success(f"Client '{selected_client}' deleted successfully!")
+                st.rerun()
 
 def show_clients():
     st.title("Clients")
@@ -576,7 +558,7 @@ def show_clients():
     clients_df = get_clients()
     
     # Create tabs
-    tab1, tab2 = st.tabs(["View Clients", "Add/Edit Client"])
+    tab1, tab2, tab3 = st.tabs(["View Clients", "Add/Edit Client", "Grid Editor"])
     
     with tab1:
         # Filter options
@@ -585,13 +567,13 @@ def show_clients():
         
         with col1:
             status_filter = st.multiselect("Campaign Status", 
-                                          options=clients_df['campaign_status'].unique(),
-                                          default=clients_df['campaign_status'].unique())
+                                          options=clients_df['campaign_status'].unique().tolist(),
+                                          default=clients_df['campaign_status'].unique().tolist())
         
         with col2:
             billing_filter = st.multiselect("Billing Status",
-                                           options=clients_df['billing_status'].unique(),
-                                           default=clients_df['billing_status'].unique())
+                                           options=clients_df['billing_status'].unique().tolist(),
+                                           default=clients_df['billing_status'].unique().tolist())
         
         # Apply filters
         filtered_df = clients_df[
@@ -603,7 +585,7 @@ def show_clients():
         st.subheader("Clients List")
         
         # Format the dataframe for display
-        display_df = filtered_df.copy()
+        display_df = format_date_columns(filtered_df)
         display_df['monthly_budget'] = display_df['monthly_budget'].apply(lambda x: f"${x:,.2f}")
         
         # Apply color coding to campaign status
@@ -632,46 +614,35 @@ def show_clients():
         styled_df = display_df.style.applymap(color_campaign_status, subset=['campaign_status'])\
                                    .applymap(color_billing_status, subset=['billing_status'])
         
-        st.dataframe(styled_df, use_container_width=True)
+        client_table = st.dataframe(styled_df, use_container_width=True, key="client_list_table",
+                                    on_select="rerun", selection_mode="multi-row")
         
-        # Client details section
-        st.subheader("Client Details")
-        selected_client = st.selectbox("Select Client", options=clients_df['name'].tolist())
+        # Bulk edit the selected clients
+        selected_df = filtered_df.iloc[client_table["selection"]["rows"]]
         
-        if selected_client:
-            client_data = clients_df[clients_df['name'] == selected_client].iloc[0]
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown(f"**Client Name:** {client_data['name']}")
-                st.markdown(f"**Services:** {client_data['services']}")
-                st.markdown(f"**Campaign Status:** {client_data['campaign_status']}")
-                st.markdown(f"**Assigned Team:** {client_data['assigned_team']}")
-            
-            with col2:
-                st.markdown(f"**Start Date:** {client_data['start_date']}")
-                st.markdown(f"**Contract End Date:** {client_data['contract_end_date']}")
-                st.markdown(f"**Billing Status:** {client_data['billing_status']}")
-                st.markdown(f"**Monthly Budget:** ${client_data['monthly_budget']:,.2f}")
-            
-            st.markdown("**Notes/To-Dos:**")
-            st.text_area("", value=client_data['notes'], height=100, key="client_notes_view", disabled=True)
-            
-            # Actions
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("Edit Client", key="edit_client_btn"):
-                    st.session_state.edit_client_id = client_data['id']
-                    st.session_state.active_tab = "Add/Edit Client"
-                    st.rerun()
-            
-            with col2:
-                if st.button("Delete Client", key="delete_client_btn"):
-                    delete_client(client_data['id'])
-                    st.success(f"Client '{selected_client}' deleted successfully!")
-                    st.rerun()
+        if len(selected_df):
+            with st.form("bulk_client_form"):
+                st.markdown(f"**Change {len(selected_df)} selected client(s)** (fields left at \"{NO_CHANGE}\" are kept)")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    bulk_campaign_status = st.selectbox("Campaign Status", options=[NO_CHANGE, *CLIENT_CAMPAIGN_STATUSES])
+                with col2:
+                    bulk_billing_status = st.selectbox("Billing Status", options=[NO_CHANGE, *BILLING_STATUSES])
+                
+                if st.form_submit_button("Apply to Selected"):
+                    fields = {'campaign_status': bulk_campaign_status, 'billing_status': bulk_billing_status}
+                    fields = {field: value for field, value in fields.items() if value != NO_CHANGE}
+                    
+                    if fields:
+                        bulk_patch("clients", selected_df['id'].tolist(), **fields)
+                        # Row positions shift once the edit lands, so start from no selection
+                        del st.session_state["client_list_table"]
+                        st.rerun()
+                    else:
+                        st.warning("Choose at least one field to change.")
+        
+        show_client_details()
     
     with tab2:
         st.subheader("Add/Edit Client")
@@ -685,6 +656,9 @@ def show_clients():
             client_data = clients_df[clients_df['id'] == st.session_state.edit_client_id].iloc[0]
             st.info(f"Editing client: {client_data['name']}")
         
+        if edit_mode:
+            show_record_history("clients", client_data['id'])
+        
         # Form for adding/editing client
         with st.form("client_form"):
             name = st.text_input("Client Name", value=client_data['name'] if edit_mode else "")
@@ -698,7 +672,7 @@ def show_clients():
             
             with col1:
                 start_date = st.date_input("Start Date", 
-                                          value=datetime.strptime(client_data['start_date'], "%Y-%m-%d").date() if edit_mode and client_data['start_date'] else datetime.now())
+                                          value=client_data['start_date'].date() if edit_mode and pd.notna(client_data['start_date']) else datetime.now())
                 
                 campaign_status = st.selectbox("Campaign Status", 
                                               options=["Active", "Paused", "Needs Attention"],
@@ -709,7 +683,7 @@ def show_clients():
             
             with col2:
                 contract_end_date = st.date_input("Contract End Date", 
-                                                 value=datetime.strptime(client_data['contract_end_date'], "%Y-%m-%d").date() if edit_mode and client_data['contract_end_date'] else (datetime.now() + timedelta(days=365)))
+                                                 value=client_data['contract_end_date'].date() if edit_mode and pd.notna(client_data['contract_end_date']) else (datetime.now() + timedelta(days=365)))
                 
                 billing_status = st.selectbox("Billing Status", 
                                              options=["Current", "Overdue", "Free Trial", "Pending"],
@@ -752,6 +726,206 @@ def show_clients():
             
             # Refresh the page
             st.rerun()
+    
+    with tab3:
+        st.subheader("Edit Clients as a Grid")
+        show_grid_editor("clients", clients_df)
+
+# Editable grids
+GRID_PAGE_SIZE = 500
+
+def show_grid_editor(table, df):
+    """Spreadsheet-style editing of a table, one page at a time.
+    
+    Edits stay in the browser until "Save Changes"; then only the changed
+    cells, new rows and deleted rows are validated and written, in one
+    transaction.
+    """
+    page_count = max(1, -(-len(df) // GRID_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1,
+                           key=f"{table}_grid_page") if page_count > 1 else 1
+    original = to_grid_frame(df.iloc[(page - 1) * GRID_PAGE_SIZE:page * GRID_PAGE_SIZE], table)
+    
+    # Fixed-choice fields get dropdowns; ids are kept but hidden
+    column_config = {'id': None}
+    for (choice_table, column), choices in FIELD_CHOICES.items():
+        if choice_table == table:
+            column_config[column] = st.column_config.SelectboxColumn(options=list(choices))
+    
+    grid_key = f"{table}_grid_{page}"
+    with st.form(f"{table}_grid_form"):
+        edited = st.data_editor(original, key=grid_key, num_rows="dynamic", hide_index=True,
+                                column_config=column_config, use_container_width=True)
+        
+        if st.form_submit_button("Save Changes"):
+            inserted, updated, deleted = diff_grid(original, edited, table)
+            problems = validate_grid_changes(table, inserted, updated)
+            
+            if not (inserted or updated or deleted):
+                st.info("No changes to save.")
+            elif problems:
+                for problem in problems:
+                    st.error(problem)
+            else:
+                save_grid_changes(table, inserted, updated, deleted)
+                del st.session_state[grid_key]
+                st.rerun()
+
+# Placeholder option for bulk edit fields that should stay as they are
+NO_CHANGE = "(no change)"
+
+# Kanban cards
+PRIORITY_COLORS = {
+    'Low': '#34A853',
+    'Medium': '#4285F4',
+    'High': '#FBBC05',
+    'Urgent': '#EA4335'
+}
+
+def format_link_check(checks, url):
+    """One-line summary of a URL's latest health check, from get_link_checks() indexed by url"""
+    url = url.strip() if isinstance(url, str) else ""
+    if url not in checks.index:
+        return "⚪ Not checked yet"
+    
+    check = checks.loc[url]
+    parts = [f"HTTP {int(check['status'])}" if pd.notna(check['status']) else check['error']]
+    if pd.notna(check['ttfb_ms']):
+        parts.append(f"{check['ttfb_ms']:,.0f} ms")
+    if pd.notna(check['page_bytes']):
+        parts.append(f"{check['page_bytes'] / 1024:,.0f} KB")
+    if check['ok'] and pd.notna(check['error']):
+        parts.append(check['error'])
+    return f"{'🟢' if check['ok'] else '🔴'} {' · '.join(parts)} (checked {check['checked_at']})"
+
+def patch_from_widget(setter, id, key):
+    """on_change callback writing one widget's new value to one field"""
+    setter(id, st.session_state[key])
+
+def show_task_card(task):
+    with st.container(border=True):
+        st.markdown(f"<span style='color:{PRIORITY_COLORS.get(task['priority'], '#000000')};'>●</span> **{task['title']}**", unsafe_allow_html=True)
+        st.markdown(f"**Client:** {task['related_client']}")
+        st.markdown(f"**Assigned to:** {task['assigned_to']}")
+        st.markdown(f"**Due:** {format_date(task['due_date'])}")
+        
+        # The current value is part of each key, so a stale selection never
+        # outlives a change made elsewhere
+        status_key = f"task_status_{task['id']}_{task['status']}"
+        st.selectbox("Status", options=TASK_STATUSES, index=TASK_STATUSES.index(task['status']),
+                     key=status_key, on_change=patch_from_widget, args=(set_task_status, task['id'], status_key))
+        
+        priority_key = f"task_priority_{task['id']}_{task['priority']}"
+        st.selectbox("Priority", options=TASK_PRIORITIES,
+                     index=TASK_PRIORITIES.index(task['priority']) if task['priority'] in TASK_PRIORITIES else 1,
+                     key=priority_key, on_change=patch_from_widget, args=(set_task_priority, task['id'], priority_key))
+        
+        if st.button("Edit", key=f"edit_task_{task['id']}"):
+            st.session_state.edit_task_id = task['id']
+            st.session_state.active_tab = "Add/Edit Task"
+            st.rerun()
+
+@st.fragment
+def show_kanban_board():
+    """Task board; status and priority changes rerun only the board"""
+    tasks_df = get_tasks()
+    
+    # One column per status. Changing a card's status or priority writes
+    # just that field; the card moves on the rerun.
+    status_columns = st.columns(len(TASK_STATUSES))
+    
+    for status, column in zip(TASK_STATUSES, status_columns):
+        with column:
+            st.markdown(f"### {status}")
+            
+            for _, task in tasks_df[tasks_df['status'] == status].sort_values('due_date').iterrows():
+                show_task_card(task)
+
+@st.fragment
+def show_task_details():
+    """Details of one task; picking another reruns only this pane"""
+    tasks_df = get_tasks()
+    
+    st.subheader("Task Details")
+    selected_task = st.selectbox("Select Task", options=tasks_df['title'].tolist())
+    
+    if selected_task:
+        task_data = tasks_df[tasks_df['title'] == selected_task].iloc[0]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"**Task Title:** {task_data['title']}")
+            st.markdown(f"**Related Client:** {task_data['related_client']}")
+            st.markdown(f"**Assigned To:** {task_data['assigned_to']}")
+            st.markdown(f"**Due Date:** {format_date(task_data['due_date'])}")
+        
+        with col2:
+            st.markdown(f"**Status:** {task_data['status']}")
+            st.markdown(f"**Priority:** {task_data['priority']}")
+            st.markdown(f"**Task Type:** {task_data['task_type']}")
+            st.markdown(f"**Estimated Hours:** {task_data['estimated_hours']}")
+            st.markdown(f"**Actual Hours:** {task_data['actual_hours'] if task_data['actual_hours'] else 'Not recorded'}")
+        
+        st.markdown("**Notes:**")
+        st.text_area("", value=task_data['notes'], height=100, key="task_notes_view", disabled=True)
+        
+        # Actions
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("Edit Task", key="edit_task_btn"):
+                st.session_state.edit_task_id = task_data['id']
+                st.session_state.active_tab = "Add/Edit Task"
+                st.rerun()
+        
+        with col2:
+            if st.button("Delete Task", key="delete_task_btn"):
+                delete_task(task_data['id'])
+                st.success(f"Task '{selected_task}' deleted successfully!")
+                st.rerun()
+
+@st.fragment
+def show_assignee_suggestions(task_data=None):
+    """Best-suited assignees for the task being added or edited, rerun on their own as the inputs change"""
+    task_key = task_data['id'] if task_data is not None else "new"
+    task_types = list(assignment.TASK_TYPE_KEYWORDS)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        task_type = st.selectbox("Task Type", options=task_types,
+                                 index=task_types.index(task_data['task_type']) if task_data is not None and task_data['task_type'] in task_types else 0,
+                                 key=f"suggest_type_{task_key}")
+    
+    with col2:
+        due_date = st.date_input("Due Date",
+                                 value=task_data['due_date'].date() if task_data is not None and pd.notna(task_data['due_date']) else datetime.now(),
+                                 key=f"suggest_due_{task_key}")
+    
+    with col3:
+        estimated_hours = st.number_input("Estimated Hours", min_value=0.0, step=0.5,
+                                          value=float(task_data['estimated_hours']) if task_data is not None and pd.notna(task_data['estimated_hours']) else 1.0,
+                                          key=f"suggest_hours_{task_key}")
+    
+    keywords = st.text_input("Keywords", value=task_data['title'] if task_data is not None else "",
+                             placeholder="Words from the task title, e.g. landing page", key=f"suggest_keywords_{task_key}")
+    
+    suggestions = assignment.recommend_assignees(get_db_path(), task_type, keywords, due_date, estimated_hours)
+    
+    for _, suggestion in suggestions.iterrows():
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            st.markdown(f"**{suggestion['member']}** ({suggestion['score']:.0%} match)")
+            st.caption(f"Skills: {suggestion['skills'] or 'none matched'} · "
+                       f"{suggestion['due_hours']:g} h due by then, {suggestion['open_hours']:g} h open · "
+                       f"{suggestion['type_tasks']} {task_type} task(s)")
+        
+        with col2:
+            if st.button("Choose", key=f"suggest_pick_{task_key}_{suggestion['member']}"):
+                st.session_state.suggested_assignee = (task_key, suggestion['member'])
+                st.rerun()
 
 def show_tasks():
     st.title("Team Tasks")
@@ -761,211 +935,71 @@ def show_tasks():
     clients_df = get_clients()
     team_df = get_team_directory()
     
+    # Deadline badges per assignee
+    deadline_counts = get_task_deadline_counts()
+    flagged = deadline_counts[(deadline_counts['overdue'] > 0) | (deadline_counts['due_this_week'] > 0) |
+                              (deadline_counts['at_risk'] > 0)]
+    
+    if len(flagged):
+        badges = []
+        for _, member in flagged.iterrows():
+            badges.append(f"**{member['assigned_to']}** "
+                          f"<span style='color:#EA4335;'>● {int(member['overdue'])} overdue</span> "
+                          f"<span style='color:#FBBC05;'>● {int(member['due_this_week'])} due this week</span> "
+                          f"<span style='color:#4285F4;'>● {int(member['at_risk'])} at risk</span>")
+        st.markdown(" &nbsp;|&nbsp; ".join(badges), unsafe_allow_html=True)
+    
     # Create tabs
-    tab1, tab2, tab3 = st.tabs(["Kanban Board", "Task List", "Add/Edit Task"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Kanban Board", "Task List", "Add/Edit Task", "Capacity", "Grid Editor"])
     
     with tab1:
         st.subheader("Task Board")
         
-        # Create columns for each status
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # To Do column
-        with col1:
-            st.markdown("### To Do")
-            todo_tasks = tasks_df[tasks_df['status'] == 'To Do'].sort_values('due_date')
-            
-            for _, task in todo_tasks.iterrows():
-                with st.container(border=True):
-                    st.markdown(f"**{task['title']}**")
-                    st.markdown(f"**Client:** {task['related_client']}")
-                    st.markdown(f"**Assigned to:** {task['assigned_to']}")
-                    st.markdown(f"**Due:** {task['due_date']}")
-                    
-                    # Priority indicator
-                    priority_color = {
-                        'Low': '#34A853',
-                        'Medium': '#4285F4',
-                        'High': '#FBBC05',
-                        'Urgent': '#EA4335'
-                    }
-                    st.markdown(f"<span style='color:{priority_color.get(task['priority'], '#000000')};'>●</span> **{task['priority']}**", unsafe_allow_html=True)
-                    
-                    # Actions
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("Edit", key=f"edit_todo_{task['id']}"):
-                            st.session_state.edit_task_id = task['id']
-                            st.session_state.active_tab = "Add/Edit Task"
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("→ In Progress", key=f"move_todo_{task['id']}"):
-                            update_task(
-                                task['id'], task['title'], task['related_client'], 
-                                task['assigned_to'], task['due_date'], "In Progress", 
-                                task['priority'], task['task_type'], 
-                                task['estimated_hours'], task['actual_hours'], 
-                                task['notes']
-                            )
-                            st.rerun()
-        
-        # In Progress column
-        with col2:
-            st.markdown("### In Progress")
-            in_progress_tasks = tasks_df[tasks_df['status'] == 'In Progress'].sort_values('due_date')
-            
-            for _, task in in_progress_tasks.iterrows():
-                with st.container(border=True):
-                    st.markdown(f"**{task['title']}**")
-                    st.markdown(f"**Client:** {task['related_client']}")
-                    st.markdown(f"**Assigned to:** {task['assigned_to']}")
-                    st.markdown(f"**Due:** {task['due_date']}")
-                    
-                    # Priority indicator
-                    priority_color = {
-                        'Low': '#34A853',
-                        'Medium': '#4285F4',
-                        'High': '#FBBC05',
-                        'Urgent': '#EA4335'
-                    }
-                    st.markdown(f"<span style='color:{priority_color.get(task['priority'], '#000000')};'>●</span> **{task['priority']}**", unsafe_allow_html=True)
-                    
-                    # Actions
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("← To Do", key=f"back_inprogress_{task['id']}"):
-                            update_task(
-                                task['id'], task['title'], task['related_client'], 
-                                task['assigned_to'], task['due_date'], "To Do", 
-                                task['priority'], task['task_type'], 
-                                task['estimated_hours'], task['actual_hours'], 
-                                task['notes']
-                            )
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("→ Review", key=f"move_inprogress_{task['id']}"):
-                            update_task(
-                                task['id'], task['title'], task['related_client'], 
-                                task['assigned_to'], task['due_date'], "Review", 
-                                task['priority'], task['task_type'], 
-                                task['estimated_hours'], task['actual_hours'], 
-                                task['notes']
-                            )
-                            st.rerun()
-        
-        # Review column
-        with col3:
-            st.markdown("### Review")
-            review_tasks = tasks_df[tasks_df['status'] == 'Review'].sort_values('due_date')
-            
-            for _, task in review_tasks.iterrows():
-                with st.container(border=True):
-                    st.markdown(f"**{task['title']}**")
-                    st.markdown(f"**Client:** {task['related_client']}")
-                    st.markdown(f"**Assigned to:** {task['assigned_to']}")
-                    st.markdown(f"**Due:** {task['due_date']}")
-                    
-                    # Priority indicator
-                    priority_color = {
-                        'Low': '#34A853',
-                        'Medium': '#4285F4',
-                        'High': '#FBBC05',
-                        'Urgent': '#EA4335'
-                    }
-                    st.markdown(f"<span style='color:{priority_color.get(task['priority'], '#000000')};'>●</span> **{task['priority']}**", unsafe_allow_html=True)
-                    
-                    # Actions
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("← In Progress", key=f"back_review_{task['id']}"):
-                            update_task(
-                                task['id'], task['title'], task['related_client'], 
-                                task['assigned_to'], task['due_date'], "In Progress", 
-                                task['priority'], task['task_type'], 
-                                task['estimated_hours'], task['actual_hours'], 
-                                task['notes']
-                            )
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("→ Done", key=f"move_review_{task['id']}"):
-                            update_task(
-                                task['id'], task['title'], task['related_client'], 
-                                task['assigned_to'], task['due_date'], "Done", 
-                                task['priority'], task['task_type'], 
-                                task['estimated_hours'], task['actual_hours'], 
-                                task['notes']
-                            )
-                            st.rerun()
-        
-        # Done column
-        with col4:
-            st.markdown("### Done")
-            done_tasks = tasks_df[tasks_df['status'] == 'Done'].sort_values('due_date')
-            
-            for _, task in done_tasks.iterrows():
-                with st.container(border=True):
-                    st.markdown(f"**{task['title']}**")
-                    st.markdown(f"**Client:** {task['related_client']}")
-                    st.markdown(f"**Assigned to:** {task['assigned_to']}")
-                    st.markdown(f"**Due:** {task['due_date']}")
-                    
-                    # Priority indicator
-                    priority_color = {
-                        'Low': '#34A853',
-                        'Medium': '#4285F4',
-                        'High': '#FBBC05',
-                        'Urgent': '#EA4335'
-                    }
-                    st.markdown(f"<span style='color:{priority_color.get(task['priority'], '#000000')};'>●</span> **{task['priority']}**", unsafe_allow_html=True)
-                    
-                    # Actions
-                    if st.button("← Review", key=f"back_done_{task['id']}"):
-                        update_task(
-                            task['id'], task['title'], task['related_client'], 
-                            task['assigned_to'], task['due_date'], "Review", 
-                            task['priority'], task['task_type'], 
-                            task['estimated_hours'], task['actual_hours'], 
-                            task['notes']
-                        )
-                        st.rerun()
+        show_kanban_board()
     
     with tab2:
         st.subheader("Task List")
         
+        # Optionally search archived tasks as well as the live ones
+        include_archived = st.toggle("Include archived tasks", key="include_archived_tasks")
+        list_df = tasks_df
+        
+        if include_archived:
+            archived_tasks_df = get_archived_tasks()
+            if len(archived_tasks_df):
+                list_df = pd.concat([tasks_df, archived_tasks_df], ignore_index=True)
+        
         # Filter options
         st.subheader("Filter Options")
         col1, col2, col3 = st.columns(3)
         
         with col1:
             status_filter = st.multiselect("Status", 
-                                          options=tasks_df['status'].unique(),
-                                          default=tasks_df['status'].unique())
+                                          options=list_df['status'].unique().tolist(),
+                                          default=list_df['status'].unique().tolist())
         
         with col2:
             priority_filter = st.multiselect("Priority",
-                                           options=tasks_df['priority'].unique(),
-                                           default=tasks_df['priority'].unique())
+                                           options=list_df['priority'].unique().tolist(),
+                                           default=list_df['priority'].unique().tolist())
         
         with col3:
             assigned_filter = st.multiselect("Assigned To",
-                                           options=tasks_df['assigned_to'].unique(),
-                                           default=tasks_df['assigned_to'].unique())
+                                           options=list_df['assigned_to'].unique().tolist(),
+                                           default=list_df['assigned_to'].unique().tolist())
         
         # Apply filters
-        filtered_df = tasks_df[
-            tasks_df['status'].isin(status_filter) &
-            tasks_df['priority'].isin(priority_filter) &
-            tasks_df['assigned_to'].isin(assigned_filter)
+        filtered_df = list_df[
+            list_df['status'].isin(status_filter) &
+            list_df['priority'].isin(priority_filter) &
+            list_df['assigned_to'].isin(assigned_filter)
         ]
         
         # Display tasks table
         st.subheader("Tasks List")
         
         # Format the dataframe for display
-        display_df = filtered_df.copy()
+        display_df = format_date_columns(filtered_df)
         
         # Apply color coding to status
         def color_status(val):
@@ -995,47 +1029,43 @@ def show_tasks():
         styled_df = display_df.style.applymap(color_status, subset=['status'])\
                                    .applymap(color_priority, subset=['priority'])
         
-        st.dataframe(styled_df, use_container_width=True)
+        task_table = st.dataframe(styled_df, use_container_width=True, key="task_list_table",
+                                  on_select="rerun", selection_mode="multi-row")
         
-        # Task details section
-        st.subheader("Task Details")
-        selected_task = st.selectbox("Select Task", options=tasks_df['title'].tolist())
+        # Bulk edit the selected tasks (archived ones are read-only)
+        selected_df = filtered_df.iloc[task_table["selection"]["rows"]]
+        if 'archived_at' in selected_df:
+            selected_df = selected_df[selected_df['archived_at'].isna()]
         
-        if selected_task:
-            task_data = tasks_df[tasks_df['title'] == selected_task].iloc[0]
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown(f"**Task Title:** {task_data['title']}")
-                st.markdown(f"**Related Client:** {task_data['related_client']}")
-                st.markdown(f"**Assigned To:** {task_data['assigned_to']}")
-                st.markdown(f"**Due Date:** {task_data['due_date']}")
-            
-            with col2:
-                st.markdown(f"**Status:** {task_data['status']}")
-                st.markdown(f"**Priority:** {task_data['priority']}")
-                st.markdown(f"**Task Type:** {task_data['task_type']}")
-                st.markdown(f"**Estimated Hours:** {task_data['estimated_hours']}")
-                st.markdown(f"**Actual Hours:** {task_data['actual_hours'] if task_data['actual_hours'] else 'Not recorded'}")
-            
-            st.markdown("**Notes:**")
-            st.text_area("", value=task_data['notes'], height=100, key="task_notes_view", disabled=True)
-            
-            # Actions
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("Edit Task", key="edit_task_btn"):
-                    st.session_state.edit_task_id = task_data['id']
-                    st.session_state.active_tab = "Add/Edit Task"
-                    st.rerun()
-            
-            with col2:
-                if st.button("Delete Task", key="delete_task_btn"):
-                    delete_task(task_data['id'])
-                    st.success(f"Task '{selected_task}' deleted successfully!")
-                    st.rerun()
+        if len(selected_df):
+            with st.form("bulk_task_form"):
+                st.markdown(f"**Change {len(selected_df)} selected task(s)** (fields left at \"{NO_CHANGE}\" are kept)")
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    bulk_status = st.selectbox("Status", options=[NO_CHANGE, *TASK_STATUSES])
+                with col2:
+                    bulk_assignee = st.selectbox("Assigned To", options=[NO_CHANGE, *team_df['name'].tolist()])
+                with col3:
+                    bulk_priority = st.selectbox("Priority", options=[NO_CHANGE, *TASK_PRIORITIES])
+                with col4:
+                    bulk_due_date = st.date_input("Due Date", value=None)
+                
+                if st.form_submit_button("Apply to Selected"):
+                    fields = {'status': bulk_status, 'assigned_to': bulk_assignee, 'priority': bulk_priority}
+                    fields = {field: value for field, value in fields.items() if value != NO_CHANGE}
+                    if bulk_due_date:
+                        fields['due_date'] = bulk_due_date.strftime(DATE_FORMAT)
+                    
+                    if fields:
+                        bulk_patch("tasks", selected_df['id'].tolist(), **fields)
+                        # Row positions shift once the edit lands, so start from no selection
+                        del st.session_state["task_list_table"]
+                        st.rerun()
+                    else:
+                        st.warning("Choose at least one field to change.")
+        
+        show_task_details()
     
     with tab3:
         st.subheader("Add/Edit Task")
@@ -1045,9 +1075,21 @@ def show_tasks():
         task_data = None
         
         if hasattr(st.session_state, 'edit_task_id') and st.session_state.edit_task_id:
-            edit_mode = True
-            task_data = tasks_df[tasks_df['id'] == st.session_state.edit_task_id].iloc[0]
-            st.info(f"Editing task: {task_data['title']}")
+            matching_tasks = tasks_df[tasks_df['id'] == st.session_state.edit_task_id]
+            
+            if len(matching_tasks):
+                edit_mode = True
+                task_data = matching_tasks.iloc[0]
+                st.info(f"Editing task: {task_data['title']}")
+            else:
+                # The task was deleted or archived since Edit was clicked
+                st.session_state.edit_task_id = None
+        
+        if edit_mode:
+            show_record_history("tasks", task_data['id'])
+        
+        with st.expander("Suggested Assignees", expanded=not edit_mode):
+            show_assignee_suggestions(task_data)
         
         # Form for adding/editing task
         with st.form("task_form"):
@@ -1067,12 +1109,16 @@ def show_tasks():
                                              options=client_list,
                                              index=client_list.index(task_data['related_client']) if edit_mode and task_data['related_client'] in client_list else 0)
                 
+                # A member picked from this task's suggestions takes precedence
+                picked_for, suggested = st.session_state.get('suggested_assignee') or (None, None)
+                if picked_for != (task_data['id'] if edit_mode else "new"):
+                    suggested = None
                 assigned_to = st.selectbox("Assigned To", 
                                          options=team_list,
-                                         index=team_list.index(task_data['assigned_to']) if edit_mode and task_data['assigned_to'] in team_list else 0)
+                                         index=team_list.index(suggested) if suggested in team_list else team_list.index(task_data['assigned_to']) if edit_mode and task_data['assigned_to'] in team_list else 0)
                 
                 due_date = st.date_input("Due Date", 
-                                        value=datetime.strptime(task_data['due_date'], "%Y-%m-%d").date() if edit_mode and task_data['due_date'] else datetime.now())
+                                        value=task_data['due_date'].date() if edit_mode and pd.notna(task_data['due_date']) else datetime.now())
                 
                 status = st.selectbox("Status", 
                                      options=["To Do", "In Progress", "Review", "Done"],
@@ -1123,48 +1169,160 @@ def show_tasks():
                 )
                 st.success(f"Task '{title}' added successfully!")
             
+            st.session_state.suggested_assignee = None
+            
             # Refresh the page
             st.rerun()
-
-def show_campaigns():
-    st.title("Campaign Tracker")
-    
-    # Get data
-    campaigns_df = get_campaigns()
-    clients_df = get_clients()
-    team_df = get_team_directory()
     
-    # Create tabs
-    tab1, tab2 = st.tabs(["View Campaigns", "Add/Edit Campaign"])
-    
-    with tab1:
-        # Filter options
-        st.subheader("Filter Options")
+    with tab4:
+        st.subheader("Team Capacity")
+        st.caption(f"Remaining estimated hours of open tasks by due week, against {workload.WEEKLY_CAPACITY_HOURS} hours per person per week")
+        
+        team_workload = workload.get_workload(get_db_path())
+        capacity_grid = workload.capacity_heatmap(team_workload['weekly'], team_df['name'].tolist())
+        
+        fig = get_figure_cache().get_or_create("capacity_heatmap", capacity_grid, build_capacity_heatmap)
+        st.plotly_chart(fig, use_container_width=True)
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            client_filter = st.multiselect("Client", 
-                                          options=campaigns_df['client_name'].unique(),
-                                          default=campaigns_df['client_name'].unique())
+            st.subheader("Overdue Backlog")
+            overdue_df = team_workload['overdue'].copy()
+            overdue_df['oldest_due_date'] = overdue_df['oldest_due_date'].dt.strftime(DATE_FORMAT)
+            overdue_df.columns = ['Team Member', 'Overdue Tasks', 'Remaining Hours', 'Oldest Due Date', 'Days Overdue']
+            st.dataframe(overdue_df, use_container_width=True, hide_index=True)
         
         with col2:
-            ghl_filter = st.multiselect("GHL Status",
-                                       options=campaigns_df['ghl_status'].unique(),
-                                       default=campaigns_df['ghl_status'].unique())
-        
-        # Apply filters
-        filtered_df = campaigns_df[
-            campaigns_df['client_name'].isin(client_filter) &
-            campaigns_df['ghl_status'].isin(ghl_filter)
-        ]
+            st.subheader("Estimate Accuracy")
+            accuracy_df = team_workload['accuracy'].copy()
+            accuracy_df.columns = ['Team Member', 'Completed Tasks', 'Estimated Hours', 'Actual Hours', 'Actual / Estimated']
+            st.dataframe(accuracy_df.style.format({'Actual / Estimated': '{:.0%}'}),
+                         use_container_width=True, hide_index=True)
+    
+    with tab5:
+        st.subheader("Edit Tasks as a Grid")
+        show_grid_editor("tasks", tasks_df)
+
+@st.fragment
+def show_campaign_details():
+    """Details of one campaign; picking another or changing its GHL status reruns only this pane"""
+    campaigns_df = get_campaigns()
+    link_checks = get_link_checks().set_index('url')
+    
+    st.subheader("Campaign Details")
+    selected_campaign = st.selectbox("Select Client Campaign", options=campaigns_df['client_name'].tolist())
+    
+    if selected_campaign:
+        campaign_data = campaigns_df[campaigns_df['client_name'] == selected_campaign].iloc[0]
         
-        # Display campaigns table
-        st.subheader("Campaigns List")
+        # Create tabs for Meta Ads and Google Ads
+        meta_tab, google_tab, ghl_tab = st.tabs(["Meta Ads", "Google Ads", "GHL & Landing Page"])
         
-        # Format the dataframe for display
-        display_df = filtered_df.copy()
-        display_df['meta_ads_spend'] = display_df['meta_ads_spend'].apply(lambda x: f"${x:,.2f}" if x > 0 else "N/A")
-        display_df['google_ads_spend'] = display_df['google_ads_spend'].apply(lambda x: f"${x:,.2f}" if x > 0 else "N/A")
+        with meta_tab:
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Meta Ads Spend", f"${campaign_data['meta_ads_spend']:,.2f}" if campaign_data['meta_ads_spend'] > 0 else "N/A")
+            
+            with col2:
+                st.metric("Meta Ads ROAS", f"{campaign_data['meta_ads_roas']:.1f}x" if campaign_data['meta_ads_roas'] > 0 else "N/A")
+            
+            with col3:
+                st.metric("Meta Ads Leads", f"{campaign_data['meta_ads_leads']}" if campaign_data['meta_ads_leads'] > 0 else "N/A")
+            
+            st.markdown("**Meta Ads Notes:**")
+            st.text_area("", value=campaign_data['meta_ads_notes'], height=100, key="meta_notes_view", disabled=True)
+        
+        with google_tab:
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Google Ads Spend", f"${campaign_data['google_ads_spend']:,.2f}" if campaign_data['google_ads_spend'] > 0 else "N/A")
+            
+            with col2:
+                st.metric("Google Ads ROAS", f"{campaign_data['google_ads_roas']:.1f}x" if campaign_data['google_ads_roas'] > 0 else "N/A")
+            
+            with col3:
+                st.metric("Google Ads Leads", f"{campaign_data['google_ads_leads']}" if campaign_data['google_ads_leads'] > 0 else "N/A")
+            
+            st.markdown("**Google Ads Notes:**")
+            st.text_area("", value=campaign_data['google_ads_notes'], height=100, key="google_notes_view", disabled=True)
+        
+        with ghl_tab:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                ghl_key = f"ghl_status_{campaign_data['id']}_{campaign_data['ghl_status']}"
+                st.selectbox("GHL Status", options=GHL_STATUSES,
+                             index=GHL_STATUSES.index(campaign_data['ghl_status']) if campaign_data['ghl_status'] in GHL_STATUSES else 0,
+                             key=ghl_key, on_change=patch_from_widget,
+                             args=(set_campaign_ghl_status, campaign_data['id'], ghl_key))
+            
+            with col2:
+                st.markdown(f"**Landing Page URL:** [{campaign_data['landing_page_url']}]({campaign_data['landing_page_url']})")
+                st.caption(format_link_check(link_checks, campaign_data['landing_page_url']))
+        
+        st.markdown(f"**Campaign Manager:** {campaign_data['campaign_manager']}")
+        st.markdown(f"**Last Review Date:** {format_date(campaign_data['last_review_date'])}")
+        st.markdown(f"**Next Review Date:** {format_date(campaign_data['next_review_date'])}")
+        
+        # Actions
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("Edit Campaign", key="edit_campaign_btn"):
+                st.session_state.edit_campaign_id = campaign_data['id']
+                st.session_state.active_tab = "Add/Edit Campaign"
+                st.rerun()
+        
+        with col2:
+            if st.button("Delete Campaign", key="delete_campaign_btn"):
+                delete_campaign(campaign_data['id'])
+                st.success(f"Campaign for '{selected_campaign}' deleted successfully!")
+                st.rerun()
+
+def show_campaigns():
+    st.title("Campaign Tracker")
+    
+    # Get data
+    campaigns_df = get_campaigns()
+    clients_df = get_clients()
+    team_df = get_team_directory()
+    
+    # Create tabs
+    tab1, tab2, tab3, tab4 = st.tabs(["View Campaigns", "Add/Edit Campaign", "Reports", "Grid Editor"])
+    
+    with tab1:
+        # Filter options
+        st.subheader("Filter Options")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            client_filter = st.multiselect("Client", 
+                                          options=campaigns_df['client_name'].unique().tolist(),
+                                          default=campaigns_df['client_name'].unique().tolist())
+        
+        with col2:
+            ghl_filter = st.multiselect("GHL Status",
+                                       options=campaigns_df['ghl_status'].unique().tolist(),
+                                       default=campaigns_df['ghl_status'].unique().tolist())
+        
+        # Apply filters
+        filtered_df = campaigns_df[
+            campaigns_df['client_name'].isin(client_filter) &
+            campaigns_df['ghl_status'].isin(ghl_filter)
+        ]
+        
+        # Display campaigns table
+        st.subheader("Campaigns List")
+        
+        # Format the dataframe for display
+        display_df = format_date_columns(filtered_df)
+        display_df['meta_ads_spend'] = display_df['meta_ads_spend'].apply(lambda x: f"${x:,.2f}" if x > 0 else "N/A")
+        display_df['google_ads_spend'] = display_df['google_ads_spend'].apply(lambda x: f"${x:,.2f}" if x > 0 else "N/A")
+        link_checks = get_link_checks().set_index('url')
+        display_df['landing_page_check'] = display_df['landing_page_url'].map(lambda url: format_link_check(link_checks, url))
         
         # Apply color coding to GHL status
         def color_ghl_status(val):
@@ -1183,73 +1341,7 @@ def show_campaigns():
         
         st.dataframe(styled_df, use_container_width=True)
         
-        # Campaign details section
-        st.subheader("Campaign Details")
-        selected_campaign = st.selectbox("Select Client Campaign", options=campaigns_df['client_name'].tolist())
-        
-        if selected_campaign:
-            campaign_data = campaigns_df[campaigns_df['client_name'] == selected_campaign].iloc[0]
-            
-            # Create tabs for Meta Ads and Google Ads
-            meta_tab, google_tab, ghl_tab = st.tabs(["Meta Ads", "Google Ads", "GHL & Landing Page"])
-            
-            with meta_tab:
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Meta Ads Spend", f"${campaign_data['meta_ads_spend']:,.2f}" if campaign_data['meta_ads_spend'] > 0 else "N/A")
-                
-                with col2:
-                    st.metric("Meta Ads ROAS", f"{campaign_data['meta_ads_roas']:.1f}x" if campaign_data['meta_ads_roas'] > 0 else "N/A")
-                
-                with col3:
-                    st.metric("Meta Ads Leads", f"{campaign_data['meta_ads_leads']}" if campaign_data['meta_ads_leads'] > 0 else "N/A")
-                
-                st.markdown("**Meta Ads Notes:**")
-                st.text_area("", value=campaign_data['meta_ads_notes'], height=100, key="meta_notes_view", disabled=True)
-            
-            with google_tab:
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Google Ads Spend", f"${campaign_data['google_ads_spend']:,.2f}" if campaign_data['google_ads_spend'] > 0 else "N/A")
-                
-                with col2:
-                    st.metric("Google Ads ROAS", f"{campaign_data['google_ads_roas']:.1f}x" if campaign_data['google_ads_roas'] > 0 else "N/A")
-                
-                with col3:
-                    st.metric("Google Ads Leads", f"{campaign_data['google_ads_leads']}" if campaign_data['google_ads_leads'] > 0 else "N/A")
-                
-                st.markdown("**Google Ads Notes:**")
-                st.text_area("", value=campaign_data['google_ads_notes'], height=100, key="google_notes_view", disabled=True)
-            
-            with ghl_tab:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown(f"**GHL Status:** {campaign_data['ghl_status']}")
-                
-                with col2:
-                    st.markdown(f"**Landing Page URL:** [{campaign_data['landing_page_url']}]({campaign_data['landing_page_url']})")
-            
-            st.markdown(f"**Campaign Manager:** {campaign_data['campaign_manager']}")
-            st.markdown(f"**Last Review Date:** {campaign_data['last_review_date']}")
-            st.markdown(f"**Next Review Date:** {campaign_data['next_review_date']}")
-            
-            # Actions
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("Edit Campaign", key="edit_campaign_btn"):
-                    st.session_state.edit_campaign_id = campaign_data['id']
-                    st.session_state.active_tab = "Add/Edit Campaign"
-                    st.rerun()
-            
-            with col2:
-                if st.button("Delete Campaign", key="delete_campaign_btn"):
-                    delete_campaign(campaign_data['id'])
-                    st.success(f"Campaign for '{selected_campaign}' deleted successfully!")
-                    st.rerun()
+        show_campaign_details()
     
     with tab2:
         st.subheader("Add/Edit Campaign")
@@ -1263,6 +1355,9 @@ def show_campaigns():
             campaign_data = campaigns_df[campaigns_df['id'] == st.session_state.edit_campaign_id].iloc[0]
             st.info(f"Editing campaign for: {campaign_data['client_name']}")
         
+        if edit_mode:
+            show_record_history("campaigns", campaign_data['id'])
+        
         # Form for adding/editing campaign
         with st.form("campaign_form"):
             # Get client list for dropdown
@@ -1283,11 +1378,11 @@ def show_campaigns():
             
             with col1:
                 last_review_date = st.date_input("Last Review Date", 
-                                               value=datetime.strptime(campaign_data['last_review_date'], "%Y-%m-%d").date() if edit_mode and campaign_data['last_review_date'] else datetime.now())
+                                               value=campaign_data['last_review_date'].date() if edit_mode and pd.notna(campaign_data['last_review_date']) else datetime.now())
             
             with col2:
                 next_review_date = st.date_input("Next Review Date", 
-                                               value=datetime.strptime(campaign_data['next_review_date'], "%Y-%m-%d").date() if edit_mode and campaign_data['next_review_date'] else (datetime.now() + timedelta(days=30)))
+                                               value=campaign_data['next_review_date'].date() if edit_mode and pd.notna(campaign_data['next_review_date']) else (datetime.now() + timedelta(days=30)))
             
             # Meta Ads section
             st.subheader("Meta Ads")
@@ -1385,452 +1480,649 @@ def show_campaigns():
             
             # Refresh the page
             st.rerun()
+    
+    with tab3:
+        st.subheader("ROAS by Campaign Manager")
+        
+        roas_df, engine = get_report("roas_by_manager_month")
+        st.caption(f"Computed with {'DuckDB' if engine == 'duckdb' else 'SQLite'}")
+        
+        fig = get_figure_cache().get_or_create("roas_by_manager_month", roas_df, build_roas_by_manager_line)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        display_df = roas_df.copy()
+        display_df.columns = ['Campaign Manager', 'Month', 'Spend', 'Revenue', 'Leads', 'ROAS', 'Cost Per Lead']
+        st.dataframe(display_df.style.format({'Spend': '${:,.2f}', 'Revenue': '${:,.2f}',
+                                              'ROAS': '{:.2f}x', 'Cost Per Lead': '${:,.2f}'}, na_rep='N/A'),
+                     use_container_width=True)
+        
+        st.subheader("Ad Spend vs. Monthly Budget")
+        
+        budget_df, _ = get_report("spend_vs_budget")
+        display_df = budget_df.copy()
+        display_df.columns = ['Client', 'Assigned Team', 'Billing Status', 'Monthly Budget', 'Ad Spend', 'Budget Used']
+        st.dataframe(display_df.style.format({'Monthly Budget': '${:,.2f}', 'Ad Spend': '${:,.2f}',
+                                              'Budget Used': '{:.0%}'}, na_rep='N/A'),
+                     use_container_width=True)
+    
+    with tab4:
+        st.subheader("Edit Campaigns as a Grid")
+        show_grid_editor("campaigns", campaigns_df)
 
-def show_operations():
-    st.title("Operations Hub")
+@st.fragment
+def show_sops_tab():
+    """SOPs & Resources tab, rerun on its own when SOPs are opened or saved"""
+    sops_df = get_sop_list()
     
-    # Get data
-    sops_df = get_sops()
-    team_df = get_team_directory()
-    meetings_df = get_meeting_notes()
-    links_df = get_quick_links()
+    st.subheader("Standard Operating Procedures")
     
-    # Create tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["SOPs & Resources", "Team Directory", "Meeting Notes", "Quick Links"])
+    # Filter by category
+    categories = sops_df['category'].unique()
+    selected_category = st.selectbox("Filter by Category", options=["All"] + list(categories))
     
-    with tab1:
-        st.subheader("Standard Operating Procedures")
+    if selected_category == "All":
+        filtered_sops = sops_df
+    else:
+        filtered_sops = sops_df[sops_df['category'] == selected_category]
+    
+    # Display SOPs; a body is only fetched and rendered while its toggle is on
+    for _, sop in filtered_sops.iterrows():
+        if not st.toggle(f"{sop['name']} (Last Updated: {format_date(sop['last_updated'])})",
+                         key=f"open_sop_{sop['id']}"):
+            continue
+        
+        with st.container(border=True):
+            body = get_record_body("sops", sop['id'])
+            show_text_body(body['content'] if body else "")
+            
+            # Edit button
+            if st.button("Edit", key=f"edit_sop_{sop['id']}"):
+                st.session_state.edit_sop_id = sop['id']
+                st.session_state.edit_sop_mode = True
+                rerun_fragment()
+    
+    # Add new SOP button
+    if st.button("Add New SOP"):
+        st.session_state.edit_sop_mode = True
+        st.session_state.edit_sop_id = None
+        rerun_fragment()
+    
+    # Edit SOP form
+    if hasattr(st.session_state, 'edit_sop_mode') and st.session_state.edit_sop_mode:
+        st.subheader("Add/Edit SOP")
         
-        # Filter by category
-        categories = sops_df['category'].unique()
-        selected_category = st.selectbox("Filter by Category", options=["All"] + list(categories))
+        # Check if we're editing an existing SOP
+        edit_mode = False
+        sop_data = None
         
-        if selected_category == "All":
-            filtered_sops = sops_df
-        else:
-            filtered_sops = sops_df[sops_df['category'] == selected_category]
+        if hasattr(st.session_state, 'edit_sop_id') and st.session_state.edit_sop_id:
+            edit_mode = True
+            sop_data = sops_df[sops_df['id'] == st.session_state.edit_sop_id].iloc[0]
+            sop_body = get_record_body("sops", sop_data['id']) or {"content": ""}
+            st.info(f"Editing SOP: {sop_data['name']}")
         
-        # Display SOPs
-        for _, sop in filtered_sops.iterrows():
-            with st.expander(f"{sop['name']} (Last Updated: {sop['last_updated']})"):
-                st.markdown(sop['content'])
-                
-                # Edit button
-                if st.button("Edit", key=f"edit_sop_{sop['id']}"):
-                    st.session_state.edit_sop_id = sop['id']
-                    st.session_state.edit_sop_mode = True
-                    st.rerun()
-        
-        # Add new SOP button
-        if st.button("Add New SOP"):
-            st.session_state.edit_sop_mode = True
-            st.session_state.edit_sop_id = None
-            st.rerun()
+        if edit_mode:
+            show_record_history("sops", sop_data['id'])
         
-        # Edit SOP form
-        if hasattr(st.session_state, 'edit_sop_mode') and st.session_state.edit_sop_mode:
-            st.subheader("Add/Edit SOP")
+        # Form for adding/editing SOP
+        with st.form("sop_form"):
+            name = st.text_input("SOP Name", value=sop_data['name'] if edit_mode else "")
             
-            # Check if we're editing an existing SOP
-            edit_mode = False
-            sop_data = None
+            category = st.selectbox("Category", 
+                                   options=["Onboarding", "Ads Optimization", "Communication Templates", "Other"],
+                                   index=["Onboarding", "Ads Optimization", "Communication Templates", "Other"].index(sop_data['category']) if edit_mode and sop_data['category'] in ["Onboarding", "Ads Optimization", "Communication Templates", "Other"] else 0)
             
-            if hasattr(st.session_state, 'edit_sop_id') and st.session_state.edit_sop_id:
-                edit_mode = True
-                sop_data = sops_df[sops_df['id'] == st.session_state.edit_sop_id].iloc[0]
-                st.info(f"Editing SOP: {sop_data['name']}")
+            content = st.text_area("Content", 
+                                  value=sop_body['content'] if edit_mode else "",
+                                  height=300)
             
-            # Form for adding/editing SOP
-            with st.form("sop_form"):
-                name = st.text_input("SOP Name", value=sop_data['name'] if edit_mode else "")
-                
-                category = st.selectbox("Category", 
-                                       options=["Onboarding", "Ads Optimization", "Communication Templates", "Other"],
-                                       index=["Onboarding", "Ads Optimization", "Communication Templates", "Other"].index(sop_data['category']) if edit_mode and sop_data['category'] in ["Onboarding", "Ads Optimization", "Communication Templates", "Other"] else 0)
-                
-                content = st.text_area("Content", 
-                                      value=sop_data['content'] if edit_mode else "",
-                                      height=300)
-                
-                last_updated = st.date_input("Last Updated", 
-                                           value=datetime.strptime(sop_data['last_updated'], "%Y-%m-%d").date() if edit_mode and sop_data['last_updated'] else datetime.now())
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    submit_button = st.form_submit_button("Save SOP")
-                
-                with col2:
-                    cancel_button = st.form_submit_button("Cancel")
+            last_updated = st.date_input("Last Updated", 
+                                       value=sop_data['last_updated'].date() if edit_mode and pd.notna(sop_data['last_updated']) else datetime.now())
             
-            if submit_button:
-                # Format date
-                last_updated_str = last_updated.strftime("%Y-%m-%d")
-                
-                # Connect to database
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                
-                if edit_mode:
-                    c.execute('''
-                    UPDATE sops
-                    SET name = ?, category = ?, content = ?, last_updated = ?
-                    WHERE id = ?
-                    ''', (name, category, content, last_updated_str, st.session_state.edit_sop_id))
-                    st.success(f"SOP '{name}' updated successfully!")
-                else:
-                    c.execute('''
-                    INSERT INTO sops (name, category, content, last_updated)
-                    VALUES (?, ?, ?, ?)
-                    ''', (name, category, content, last_updated_str))
-                    st.success(f"SOP '{name}' added successfully!")
-                
-                conn.commit()
-                conn.close()
-                
-                # Clear edit mode
-                st.session_state.edit_sop_mode = False
-                st.session_state.edit_sop_id = None
-                st.rerun()
+            col1, col2 = st.columns(2)
             
-            if cancel_button:
-                # Clear edit mode
-                st.session_state.edit_sop_mode = False
-                st.session_state.edit_sop_id = None
-                st.rerun()
+            with col1:
+                submit_button = st.form_submit_button("Save SOP")
+            
+            with col2:
+                cancel_button = st.form_submit_button("Cancel")
+        
+        if submit_button:
+            # Format date
+            last_updated_str = last_updated.strftime("%Y-%m-%d")
+            
+            if edit_mode:
+                save_sop(st.session_state.edit_sop_id, name, category, content, last_updated_str)
+                st.success(f"SOP '{name}' updated successfully!")
+            else:
+                save_sop(None, name, category, content, last_updated_str)
+                st.success(f"SOP '{name}' added successfully!")
+            
+            # Clear edit mode
+            st.session_state.edit_sop_mode = False
+            st.session_state.edit_sop_id = None
+            rerun_fragment()
+        
+        if cancel_button:
+            # Clear edit mode
+            st.session_state.edit_sop_mode = False
+            st.session_state.edit_sop_id = None
+            rerun_fragment()
+
+@st.fragment
+def show_team_tab():
+    """Team Directory tab, rerun on its own when members are opened or saved"""
+    team_df = get_team_directory()
     
-    with tab2:
-        st.subheader("Team Directory")
+    st.subheader("Team Directory")
+    
+    # Ranked search over name, role, department and skills
+    query = st.text_input("Search", key="team_search", placeholder="Name, role, department or skill")
+    
+    if query.strip():
+        listed_members = team_search.search_team(get_db_path(), query)
+        st.caption(f"{len(listed_members)} best match(es)" if len(listed_members) else "No team members match")
+    else:
+        listed_members = team_df
+    
+    # Display team members
+    for _, member in listed_members.iterrows():
+        with st.expander(f"{member['name']} - {member['role']}"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown(f"**Email:** {member['email']}")
+                st.markdown(f"**Phone:** {member['phone']}")
+            
+            with col2:
+                st.markdown(f"**Department:** {member['department']}")
+                st.markdown(f"**Skills:** {member['skills']}")
+            
+            # Edit button
+            if st.button("Edit", key=f"edit_member_{member['id']}"):
+                st.session_state.edit_member_id = member['id']
+                st.session_state.edit_member_mode = True
+                rerun_fragment()
+    
+    # Add new team member button
+    if st.button("Add New Team Member"):
+        st.session_state.edit_member_mode = True
+        st.session_state.edit_member_id = None
+        rerun_fragment()
+    
+    # Edit team member form
+    if hasattr(st.session_state, 'edit_member_mode') and st.session_state.edit_member_mode:
+        st.subheader("Add/Edit Team Member")
         
-        # Display team members
-        for _, member in team_df.iterrows():
-            with st.expander(f"{member['name']} - {member['role']}"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown(f"**Email:** {member['email']}")
-                    st.markdown(f"**Phone:** {member['phone']}")
-                
-                with col2:
-                    st.markdown(f"**Department:** {member['department']}")
-                    st.markdown(f"**Skills:** {member['skills']}")
-                
-                # Edit button
-                if st.button("Edit", key=f"edit_member_{member['id']}"):
-                    st.session_state.edit_member_id = member['id']
-                    st.session_state.edit_member_mode = True
-                    st.rerun()
-        
-        # Add new team member button
-        if st.button("Add New Team Member"):
-            st.session_state.edit_member_mode = True
-            st.session_state.edit_member_id = None
-            st.rerun()
+        # Check if we're editing an existing team member
+        edit_mode = False
+        member_data = None
+        
+        if hasattr(st.session_state, 'edit_member_id') and st.session_state.edit_member_id:
+            edit_mode = True
+            member_data = team_df[team_df['id'] == st.session_state.edit_member_id].iloc[0]
+            st.info(f"Editing team member: {member_data['name']}")
+        
+        if edit_mode:
+            show_record_history("team_directory", member_data['id'])
         
-        # Edit team member form
-        if hasattr(st.session_state, 'edit_member_mode') and st.session_state.edit_member_mode:
-            st.subheader("Add/Edit Team Member")
+        # Form for adding/editing team member
+        with st.form("member_form"):
+            name = st.text_input("Name", value=member_data['name'] if edit_mode else "")
+            role = st.text_input("Role", value=member_data['role'] if edit_mode else "")
             
-            # Check if we're editing an existing team member
-            edit_mode = False
-            member_data = None
+            col1, col2 = st.columns(2)
             
-            if hasattr(st.session_state, 'edit_member_id') and st.session_state.edit_member_id:
-                edit_mode = True
-                member_data = team_df[team_df['id'] == st.session_state.edit_member_id].iloc[0]
-                st.info(f"Editing team member: {member_data['name']}")
+            with col1:
+                email = st.text_input("Email", value=member_data['email'] if edit_mode else "")
+                department = st.text_input("Department", value=member_data['department'] if edit_mode else "")
             
-            # Form for adding/editing team member
-            with st.form("member_form"):
-                name = st.text_input("Name", value=member_data['name'] if edit_mode else "")
-                role = st.text_input("Role", value=member_data['role'] if edit_mode else "")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    email = st.text_input("Email", value=member_data['email'] if edit_mode else "")
-                    department = st.text_input("Department", value=member_data['department'] if edit_mode else "")
-                
-                with col2:
-                    phone = st.text_input("Phone", value=member_data['phone'] if edit_mode else "")
-                    skills = st.text_input("Skills", value=member_data['skills'] if edit_mode else "")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    submit_button = st.form_submit_button("Save Team Member")
-                
-                with col2:
-                    cancel_button = st.form_submit_button("Cancel")
+            with col2:
+                phone = st.text_input("Phone", value=member_data['phone'] if edit_mode else "")
+                skills = st.text_input("Skills", value=member_data['skills'] if edit_mode else "")
             
-            if submit_button:
-                # Connect to database
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                
-                if edit_mode:
-                    c.execute('''
-                    UPDATE team_directory
-                    SET name = ?, role = ?, email = ?, phone = ?, department = ?, skills = ?
-                    WHERE id = ?
-                    ''', (name, role, email, phone, department, skills, st.session_state.edit_member_id))
-                    st.success(f"Team member '{name}' updated successfully!")
-                else:
-                    c.execute('''
-                    INSERT INTO team_directory (name, role, email, phone, department, skills)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (name, role, email, phone, department, skills))
-                    st.success(f"Team member '{name}' added successfully!")
-                
-                conn.commit()
-                conn.close()
-                
-                # Clear edit mode
-                st.session_state.edit_member_mode = False
-                st.session_state.edit_member_id = None
-                st.rerun()
+            col1, col2 = st.columns(2)
             
-            if cancel_button:
-                # Clear edit mode
-                st.session_state.edit_member_mode = False
-                st.session_state.edit_member_id = None
-                st.rerun()
-    
-    with tab3:
-        st.subheader("Meeting Notes")
-        
-        # Filter by meeting type
-        meeting_types = meetings_df['meeting_type'].unique()
-        selected_type = st.selectbox("Filter by Meeting Type", options=["All"] + list(meeting_types))
+            with col1:
+                submit_button = st.form_submit_button("Save Team Member")
+            
+            with col2:
+                cancel_button = st.form_submit_button("Cancel")
         
-        if selected_type == "All":
-            filtered_meetings = meetings_df
-        else:
-            filtered_meetings = meetings_df[meetings_df['meeting_type'] == selected_type]
+        if submit_button:
+            if edit_mode:
+                save_team_member(st.session_state.edit_member_id, name, role, email, phone, department, skills)
+                st.success(f"Team member '{name}' updated successfully!")
+            else:
+                save_team_member(None, name, role, email, phone, department, skills)
+                st.success(f"Team member '{name}' added successfully!")
+            
+            # Clear edit mode
+            st.session_state.edit_member_mode = False
+            st.session_state.edit_member_id = None
+            rerun_fragment()
         
-        # Sort by date (most recent first)
-        filtered_meetings = filtered_meetings.sort_values('date', ascending=False)
+        if cancel_button:
+            # Clear edit mode
+            st.session_state.edit_member_mode = False
+            st.session_state.edit_member_id = None
+            rerun_fragment()
+
+@st.fragment
+def show_meetings_tab():
+    """Meeting Notes tab, rerun on its own when meetings are opened or saved"""
+    meetings_df = get_meeting_list()
+    
+    st.subheader("Meeting Notes")
+    
+    # Optionally search archived meetings as well as the live ones
+    include_archived = st.toggle("Include archived meetings", key="include_archived_meetings")
+    listed_meetings = meetings_df.assign(archived=False)
+    
+    if include_archived:
+        archived_meetings_df = get_archived_meeting_notes()
+        if len(archived_meetings_df):
+            listed_meetings = pd.concat([listed_meetings, archived_meetings_df.assign(archived=True)],
+                                        ignore_index=True)
+    
+    # Filter by meeting type
+    meeting_types = listed_meetings['meeting_type'].unique()
+    selected_type = st.selectbox("Filter by Meeting Type", options=["All"] + list(meeting_types))
+    
+    if selected_type == "All":
+        filtered_meetings = listed_meetings
+    else:
+        filtered_meetings = listed_meetings[listed_meetings['meeting_type'] == selected_type]
+    
+    # Sort by date (most recent first)
+    filtered_meetings = filtered_meetings.sort_values('date', ascending=False)
+    
+    # Display meetings; a body is only fetched and rendered while its toggle is on
+    for i, meeting in filtered_meetings.iterrows():
+        archived_label = " - Archived" if meeting['archived'] else ""
+        widget_key = f"archived_{i}" if meeting['archived'] else meeting['id']
         
-        # Display meetings
-        for _, meeting in filtered_meetings.iterrows():
-            with st.expander(f"{meeting['title']} ({meeting['date']})"):
-                st.markdown(f"**Attendees:** {meeting['attendees']}")
-                st.markdown(f"**Meeting Type:** {meeting['meeting_type']}")
-                
-                st.markdown("**Notes:**")
-                st.text_area("", value=meeting['notes'], height=150, key=f"notes_{meeting['id']}", disabled=True)
-                
-                st.markdown("**Action Items:**")
-                st.text_area("", value=meeting['action_items'], height=100, key=f"action_{meeting['id']}", disabled=True)
-                
-                # Edit button
-                if st.button("Edit", key=f"edit_meeting_{meeting['id']}"):
-                    st.session_state.edit_meeting_id = meeting['id']
-                    st.session_state.edit_meeting_mode = True
-                    st.rerun()
-        
-        # Add new meeting button
-        if st.button("Add New Meeting"):
-            st.session_state.edit_meeting_mode = True
-            st.session_state.edit_meeting_id = None
-            st.rerun()
+        if not st.toggle(f"{meeting['title']} ({format_date(meeting['date'])}){archived_label}",
+                         key=f"open_meeting_{widget_key}"):
+            continue
         
-        # Edit meeting form
-        if hasattr(st.session_state, 'edit_meeting_mode') and st.session_state.edit_meeting_mode:
-            st.subheader("Add/Edit Meeting")
+        with st.container(border=True):
+            # Archived rows are loaded with their bodies; live ones are fetched by id
+            body = meeting if meeting['archived'] else get_record_body("meeting_notes", meeting['id']) or {}
             
-            # Check if we're editing an existing meeting
-            edit_mode = False
-            meeting_data = None
+            st.markdown(f"**Attendees:** {meeting['attendees']}")
+            st.markdown(f"**Meeting Type:** {meeting['meeting_type']}")
             
-            if hasattr(st.session_state, 'edit_meeting_id') and st.session_state.edit_meeting_id:
+            st.markdown("**Notes:**")
+            show_text_body(body.get('notes'), plain=True)
+            
+            st.markdown("**Action Items:**")
+            show_text_body(body.get('action_items'), plain=True)
+            
+            # Edit button (archived meetings are read-only)
+            if not meeting['archived'] and st.button("Edit", key=f"edit_meeting_{meeting['id']}"):
+                st.session_state.edit_meeting_id = meeting['id']
+                st.session_state.edit_meeting_mode = True
+                rerun_fragment()
+    
+    # Add new meeting button
+    if st.button("Add New Meeting"):
+        st.session_state.edit_meeting_mode = True
+        st.session_state.edit_meeting_id = None
+        rerun_fragment()
+    
+    # Edit meeting form
+    if hasattr(st.session_state, 'edit_meeting_mode') and st.session_state.edit_meeting_mode:
+        st.subheader("Add/Edit Meeting")
+        
+        # Check if we're editing an existing meeting
+        edit_mode = False
+        meeting_data = None
+        
+        if hasattr(st.session_state, 'edit_meeting_id') and st.session_state.edit_meeting_id:
+            matching_meetings = meetings_df[meetings_df['id'] == st.session_state.edit_meeting_id]
+            
+            if len(matching_meetings):
                 edit_mode = True
-                meeting_data = meetings_df[meetings_df['id'] == st.session_state.edit_meeting_id].iloc[0]
+                meeting_data = matching_meetings.iloc[0]
+                meeting_body = get_record_body("meeting_notes", meeting_data['id']) or {"notes": "", "action_items": ""}
                 st.info(f"Editing meeting: {meeting_data['title']}")
+            else:
+                # The meeting was deleted or archived since Edit was clicked
+                st.session_state.edit_meeting_id = None
+        
+        if edit_mode:
+            show_record_history("meeting_notes", meeting_data['id'])
+        
+        # Form for adding/editing meeting
+        with st.form("meeting_form"):
+            title = st.text_input("Meeting Title", value=meeting_data['title'] if edit_mode else "")
             
-            # Form for adding/editing meeting
-            with st.form("meeting_form"):
-                title = st.text_input("Meeting Title", value=meeting_data['title'] if edit_mode else "")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    date = st.date_input("Date", 
-                                        value=datetime.strptime(meeting_data['date'], "%Y-%m-%d").date() if edit_mode and meeting_data['date'] else datetime.now())
-                
-                with col2:
-                    meeting_type = st.selectbox("Meeting Type", 
-                                              options=["Internal", "Client", "Other"],
-                                              index=["Internal", "Client", "Other"].index(meeting_data['meeting_type']) if edit_mode and meeting_data['meeting_type'] in ["Internal", "Client", "Other"] else 0)
-                
-                attendees = st.text_input("Attendees", value=meeting_data['attendees'] if edit_mode else "")
-                
-                notes = st.text_area("Notes", 
-                                    value=meeting_data['notes'] if edit_mode else "",
-                                    height=200)
-                
-                action_items = st.text_area("Action Items", 
-                                          value=meeting_data['action_items'] if edit_mode else "",
-                                          height=100)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    submit_button = st.form_submit_button("Save Meeting")
-                
-                with col2:
-                    cancel_button = st.form_submit_button("Cancel")
+            col1, col2 = st.columns(2)
             
-            if submit_button:
-                # Format date
-                date_str = date.strftime("%Y-%m-%d")
-                
-                # Connect to database
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                
-                if edit_mode:
-                    c.execute('''
-                    UPDATE meeting_notes
-                    SET title = ?, date = ?, attendees = ?, meeting_type = ?, notes = ?, action_items = ?
-                    WHERE id = ?
-                    ''', (title, date_str, attendees, meeting_type, notes, action_items, st.session_state.edit_meeting_id))
-                    st.success(f"Meeting '{title}' updated successfully!")
-                else:
-                    c.execute('''
-                    INSERT INTO meeting_notes (title, date, attendees, meeting_type, notes, action_items)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (title, date_str, attendees, meeting_type, notes, action_items))
-                    st.success(f"Meeting '{title}' added successfully!")
-                
-                conn.commit()
-                conn.close()
-                
-                # Clear edit mode
-                st.session_state.edit_meeting_mode = False
-                st.session_state.edit_meeting_id = None
-                st.rerun()
+            with col1:
+                date = st.date_input("Date", 
+                                    value=meeting_data['date'].date() if edit_mode and pd.notna(meeting_data['date']) else datetime.now())
             
-            if cancel_button:
-                # Clear edit mode
-                st.session_state.edit_meeting_mode = False
-                st.session_state.edit_meeting_id = None
-                st.rerun()
+            with col2:
+                meeting_type = st.selectbox("Meeting Type", 
+                                          options=["Internal", "Client", "Other"],
+                                          index=["Internal", "Client", "Other"].index(meeting_data['meeting_type']) if edit_mode and meeting_data['meeting_type'] in ["Internal", "Client", "Other"] else 0)
+            
+            attendees = st.text_input("Attendees", value=meeting_data['attendees'] if edit_mode else "")
+            
+            notes = st.text_area("Notes", 
+                                value=meeting_body['notes'] if edit_mode else "",
+                                height=200)
+            
+            action_items = st.text_area("Action Items", 
+                                      value=meeting_body['action_items'] if edit_mode else "",
+                                      height=100)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                submit_button = st.form_submit_button("Save Meeting")
+            
+            with col2:
+                cancel_button = st.form_submit_button("Cancel")
+        
+        if submit_button:
+            # Format date
+            date_str = date.strftime("%Y-%m-%d")
+            
+            if edit_mode:
+                save_meeting(st.session_state.edit_meeting_id, title, date_str, attendees, meeting_type, notes, action_items)
+                st.success(f"Meeting '{title}' updated successfully!")
+            else:
+                save_meeting(None, title, date_str, attendees, meeting_type, notes, action_items)
+                st.success(f"Meeting '{title}' added successfully!")
+            
+            # Clear edit mode
+            st.session_state.edit_meeting_mode = False
+            st.session_state.edit_meeting_id = None
+            rerun_fragment()
+        
+        if cancel_button:
+            # Clear edit mode
+            st.session_state.edit_meeting_mode = False
+            st.session_state.edit_meeting_id = None
+            rerun_fragment()
+
+@st.fragment
+def show_links_tab():
+    """Quick Links tab, rerun on its own when links are opened or saved"""
+    links_df = get_quick_links()
     
-    with tab4:
-        st.subheader("Quick Links")
-        
-        # Filter by category
-        link_categories = links_df['category'].unique()
-        selected_category = st.selectbox("Filter by Category", options=["All"] + list(link_categories), key="link_category")
-        
-        if selected_category == "All":
-            filtered_links = links_df
-        else:
-            filtered_links = links_df[links_df['category'] == selected_category]
-        
-        # Display links in a grid
-        cols = st.columns(3)
-        
-        for i, (_, link) in enumerate(filtered_links.iterrows()):
-            with cols[i % 3]:
-                with st.container(border=True):
-                    st.markdown(f"**[{link['name']}]({link['url']})**")
-                    st.caption(f"Category: {link['category']}")
-                    st.markdown(link['description'])
-                    
-                    # Edit button
-                    if st.button("Edit", key=f"edit_link_{link['id']}"):
-                        st.session_state.edit_link_id = link['id']
-                        st.session_state.edit_link_mode = True
-                        st.rerun()
+    st.subheader("Quick Links")
+    
+    if st.button("Check Links Now", key="check_links_btn"):
+        with st.spinner("Checking links..."):
+            result = linkcheck.run_checks(get_db_path(), force=True)
+        st.success(f"Checked {result['checked']} URL(s): {result['broken']} broken")
+    
+    link_checks = get_link_checks().set_index('url')
+    
+    # Filter by category
+    link_categories = links_df['category'].unique()
+    selected_category = st.selectbox("Filter by Category", options=["All"] + list(link_categories), key="link_category")
+    
+    if selected_category == "All":
+        filtered_links = links_df
+    else:
+        filtered_links = links_df[links_df['category'] == selected_category]
+    
+    # Display links in a grid
+    cols = st.columns(3)
+    
+    for i, (_, link) in enumerate(filtered_links.iterrows()):
+        with cols[i % 3]:
+            with st.container(border=True):
+                st.markdown(f"**[{link['name']}]({link['url']})**")
+                st.caption(f"Category: {link['category']}")
+                st.caption(format_link_check(link_checks, link['url']))
+                st.markdown(link['description'])
+                
+                # Edit button
+                if st.button("Edit", key=f"edit_link_{link['id']}"):
+                    st.session_state.edit_link_id = link['id']
+                    st.session_state.edit_link_mode = True
+                    rerun_fragment()
+    
+    # Add new link button
+    if st.button("Add New Link"):
+        st.session_state.edit_link_mode = True
+        st.session_state.edit_link_id = None
+        rerun_fragment()
+    
+    # Edit link form
+    if hasattr(st.session_state, 'edit_link_mode') and st.session_state.edit_link_mode:
+        st.subheader("Add/Edit Link")
         
-        # Add new link button
-        if st.button("Add New Link"):
-            st.session_state.edit_link_mode = True
-            st.session_state.edit_link_id = None
-            st.rerun()
+        # Check if we're editing an existing link
+        edit_mode = False
+        link_data = None
+        
+        if hasattr(st.session_state, 'edit_link_id') and st.session_state.edit_link_id:
+            edit_mode = True
+            link_data = links_df[links_df['id'] == st.session_state.edit_link_id].iloc[0]
+            st.info(f"Editing link: {link_data['name']}")
+        
+        if edit_mode:
+            show_record_history("quick_links", link_data['id'])
         
-        # Edit link form
-        if hasattr(st.session_state, 'edit_link_mode') and st.session_state.edit_link_mode:
-            st.subheader("Add/Edit Link")
+        # Form for adding/editing link
+        with st.form("link_form"):
+            name = st.text_input("Link Name", value=link_data['name'] if edit_mode else "")
             
-            # Check if we're editing an existing link
-            edit_mode = False
-            link_data = None
+            category = st.selectbox("Category", 
+                                   options=["External Tools", "Client Resources", "Internal Resources", "Other"],
+                                   index=["External Tools", "Client Resources", "Internal Resources", "Other"].index(link_data['category']) if edit_mode and link_data['category'] in ["External Tools", "Client Resources", "Internal Resources", "Other"] else 0)
             
-            if hasattr(st.session_state, 'edit_link_id') and st.session_state.edit_link_id:
-                edit_mode = True
-                link_data = links_df[links_df['id'] == st.session_state.edit_link_id].iloc[0]
-                st.info(f"Editing link: {link_data['name']}")
+            url = st.text_input("URL", value=link_data['url'] if edit_mode else "https://")
             
-            # Form for adding/editing link
-            with st.form("link_form"):
-                name = st.text_input("Link Name", value=link_data['name'] if edit_mode else "")
-                
-                category = st.selectbox("Category", 
-                                       options=["External Tools", "Client Resources", "Internal Resources", "Other"],
-                                       index=["External Tools", "Client Resources", "Internal Resources", "Other"].index(link_data['category']) if edit_mode and link_data['category'] in ["External Tools", "Client Resources", "Internal Resources", "Other"] else 0)
-                
-                url = st.text_input("URL", value=link_data['url'] if edit_mode else "https://")
-                
-                description = st.text_area("Description", 
-                                         value=link_data['description'] if edit_mode else "",
-                                         height=100)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    submit_button = st.form_submit_button("Save Link")
-                
-                with col2:
-                    cancel_button = st.form_submit_button("Cancel")
+            description = st.text_area("Description", 
+                                     value=link_data['description'] if edit_mode else "",
+                                     height=100)
             
-            if submit_button:
-                # Connect to database
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                
-                if edit_mode:
-                    c.execute('''
-                    UPDATE quick_links
-                    SET name = ?, category = ?, url = ?, description = ?
-                    WHERE id = ?
-                    ''', (name, category, url, description, st.session_state.edit_link_id))
-                    st.success(f"Link '{name}' updated successfully!")
-                else:
-                    c.execute('''
-                    INSERT INTO quick_links (name, category, url, description)
-                    VALUES (?, ?, ?, ?)
-                    ''', (name, category, url, description))
-                    st.success(f"Link '{name}' added successfully!")
-                
-                conn.commit()
-                conn.close()
-                
-                # Clear edit mode
-                st.session_state.edit_link_mode = False
-                st.session_state.edit_link_id = None
-                st.rerun()
+            col1, col2 = st.columns(2)
             
-            if cancel_button:
-                # Clear edit mode
-                st.session_state.edit_link_mode = False
-                st.session_state.edit_link_id = None
-                st.rerun()
+            with col1:
+                submit_button = st.form_submit_button("Save Link")
+            
+            with col2:
+                cancel_button = st.form_submit_button("Cancel")
+        
+        if submit_button:
+            if edit_mode:
+                save_quick_link(st.session_state.edit_link_id, name, category, url, description)
+                st.success(f"Link '{name}' updated successfully!")
+            else:
+                save_quick_link(None, name, category, url, description)
+                st.success(f"Link '{name}' added successfully!")
+            
+            # Clear edit mode
+            st.session_state.edit_link_mode = False
+            st.session_state.edit_link_id = None
+            rerun_fragment()
+        
+        if cancel_button:
+            # Clear edit mode
+            st.session_state.edit_link_mode = False
+            st.session_state.edit_link_id = None
+            rerun_fragment()
+
+# Owner filter option for action items nobody was named on
+UNASSIGNED = "(unassigned)"
+
+@st.fragment
+def show_action_items_tab():
+    """Action items parsed from meeting notes, rerun on their own as they are filtered, closed or promoted"""
+    st.subheader("Action Items")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        owners = get_action_item_owners()
+        owner_options = ["All", *owners, UNASSIGNED]
+        selected_owner = st.selectbox("Owner", options=owner_options, key="action_items_owner")
+    
+    with col2:
+        include_done = st.toggle("Include done items", key="action_items_include_done")
+    
+    owner = None if selected_owner == "All" else "" if selected_owner == UNASSIGNED else selected_owner
+    items_df = get_action_items(owner, include_done)
+    
+    if items_df.empty:
+        st.info("No action items. They are read from the Action Items field of meeting notes.")
+        return
+    
+    display_df = items_df.assign(done=items_df['done'].astype(bool), promoted=items_df['task_id'].notna())
+    display_df = display_df[['owner', 'description', 'due_date', 'done', 'promoted', 'meeting_title', 'meeting_date']]
+    
+    items_table = st.dataframe(display_df, use_container_width=True, hide_index=True, key="action_items_table",
+                               on_select="rerun", selection_mode="multi-row")
+    
+    selected_df = items_df.iloc[items_table["selection"]["rows"]]
+    
+    if len(selected_df):
+        clients_list = [*get_clients()['name'].tolist(), "Internal"]
+        task_types = list(assignment.TASK_TYPE_KEYWORDS)
+        
+        with st.form("action_items_form"):
+            st.markdown(f"**{len(selected_df)} selected item(s)**")
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                related_client = st.selectbox("Related Client", options=clients_list, index=len(clients_list) - 1)
+            with col2:
+                priority = st.selectbox("Priority", options=TASK_PRIORITIES, index=TASK_PRIORITIES.index("Medium"))
+            with col3:
+                task_type = st.selectbox("Task Type", options=task_types, index=task_types.index("Internal"))
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                promote_button = st.form_submit_button("Promote to Tasks")
+            with col2:
+                done_button = st.form_submit_button("Mark Done")
+        
+        if promote_button:
+            created = promote_action_items(selected_df['id'].tolist(), related_client, priority, task_type)
+            skipped = len(selected_df) - created
+            st.success(f"Created {created} task(s)" + (f"; {skipped} already had one" if skipped else ""))
+        
+        if done_button:
+            set_action_items_done(selected_df['id'].tolist())
+            st.success(f"Marked {len(selected_df)} item(s) done")
+        
+        if promote_button or done_button:
+            # Row positions shift once the change lands, so start from no selection
+            del st.session_state["action_items_table"]
+            rerun_fragment()
+
+def show_operations():
+    st.title("Operations Hub")
+    
+    # Each tab is a fragment that loads its own data
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["SOPs & Resources", "Team Directory", "Meeting Notes", "Quick Links",
+                                            "Action Items"])
+    
+    with tab1:
+        show_sops_tab()
+    
+    with tab2:
+        show_team_tab()
+    
+    with tab3:
+        show_meetings_tab()
+    
+    with tab4:
+        show_links_tab()
+    
+    with tab5:
+        show_action_items_tab()
+
+def show_agency_admin():
+    st.title("Agency Admin")
+    st.subheader("Cross-Agency KPIs")
+    
+    # Get data (every shard is queried in parallel)
+    kpis_df = get_cross_tenant_kpis()
+    failed_df = kpis_df[kpis_df['error'].notna()]
+    kpis_df = kpis_df[kpis_df['error'].isna()]
+    
+    for _, shard in failed_df.iterrows():
+        st.error(f"Could not read {shard['tenant_name']}: {shard['error']}")
+    
+    # Create metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Agencies", len(kpis_df))
+    
+    with col2:
+        st.metric("Total Clients", int(kpis_df['clients'].sum()))
+    
+    with col3:
+        st.metric("Monthly Revenue", f"${kpis_df['monthly_revenue'].sum():,.2f}")
+    
+    with col4:
+        st.metric("Overdue Tasks", int(kpis_df['overdue_tasks'].sum()))
+    
+    # Revenue by agency
+    fig = get_figure_cache().get_or_create("revenue_by_agency", kpis_df[['tenant_name', 'monthly_revenue']],
+                                           build_revenue_by_agency_bar)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Per-agency table
+    display_df = kpis_df.drop(columns=['tenant', 'error'])
+    display_df.columns = ['Agency', 'Clients', 'Active', 'Needs Attention', 'Monthly Revenue',
+                          'Open Tasks', 'Overdue Tasks', 'Ad Spend', 'Leads']
+    st.dataframe(display_df.style.format({'Monthly Revenue': '${:,.2f}', 'Ad Spend': '${:,.2f}'}),
+                 use_container_width=True)
 
 # Main app
 def main():
-    # Initialize database
-    init_db()
-    
     # Set up sidebar
     st.sidebar.title("MasterFLO.ai")
     st.sidebar.image("https://img.icons8.com/color/96/000000/karate.png", width=100)
     st.sidebar.subheader("Martial Arts Marketing Agency")
     
+    # Route this session to its agency's database
+    router = tenants.get_router()
+    tenant_ids = list(router.tenants)
+    
+    if len(tenant_ids) > 1:
+        allowed = authorized_tenants(router)
+        if not allowed:
+            st.info("Enter your agency's access code in the sidebar to open its dashboard.")
+            st.stop()
+        tenant = st.sidebar.selectbox("Agency", options=allowed,
+                                      format_func=lambda t: router.tenants[t]['name'], key="tenant")
+    else:
+        allowed = tenant_ids
+        tenant = tenant_ids[0]
+    
+    # Callbacks and fragment reruns run without main(), so the data layer
+    # reads the tenant back from the session (see session_tenant)
+    st.session_state.current_tenant = tenant
+    
+    # Initialize database (sample data only for a single agency)
+    migrate_all_shards()
+    init_database(get_db_path(), seed=len(tenant_ids) == 1)
+    start_archive_scheduler(get_db_path())
+    start_backup_scheduler(get_db_path())
+    start_audit_compactor(get_db_path())
+    start_link_checker(get_db_path())
+    
     # Navigation
-    page = st.sidebar.radio("Navigation", ["Dashboard", "Clients", "Team Tasks", "Campaign Tracker", "Operations Hub"])
+    pages = ["Dashboard", "Clients", "Team Tasks", "Campaign Tracker", "Operations Hub"]
+    # Cross-agency KPIs only for sessions that may open every agency
+    if len(tenant_ids) > 1 and len(allowed) == len(tenant_ids):
+        pages.append("Agency Admin")
+    
+    page = st.sidebar.radio("Navigation", pages)
     
     # Display selected page
     if page == "Dashboard":
@@ -1843,6 +2135,8 @@ def main():
         show_campaigns()
     elif page == "Operations Hub":
         show_operations()
+    elif page == "Agency Admin":
+        show_agency_admin()
     
     # Footer
     st.sidebar.markdown("---")
@@ -0,0 +1,163 @@
+"""Hot/cold archival for the MasterFLO.ai dashboard database.
+
+Done tasks and old meeting notes are moved out of the hot tables into a
+separate archive database file next to the main one, so the Kanban board
+and the meeting list only scan recent rows. The move runs in a single
+transaction across both files, so a row is never in both stores or neither.
+
+Run it from cron (or any scheduler) with:
+
+    python archive.py --db masterflo_dashboard.db --task-age-days 90
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+
+# Done tasks are archived once their due date is this many days old
+TASK_ARCHIVE_AGE_DAYS = 90
+
+# Meetings are archived once they are older than the retention window
+MEETING_RETENTION_DAYS = 365
+
+# How often the in-app scheduler runs an archival pass
+ARCHIVE_INTERVAL_HOURS = 24
+
+logger = logging.getLogger(__name__)
+
+# Hot table -> (archive table, date column used for the age cut-off, extra filter)
+ARCHIVE_RULES = {
+    "tasks": ("tasks_archive", "due_date", "status = 'Done'"),
+    "meeting_notes": ("meeting_notes_archive", "date", "1 = 1"),
+}
+
+def archive_path_for(db_path):
+    """Return the archive database file that pairs with a hot database file"""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}_archive{ext or '.db'}"
+
+def _table_columns(conn, schema, table):
+    """Return (name, declared type) for the stored columns of a table"""
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _ensure_archive_table(conn, table, archive_table):
+    """Create or widen the archive table so it has every column of the hot table"""
+    hot_columns = _table_columns(conn, "main", table)
+
+    # Hot tables use plain INTEGER PRIMARY KEY, so SQLite can hand an archived
+    # row's id to a new row. The archive therefore keys on its own rowid and
+    # only indexes the original id.
+    column_defs = ", ".join(f"{name} {col_type}" for name, col_type in hot_columns)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS archive.{archive_table} ({column_defs}, archived_at TEXT)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{archive_table}_id ON {archive_table} (id)")
+
+    # Pick up columns added to the hot table after the archive was created
+    archived_names = {name for name, _ in _table_columns(conn, "archive", archive_table)}
+    for name, col_type in hot_columns:
+        if name not in archived_names:
+            conn.execute(f"ALTER TABLE archive.{archive_table} ADD COLUMN {name} {col_type}")
+
+    return [name for name, _ in hot_columns]
+
+def _connect_with_archive(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_path_for(db_path),))
+    return conn
+
+def run_archival(db_path=DB_PATH, task_age_days=TASK_ARCHIVE_AGE_DAYS,
+                 meeting_retention_days=MEETING_RETENTION_DAYS, dry_run=False, now=None):
+    """Move aged rows from the hot tables into the archive database.
+
+    Returns a dict mapping each hot table to the number of rows moved (or that
+    would be moved, with dry_run=True).
+    """
+    now = now or datetime.now()
+    cutoffs = {
+        "tasks": (now - timedelta(days=task_age_days)).strftime("%Y-%m-%d"),
+        "meeting_notes": (now - timedelta(days=meeting_retention_days)).strftime("%Y-%m-%d"),
+    }
+
+    conn = _connect_with_archive(db_path)
+    moved = {}
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        for table, (archive_table, date_column, row_filter) in ARCHIVE_RULES.items():
+            where = f"{row_filter} AND {date_column} IS NOT NULL AND {date_column} < ?"
+            params = (cutoffs[table],)
+
+            if dry_run:
+                moved[table] = conn.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where}", params).fetchone()[0]
+                continue
+
+            columns = ", ".join(_ensure_archive_table(conn, table, archive_table))
+            conn.execute(f'''
+            INSERT INTO archive.{archive_table} ({columns}, archived_at)
+            SELECT {columns}, CURRENT_TIMESTAMP FROM main.{table} WHERE {where}
+            ''', params)
+            moved[table] = conn.execute(f"DELETE FROM main.{table} WHERE {where}", params).rowcount
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return moved
+
+def get_archived(table, db_path=DB_PATH):
+    """Return the archived rows for a hot table (empty if nothing was archived yet)"""
+    archive_table = ARCHIVE_RULES[table][0]
+    archive_path = archive_path_for(db_path)
+
+    if not os.path.exists(archive_path):
+        return pd.DataFrame()
+
+    conn = sqlite3.connect(archive_path)
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (archive_table,)).fetchone()
+    df = pd.read_sql_query(f"SELECT * FROM {archive_table}", conn) if exists else pd.DataFrame()
+    conn.close()
+    return df
+
+def start_scheduler(db_path=DB_PATH, interval_hours=ARCHIVE_INTERVAL_HOURS):
+    """Run an archival pass every `interval_hours` on a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                run_archival(db_path)
+            except Exception:
+                # A failed pass is retried on the next interval
+                logger.exception("Archival pass failed")
+
+    thread = threading.Thread(target=run, name="masterflo-archiver", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive Done tasks and old meeting notes.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--task-age-days", type=int, default=TASK_ARCHIVE_AGE_DAYS,
+                        help="Archive Done tasks whose due date is older than this")
+    parser.add_argument("--meeting-retention-days", type=int, default=MEETING_RETENTION_DAYS,
+                        help="Archive meetings older than this")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be moved")
+    args = parser.parse_args()
+
+    moved = run_archival(args.db, args.task_age_days, args.meeting_retention_days, args.dry_run)
+    verb = "Would archive" if args.dry_run else "Archived"
+    for table, count in moved.items():
+        print(f"{verb} {count} row(s) from {table} into {archive_path_for(args.db)}")
+
+if __name__ == "__main__":
+    main()
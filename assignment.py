@@ -0,0 +1,264 @@
+"""Assignee recommendations for new and edited tasks.
+
+Each team member is scored on:
+
+- skills: how many of the task's keywords (its type's keywords from
+  TASK_TYPE_KEYWORDS plus the words of its title) match the member's listed
+  skills, looked up in an inverted index from skill word to members that is
+  built once per version of team_directory;
+- experience: how many tasks of the same type they have (open or done);
+- availability: their open estimated hours due by the task's due date
+  against the hours they can work until then, and their overall backlog.
+
+Experience and load come from assignee_load, a small table holding open
+task counts and remaining hours per member, task type and due day, and done
+task counts per member and task type (under due day 0). Triggers on tasks
+keep it current inside the same transaction as every insert, update and
+delete, so a recommendation costs one grouped read of that table, which is
+itself cached per version of the tasks table.
+
+    python assignment.py --db masterflo_dashboard.db --type "Ad Creation" --due 2025-04-10
+"""
+import argparse
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+import pandas as pd
+
+import team_search
+import workload
+
+DB_PATH = "masterflo_dashboard.db"
+
+# Skill words that suit each task type, on top of the words in the task title
+TASK_TYPE_KEYWORDS = {
+    "Ad Creation": "ads meta google creative design",
+    "Content": "content copywriting writing strategy",
+    "Website": "website web landing wordpress development",
+    "Reporting": "reporting analytics",
+    "Client Communication": "client management communication",
+    "Internal": "",
+    "GHL": "ghl automation",
+}
+
+# Skill words match on their first letters, so "design" matches "designer"
+SKILL_PREFIX_LENGTH = 5
+
+# Matching this many distinct skill words gives the full skill score
+FULL_SKILL_MATCHES = 2
+
+# Days of work assumed per week, and weeks of open hours counted as a full backlog
+WORKING_DAYS_PER_WEEK = 5
+BACKLOG_WEEKS = 2
+
+# How the three scores combine
+WEIGHTS = {"skills": 0.5, "experience": 0.2, "availability": 0.3}
+
+SUGGESTION_LIMIT = 5
+
+LOAD_COLUMNS = ("assigned_to", "task_type", "due_day", "status", "estimated_hours", "actual_hours")
+
+def _contribution(row):
+    """Columns a task row ("NEW"/"OLD") adds to its assignee_load entry"""
+    is_open = f"COALESCE({row}.status, '') != 'Done'"
+    return (f"{row}.assigned_to, COALESCE({row}.task_type, ''), CASE WHEN {is_open} THEN COALESCE({row}.due_day, 0) ELSE 0 END, "
+            f"CASE WHEN {is_open} THEN 1 ELSE 0 END, "
+            f"CASE WHEN {is_open} THEN MAX(COALESCE({row}.estimated_hours, 0) - COALESCE({row}.actual_hours, 0), 0) ELSE 0 END, "
+            f"CASE WHEN {is_open} THEN 0 ELSE 1 END")
+
+def _add_sql(row):
+    return f'''
+    INSERT INTO assignee_load (member, task_type, due_day, open_tasks, open_hours, done_tasks)
+    SELECT {_contribution(row)} WHERE {row}.assigned_to IS NOT NULL
+    ON CONFLICT (member, task_type, due_day) DO UPDATE SET
+        open_tasks = open_tasks + excluded.open_tasks,
+        open_hours = open_hours + excluded.open_hours,
+        done_tasks = done_tasks + excluded.done_tasks;
+    '''
+
+def _remove_sql(row):
+    is_open = f"COALESCE({row}.status, '') != 'Done'"
+    key = (f"member = {row}.assigned_to AND task_type = COALESCE({row}.task_type, '') "
+           f"AND due_day = CASE WHEN {is_open} THEN COALESCE({row}.due_day, 0) ELSE 0 END")
+    return f'''
+    UPDATE assignee_load SET
+        open_tasks = open_tasks - CASE WHEN {is_open} THEN 1 ELSE 0 END,
+        open_hours = CASE WHEN {is_open} AND open_tasks > 1
+                          THEN open_hours - MAX(COALESCE({row}.estimated_hours, 0) - COALESCE({row}.actual_hours, 0), 0)
+                          WHEN {is_open} THEN 0 ELSE open_hours END,
+        done_tasks = done_tasks - CASE WHEN {is_open} THEN 0 ELSE 1 END
+    WHERE {key};
+    DELETE FROM assignee_load WHERE {key} AND open_tasks <= 0 AND done_tasks <= 0;
+    '''
+
+def create_assignee_load(conn):
+    """Create assignee_load and the triggers that keep it in step with tasks"""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assignee_load'").fetchone()
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS assignee_load (
+        member TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        due_day INTEGER NOT NULL,
+        open_tasks INTEGER NOT NULL DEFAULT 0,
+        open_hours REAL NOT NULL DEFAULT 0,
+        done_tasks INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (member, task_type, due_day)
+    )
+    ''')
+
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_assignee_load_insert
+    AFTER INSERT ON tasks
+    BEGIN
+        {_add_sql("NEW")}
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_assignee_load_update
+    AFTER UPDATE OF assigned_to, task_type, due_date, status, estimated_hours, actual_hours ON tasks
+    WHEN {" OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in LOAD_COLUMNS)}
+    BEGIN
+        {_remove_sql("OLD")}
+        {_add_sql("NEW")}
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_assignee_load_delete
+    AFTER DELETE ON tasks
+    BEGIN
+        {_remove_sql("OLD")}
+    END
+    ''')
+
+    if not exists:
+        rebuild_assignee_load(conn)
+
+def rebuild_assignee_load(conn):
+    """Recompute assignee_load from scratch from the tasks table"""
+    conn.execute("DELETE FROM assignee_load")
+    conn.execute('''
+    INSERT INTO assignee_load (member, task_type, due_day, open_tasks, open_hours, done_tasks)
+    SELECT assigned_to, COALESCE(task_type, ''), CASE WHEN COALESCE(status, '') != 'Done' THEN COALESCE(due_day, 0) ELSE 0 END,
+           SUM(COALESCE(status, '') != 'Done'),
+           SUM(CASE WHEN COALESCE(status, '') != 'Done'
+                    THEN MAX(COALESCE(estimated_hours, 0) - COALESCE(actual_hours, 0), 0) ELSE 0 END),
+           SUM(COALESCE(status, '') = 'Done')
+    FROM tasks
+    WHERE assigned_to IS NOT NULL
+    GROUP BY 1, 2, 3
+    ''')
+
+def rebuild(db_path=DB_PATH):
+    """Rebuild assignee_load in one transaction; returns its row count"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rebuild_assignee_load(conn)
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM assignee_load").fetchone()[0]
+    finally:
+        conn.close()
+
+def skill_key(word):
+    return word[:SKILL_PREFIX_LENGTH]
+
+@lru_cache(maxsize=16)
+def _cached_skill_index(db_path, directory_version):
+    """({skill key: {member: skill word}}, member names) for one version of the directory"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT name, skills FROM team_directory WHERE name IS NOT NULL ORDER BY name").fetchall()
+    conn.close()
+
+    index = {}
+    for name, skills in rows:
+        for word in team_search.tokenize(skills):
+            index.setdefault(skill_key(word), {}).setdefault(name, word)
+    return index, tuple(dict.fromkeys(name for name, _ in rows))
+
+def get_skill_index(db_path):
+    return _cached_skill_index(db_path, team_search.get_directory_version(db_path))
+
+@lru_cache(maxsize=64)
+def _cached_member_load(db_path, tasks_version, task_type, until_day):
+    """Per member: all open hours, open hours due by `until_day`, and tasks of this type"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query('''
+    SELECT member,
+           SUM(open_hours) AS open_hours,
+           SUM(CASE WHEN due_day BETWEEN 1 AND :until THEN open_hours ELSE 0 END) AS due_hours,
+           SUM(CASE WHEN task_type = :task_type THEN open_tasks + done_tasks ELSE 0 END) AS type_tasks
+    FROM assignee_load
+    GROUP BY member
+    ''', conn, params={"until": until_day, "task_type": task_type or ""})
+    conn.close()
+    return df.set_index("member")
+
+def load_member_load(db_path, task_type, until_day):
+    return _cached_member_load(db_path, workload.get_tasks_version(db_path), task_type or "", until_day)
+
+def _julian_day(day):
+    return int(pd.Timestamp(day).to_julian_date())
+
+def recommend_assignees(db_path, task_type=None, title="", due_date=None, estimated_hours=0.0,
+                        today=None, limit=SUGGESTION_LIMIT):
+    """Best-suited team members for a task, best first.
+
+    Returns a frame with member, score (0-1), matched skills, open hours,
+    hours due by the task's due date and tasks of the same type.
+    """
+    today = pd.Timestamp(today or date.today()).normalize()
+    due = pd.Timestamp(due_date).normalize() if due_date is not None and pd.notna(due_date) else today
+    working_days = max(1, len(pd.bdate_range(today, max(due, today))))
+
+    index, members = get_skill_index(db_path)
+    load = load_member_load(db_path, task_type, _julian_day(due)).reindex(list(members), fill_value=0)
+
+    # Skills: distinct skill words of each member matched by the task's keywords
+    keywords = team_search.tokenize(f"{TASK_TYPE_KEYWORDS.get(task_type, '')} {title}")
+    matched = {member: [] for member in members}
+    for key in dict.fromkeys(skill_key(word) for word in keywords):
+        for member, word in index.get(key, {}).items():
+            matched[member].append(word)
+    skills = pd.Series({member: min(len(words), FULL_SKILL_MATCHES) / FULL_SKILL_MATCHES
+                        for member, words in matched.items()}, dtype=float)
+
+    most_tasks = load["type_tasks"].max()
+    experience = load["type_tasks"] / most_tasks if most_tasks > 0 else load["type_tasks"] * 0.0
+
+    daily_hours = workload.WEEKLY_CAPACITY_HOURS / WORKING_DAYS_PER_WEEK
+    due_load = (load["due_hours"] + float(estimated_hours or 0)) / (daily_hours * working_days)
+    backlog = load["open_hours"] / (workload.WEEKLY_CAPACITY_HOURS * BACKLOG_WEEKS)
+    availability = (1 - (0.7 * due_load + 0.3 * backlog)).clip(0, 1)
+
+    scores = (WEIGHTS["skills"] * skills.reindex(load.index, fill_value=0)
+              + WEIGHTS["experience"] * experience
+              + WEIGHTS["availability"] * availability)
+
+    results = pd.DataFrame({
+        "member": load.index,
+        "score": scores.round(3).values,
+        "skills": [", ".join(matched[member]) for member in load.index],
+        "open_hours": load["open_hours"].round(1).values,
+        "due_hours": load["due_hours"].round(1).values,
+        "type_tasks": load["type_tasks"].astype(int).values,
+    })
+    return results.sort_values(["score", "member"], ascending=[False, True], ignore_index=True).head(limit)
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest assignees for a task.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--type", dest="task_type", choices=list(TASK_TYPE_KEYWORDS))
+    parser.add_argument("--title", default="")
+    parser.add_argument("--due", type=lambda value: datetime.strptime(value, "%Y-%m-%d"), help="Due date (YYYY-MM-DD)")
+    parser.add_argument("--hours", type=float, default=0.0, help="Estimated hours")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the assignee load table first")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild(args.db)
+
+    print(recommend_assignees(args.db, args.task_type, args.title, args.due, args.hours).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
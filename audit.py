@@ -0,0 +1,228 @@
+"""Append-only change log for the dashboard tables.
+
+Triggers on every audited table append a row to audit_log inside the same
+transaction as the write, so no write path (forms, bulk edits, imports,
+scripts) can change a record without leaving a trace, and a rolled-back
+write leaves none. Each entry stores only what changed, as a JSON object
+mapping column -> [old, new]:
+
+- insert: the new record's non-empty fields;
+- update: only the fields whose value changed (no-op updates log nothing);
+- delete: no fields, just the fact (the record's history is already logged).
+
+audit_log is indexed on (table_name, record_id, changed_at), so a record's
+history is an index range scan however large the log grows. Entries older
+than AUDIT_COMPACT_AFTER_DAYS are periodically compacted into a single entry
+per record holding each field's earliest old and latest new value.
+
+    python audit.py compact --db masterflo_dashboard.db
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+
+AUDITED_TABLES = ("clients", "tasks", "campaigns", "sops", "team_directory", "meeting_notes", "quick_links")
+
+# Columns never logged
+UNAUDITED_COLUMNS = ("id", "created_at")
+
+# Entries older than this are compacted into one entry per record
+AUDIT_COMPACT_AFTER_DAYS = 180
+
+# How often the in-app scheduler compacts the log
+AUDIT_COMPACT_INTERVAL_HOURS = 24
+
+# Records compacted per transaction
+COMPACT_BATCH_RECORDS = 100
+
+logger = logging.getLogger(__name__)
+
+def create_audit_log(conn):
+    """Create audit_log and (re)create the triggers that fill it"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        record_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        changes TEXT NOT NULL,
+        changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_record ON audit_log (table_name, record_id, changed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_changed_at ON audit_log (changed_at)")
+
+    for table in AUDITED_TABLES:
+        # table_info leaves out generated columns, which can't be written anyway
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+                   if row[1] not in UNAUDITED_COLUMNS]
+        for name, sql in _trigger_sql(table, columns).items():
+            _ensure_trigger(conn, name, sql)
+
+def _trigger_sql(table, columns):
+    def field_rows(old, new):
+        return " UNION ALL ".join(f"SELECT '{col}' AS col, {old.format(col=col)} AS o, {new.format(col=col)} AS n"
+                                  for col in columns)
+
+    inserted = f"(SELECT json_group_object(col, json_array(o, n)) FROM ({field_rows('NULL', 'NEW.{col}')}) WHERE n IS NOT NULL)"
+    updated = f"(SELECT json_group_object(col, json_array(o, n)) FROM ({field_rows('OLD.{col}', 'NEW.{col}')}) WHERE o IS NOT n)"
+    any_changed = " OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in columns)
+
+    return {
+        f"{table}_audit_insert": (
+            f"CREATE TRIGGER {table}_audit_insert AFTER INSERT ON {table}\n"
+            f"BEGIN\n"
+            f"    INSERT INTO audit_log (table_name, record_id, action, changes) "
+            f"VALUES ('{table}', NEW.id, 'insert', {inserted});\n"
+            f"END"),
+        f"{table}_audit_update": (
+            f"CREATE TRIGGER {table}_audit_update AFTER UPDATE ON {table}\n"
+            f"WHEN {any_changed}\n"
+            f"BEGIN\n"
+            f"    INSERT INTO audit_log (table_name, record_id, action, changes) "
+            f"VALUES ('{table}', NEW.id, 'update', {updated});\n"
+            f"END"),
+        f"{table}_audit_delete": (
+            f"CREATE TRIGGER {table}_audit_delete AFTER DELETE ON {table}\n"
+            f"BEGIN\n"
+            f"    INSERT INTO audit_log (table_name, record_id, action, changes) "
+            f"VALUES ('{table}', OLD.id, 'delete', '{{}}');\n"
+            f"END"),
+    }
+
+def _ensure_trigger(conn, name, sql):
+    """Create a trigger, replacing it only if its definition changed (e.g. a column was added)"""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+    if row and row[0] == sql:
+        return
+    if row:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute(sql)
+
+def get_history(db_path, table, record_id, limit=50):
+    """The latest `limit` changes to one record, newest first, one row per changed field"""
+    conn = sqlite3.connect(db_path)
+    entries = conn.execute('''
+    SELECT changed_at, action, changes
+    FROM audit_log
+    WHERE table_name = ? AND record_id = ?
+    ORDER BY changed_at DESC, id DESC
+    LIMIT ?
+    ''', (table, int(record_id), limit)).fetchall()
+    conn.close()
+
+    rows = []
+    for changed_at, action, changes in entries:
+        fields = json.loads(changes)
+        if not fields:
+            rows.append({"changed_at": changed_at, "action": action, "field": "", "old": None, "new": None})
+        for field, (old, new) in fields.items():
+            rows.append({"changed_at": changed_at, "action": action, "field": field, "old": old, "new": new})
+    return pd.DataFrame(rows, columns=["changed_at", "action", "field", "old", "new"])
+
+def merge_changes(entries):
+    """Fold consecutive change dicts into one: each field's first old and last new value"""
+    merged = {}
+    for changes in entries:
+        for field, (old, new) in changes.items():
+            merged[field] = [merged[field][0] if field in merged else old, new]
+    return {field: values for field, values in merged.items() if values[0] != values[1]}
+
+def compact(db_path=DB_PATH, older_than_days=AUDIT_COMPACT_AFTER_DAYS, now=None):
+    """Collapse each record's entries older than the cut-off into one entry.
+
+    A record whose old entries end with its deletion keeps that delete entry
+    after the compacted one. Returns (records compacted, entries removed).
+    """
+    cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = sqlite3.connect(db_path)
+    records = conn.execute('''
+    SELECT table_name, record_id
+    FROM audit_log
+    WHERE changed_at < ?
+    GROUP BY table_name, record_id
+    HAVING COUNT(*) > 1
+    ''', (cutoff,)).fetchall()
+
+    compacted = removed = 0
+    try:
+        for start in range(0, len(records), COMPACT_BATCH_RECORDS):
+            conn.execute("BEGIN IMMEDIATE")
+            for table, record_id in records[start:start + COMPACT_BATCH_RECORDS]:
+                entries = conn.execute('''
+                SELECT id, action, changes, changed_at
+                FROM audit_log
+                WHERE table_name = ? AND record_id = ? AND changed_at < ?
+                ORDER BY changed_at, id
+                ''', (table, record_id, cutoff)).fetchall()
+                if len(entries) < 2:
+                    continue
+
+                deleted = entries[-1][1] == "delete"
+                kept = entries[:-1] if deleted else entries
+                if len(kept) < 2 or any(e[1] == "delete" for e in kept):
+                    # Nothing to merge, or the id was reused after a delete
+                    continue
+                action = "insert" if kept[0][1] == "insert" else "compacted"
+                changes = json.dumps(merge_changes(json.loads(e[2]) for e in kept), separators=(",", ":"))
+
+                conn.execute(f"DELETE FROM audit_log WHERE id IN ({','.join('?' * len(kept))})",
+                             [e[0] for e in kept])
+                conn.execute('''
+                INSERT INTO audit_log (table_name, record_id, action, changes, changed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ''', (table, record_id, action, changes, kept[-1][3]))
+                compacted += 1
+                removed += len(kept) - 1
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return compacted, removed
+
+def start_scheduler(db_path=DB_PATH, interval_hours=AUDIT_COMPACT_INTERVAL_HOURS):
+    """Compact the audit log every `interval_hours` on a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                compact(db_path)
+            except Exception:
+                logger.exception("Audit log compaction failed")
+
+    thread = threading.Thread(target=run, name="masterflo-audit-compactor", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and compact the audit log.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact_ = commands.add_parser("compact", help="Collapse old entries into one per record")
+    compact_.add_argument("--older-than-days", type=int, default=AUDIT_COMPACT_AFTER_DAYS)
+    history = commands.add_parser("history", help="Show a record's change history")
+    history.add_argument("table", choices=AUDITED_TABLES)
+    history.add_argument("record_id", type=int)
+    history.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        records, removed = compact(args.db, args.older_than_days)
+        print(f"Compacted {records} record(s), removing {removed} entr{'y' if removed == 1 else 'ies'}")
+    else:
+        print(get_history(args.db, args.table, args.record_id, args.limit).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Online backups and point-in-time snapshots of the dashboard database.
+
+Snapshots are taken with SQLite's online backup API rather than by copying
+the file, so a backup is always a consistent database even while the app is
+writing. The copy proceeds a few hundred pages at a time with a short pause
+between steps, which lets the dashboard's writers get the lock in between
+instead of stalling behind one long copy.
+
+Each snapshot is written under a temporary name, checked with
+PRAGMA integrity_check and only then renamed into place, and the oldest
+snapshots beyond the retention count are deleted. Restores check the
+snapshot first, keep a safety copy of the current database, and check the
+result again.
+
+    python backup.py create --db masterflo_dashboard.db
+    python backup.py list
+    python backup.py restore --at "2025-04-01 09:00"
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DB_PATH = "masterflo_dashboard.db"
+BACKUP_DIR = "backups"
+
+# Pages copied per backup step, and the pause between steps (seconds)
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_PAUSE = 0.005
+
+# SQLite restarts a stepped backup whenever another connection writes to the
+# source. After this many restarts the rest of the copy is done in one step,
+# which briefly holds off writers but always finishes.
+BACKUP_MAX_RESTARTS = 3
+
+# Snapshots kept per database
+BACKUP_KEEP = 14
+
+# How often the in-app scheduler takes a snapshot
+BACKUP_INTERVAL_HOURS = 6
+
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+
+logger = logging.getLogger(__name__)
+
+class BackupError(Exception):
+    """A snapshot or restore failed verification"""
+
+def snapshot_dir(db_path, backup_dir=BACKUP_DIR):
+    """Directory holding the snapshots of one database file"""
+    return os.path.join(backup_dir, os.path.splitext(os.path.basename(db_path))[0])
+
+def integrity_check(path):
+    """Return the problems PRAGMA integrity_check reports (empty when the file is sound)"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as e:
+        problems = [str(e)]
+    finally:
+        conn.close()
+    return [] if problems == ["ok"] else problems
+
+class _BackupRestarting(Exception):
+    pass
+
+def copy_database(source, target, pages=BACKUP_STEP_PAGES, pause=BACKUP_STEP_PAUSE,
+                  max_restarts=BACKUP_MAX_RESTARTS):
+    """Copy one open database into another in small steps, pausing between them.
+
+    Returns the number of times concurrent writes restarted the copy.
+    """
+    if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        # Under WAL a reader never blocks writers, so one step costs them nothing
+        source.backup(target)
+        return 0
+
+    state = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] >= max_restarts:
+                raise _BackupRestarting()
+        state["remaining"] = remaining
+        if remaining and pause:
+            time.sleep(pause)
+
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    except _BackupRestarting:
+        source.backup(target)
+    return state["restarts"]
+
+def create_snapshot(db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP, label=None, now=None):
+    """Take a verified snapshot of a live database and prune old ones. Returns the snapshot path."""
+    now = now or datetime.now()
+    directory = snapshot_dir(db_path, backup_dir)
+    os.makedirs(directory, exist_ok=True)
+
+    name = now.strftime(SNAPSHOT_TIME_FORMAT) + (f"-{label}" if label else "")
+    path = os.path.join(directory, f"{name}.db")
+    partial_path = path + ".partial"
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(partial_path)
+    try:
+        copy_database(source, target)
+    finally:
+        target.close()
+        source.close()
+
+    problems = integrity_check(partial_path)
+    if problems:
+        os.remove(partial_path)
+        raise BackupError(f"Snapshot of {db_path} failed the integrity check: {problems[:3]}")
+
+    os.replace(partial_path, path)
+    prune_snapshots(db_path, backup_dir, keep)
+    return path
+
+def list_snapshots(db_path=DB_PATH, backup_dir=BACKUP_DIR):
+    """Snapshots of a database, oldest first, as dicts with path, taken_at and size"""
+    directory = snapshot_dir(db_path, backup_dir)
+    if not os.path.isdir(directory):
+        return []
+
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not filename.endswith(".db"):
+            continue
+        try:
+            taken_at = datetime.strptime(filename[:15], SNAPSHOT_TIME_FORMAT)
+        except ValueError:
+            continue
+        path = os.path.join(directory, filename)
+        snapshots.append({"path": path, "taken_at": taken_at, "size": os.path.getsize(path)})
+
+    return sorted(snapshots, key=lambda s: (s["taken_at"], s["path"]))
+
+def prune_snapshots(db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Delete all but the newest `keep` snapshots. Returns the deleted paths."""
+    snapshots = list_snapshots(db_path, backup_dir)
+    expired = snapshots[:-keep] if keep > 0 else []
+    for snapshot in expired:
+        os.remove(snapshot["path"])
+    return [s["path"] for s in expired]
+
+def find_snapshot(db_path=DB_PATH, backup_dir=BACKUP_DIR, at=None):
+    """The newest snapshot taken at or before `at` (the newest overall by default)"""
+    snapshots = [s for s in list_snapshots(db_path, backup_dir) if at is None or s["taken_at"] <= at]
+    if not snapshots:
+        raise BackupError(f"No snapshot of {db_path}" + (f" taken before {at}" if at else ""))
+    return snapshots[-1]["path"]
+
+def _table_versions(conn):
+    try:
+        return dict(conn.execute("SELECT table_name, version FROM table_versions"))
+    except sqlite3.OperationalError:
+        return {}
+
+def _advance_table_versions(conn, versions_before):
+    """Move every table version past both its old and its restored value.
+
+    Caches are keyed by table version, so a restore that rolled versions
+    back could otherwise make later writes reuse a cached version number.
+    """
+    restored = _table_versions(conn)
+    conn.executemany("UPDATE table_versions SET version = ? WHERE table_name = ?",
+                     [(max(version, versions_before.get(table, 0)) + 1, table)
+                      for table, version in restored.items()])
+    conn.commit()
+
+def restore_snapshot(snapshot_path, db_path=DB_PATH, backup_dir=BACKUP_DIR):
+    """Replace a database's contents with a snapshot, online.
+
+    The snapshot is checked before anything is touched, and the current
+    database is saved as a "pre-restore" snapshot first. Returns the path of
+    that safety snapshot.
+    """
+    problems = integrity_check(snapshot_path)
+    if problems:
+        raise BackupError(f"{snapshot_path} failed the integrity check: {problems[:3]}")
+
+    safety_path = create_snapshot(db_path, backup_dir, keep=0, label="pre-restore") \
+        if os.path.exists(db_path) else None
+
+    source = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    target = sqlite3.connect(db_path)
+    try:
+        versions_before = _table_versions(target)
+        copy_database(source, target)
+        _advance_table_versions(target, versions_before)
+    finally:
+        target.close()
+        source.close()
+
+    problems = integrity_check(db_path)
+    if problems:
+        raise BackupError(f"Restored {db_path} failed the integrity check: {problems[:3]}; "
+                          f"the previous contents are in {safety_path}")
+    return safety_path
+
+def next_snapshot_delay(db_path=DB_PATH, backup_dir=BACKUP_DIR, interval_hours=BACKUP_INTERVAL_HOURS, now=None):
+    """Seconds until the next scheduled snapshot: 0 when none exists or the newest is overdue"""
+    snapshots = list_snapshots(db_path, backup_dir)
+    if not snapshots:
+        return 0.0
+    age = ((now or datetime.now()) - snapshots[-1]["taken_at"]).total_seconds()
+    return max(interval_hours * 3600 - age, 0.0)
+
+def start_scheduler(db_path=DB_PATH, interval_hours=BACKUP_INTERVAL_HOURS, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Take a snapshot every `interval_hours` on a daemon thread.
+
+    The first one is due `interval_hours` after the newest existing snapshot,
+    so restarting the app more often than that doesn't skip backups.
+    """
+    def run():
+        delay = next_snapshot_delay(db_path, backup_dir, interval_hours)
+        while True:
+            time.sleep(delay)
+            delay = interval_hours * 3600
+            try:
+                create_snapshot(db_path, backup_dir, keep)
+            except Exception:
+                logger.exception("Backup of %s failed", db_path)
+
+    thread = threading.Thread(target=run, name="masterflo-backup", daemon=True)
+    thread.start()
+    return thread
+
+def parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up and restore the dashboard database.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--backup-dir", default=BACKUP_DIR, help="Directory snapshots are kept under")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Take a snapshot now")
+    create.add_argument("--keep", type=int, default=BACKUP_KEEP, help="Snapshots to keep")
+    commands.add_parser("list", help="List snapshots")
+    restore = commands.add_parser("restore", help="Restore a snapshot (the newest by default)")
+    restore.add_argument("snapshot", nargs="?", help="Snapshot file to restore")
+    restore.add_argument("--at", type=parse_time, help="Restore the newest snapshot taken at or before this time")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            print(f"Created {create_snapshot(args.db, args.backup_dir, args.keep)}")
+        elif args.command == "list":
+            for snapshot in list_snapshots(args.db, args.backup_dir):
+                print(f"{snapshot['taken_at']:%Y-%m-%d %H:%M:%S}  {snapshot['size'] / 1024:>10,.0f} KB  {snapshot['path']}")
+        else:
+            snapshot = args.snapshot or find_snapshot(args.db, args.backup_dir, args.at)
+            safety_path = restore_snapshot(snapshot, args.db, args.backup_dir)
+            print(f"Restored {args.db} from {snapshot}" + (f" (previous contents saved to {safety_path})" if safety_path else ""))
+    except BackupError as e:
+        raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    main()
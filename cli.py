@@ -0,0 +1,243 @@
+"""Command line interface for the MasterFLO.ai dashboard data.
+
+Runs batch work against the same data layer as the dashboard, without
+starting Streamlit:
+
+    python cli.py migrate --all
+    python cli.py seed
+    python cli.py import clients clients.csv
+    python cli.py export tasks --output tasks.csv
+    python cli.py report spend_vs_budget
+    python cli.py client-reports --month 2025-04
+    python cli.py recompute anomalies
+    python cli.py recompute links --full
+    python cli.py archive --dry-run
+    python cli.py backup
+    python cli.py restore --at "2025-04-01 09:00"
+    python cli.py history clients 12
+    python cli.py compact-audit
+
+Commands work on the default agency; pick another with --tenant, or point
+at any database file with --db (or the MASTERFLO_DB_PATH variable).
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+import action_items
+import analytics
+import anomalies
+import archive
+import assignment
+import audit
+import backup
+import client_reports
+import database
+import linkcheck
+import tenants
+
+def run_anomaly_scan(db_path, full=False):
+    result = anomalies.run_scan(db_path, full=full)
+    return (f"Scanned {result['snapshots']} snapshot(s): {result['alerts']} new alert(s), "
+            f"{result['resolved']} resolved")
+
+def run_link_checks(db_path, full=False):
+    result = linkcheck.run_checks(db_path, force=full)
+    return f"Checked {result['checked']} of {result['urls']} URL(s): {result['broken']} broken"
+
+def rebuild_assignee_load(db_path, full=False):
+    return f"Rebuilt {assignment.rebuild(db_path)} assignee load row(s)"
+
+def resync_action_items(db_path, full=False):
+    return f"Parsed {action_items.resync(db_path)} action item(s)"
+
+# Derived data that `recompute` can rebuild. Each job takes (db_path, full)
+# and returns a one-line summary.
+RECOMPUTE_JOBS = {
+    "anomalies": run_anomaly_scan,
+    "links": run_link_checks,
+    "assignees": rebuild_assignee_load,
+    "action-items": resync_action_items,
+}
+
+def write_frame(df, output=None, fmt="csv"):
+    """Write a frame as CSV (to a file or stdout) or as a plain-text table"""
+    if fmt == "table":
+        text = df.to_string(index=False)
+        if output:
+            with open(output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    else:
+        df.to_csv(output or sys.stdout, index=False)
+
+def cmd_migrate(args):
+    if args.all:
+        tenants.get_router().migrate_all(lambda db_path: database.init_db(db_path, seed=False))
+        print(f"Migrated {len(tenants.get_router().tenants)} database(s)")
+    else:
+        database.init_db(seed=False)
+        print(f"Migrated {database.get_db_path()}")
+
+def cmd_seed(args):
+    database.init_db(seed=False)
+    conn = database.get_connection()
+    has_clients = conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0] > 0
+    if has_clients and not args.force:
+        conn.close()
+        print(f"{database.get_db_path()} already has data; use --force to add the sample data anyway")
+        return
+    database.insert_sample_data(conn)
+    conn.close()
+    print(f"Added sample data to {database.get_db_path()}")
+
+def cmd_import(args):
+    database.init_db(seed=False)
+    df = pd.read_csv(args.file)
+    count = database.import_rows(args.table, df, replace=args.replace)
+    print(f"Imported {count} row(s) into {args.table}")
+
+def cmd_export(args):
+    write_frame(database.export_table(args.table), args.output, args.format)
+
+def cmd_report(args):
+    df, _ = analytics.run_report(database.get_db_path(), args.name)
+    write_frame(df, args.output, args.format)
+
+def cmd_client_reports(args):
+    results, index_path = client_reports.generate_reports(database.get_db_path(), args.month, args.output_dir,
+                                                          args.workers, args.clients)
+    print(f"Rendered {len(results)} client report(s)" + (f"; index at {index_path}" if index_path else ""))
+
+def cmd_recompute(args):
+    unknown = [job for job in args.jobs if job not in RECOMPUTE_JOBS]
+    if unknown:
+        raise ValueError(f"Unknown job(s): {', '.join(unknown)} (choose from {', '.join(RECOMPUTE_JOBS)})")
+    database.init_db(seed=False)
+    for job in args.jobs or RECOMPUTE_JOBS:
+        print(f"{job}: {RECOMPUTE_JOBS[job](database.get_db_path(), args.full)}")
+
+def cmd_archive(args):
+    moved = archive.run_archival(database.get_db_path(), args.task_age_days,
+                                 args.meeting_retention_days, args.dry_run)
+    verb = "Would archive" if args.dry_run else "Archived"
+    for table, count in moved.items():
+        print(f"{verb} {count} row(s) from {table}")
+
+def cmd_backup(args):
+    if args.list:
+        for snapshot in backup.list_snapshots(database.get_db_path(), args.backup_dir):
+            print(f"{snapshot['taken_at']:%Y-%m-%d %H:%M:%S}  {snapshot['size'] / 1024:>10,.0f} KB  {snapshot['path']}")
+        return
+    print(f"Created {backup.create_snapshot(database.get_db_path(), args.backup_dir, args.keep)}")
+
+def cmd_restore(args):
+    db_path = database.get_db_path()
+    snapshot = args.snapshot or backup.find_snapshot(db_path, args.backup_dir, args.at)
+    safety_path = backup.restore_snapshot(snapshot, db_path, args.backup_dir)
+    print(f"Restored {db_path} from {snapshot}" + (f" (previous contents saved to {safety_path})" if safety_path else ""))
+
+def cmd_history(args):
+    write_frame(audit.get_history(database.get_db_path(), args.table, args.record_id, args.limit), fmt="table")
+
+def cmd_compact_audit(args):
+    records, removed = audit.compact(database.get_db_path(), args.older_than_days)
+    print(f"Compacted {records} record(s), removing {removed} entr{'y' if removed == 1 else 'ies'}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="masterflo", description="Batch operations on MasterFLO.ai dashboard data.")
+    parser.add_argument("--tenant", help="Agency to work on (see tenants.json)")
+    parser.add_argument("--db", help="Work on this database file instead of an agency's shard")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Create or upgrade the database schema")
+    migrate.add_argument("--all", action="store_true", help="Migrate every agency's shard")
+    migrate.set_defaults(func=cmd_migrate)
+
+    seed = commands.add_parser("seed", help="Fill an empty database with the sample agency data")
+    seed.add_argument("--force", action="store_true", help="Add the sample data even if the database has clients")
+    seed.set_defaults(func=cmd_seed)
+
+    table_names = list(database.TABLE_SCHEMAS)
+
+    import_ = commands.add_parser("import", help="Load rows from a CSV file into a table")
+    import_.add_argument("table", choices=table_names)
+    import_.add_argument("file", help="CSV file whose header names table columns")
+    import_.add_argument("--replace", action="store_true", help="Delete the table's existing rows first")
+    import_.set_defaults(func=cmd_import)
+
+    export = commands.add_parser("export", help="Write a table out as CSV")
+    export.add_argument("table", choices=table_names)
+    export.add_argument("--output", "-o", help="File to write (default: stdout)")
+    export.add_argument("--format", choices=["csv", "table"], default="csv")
+    export.set_defaults(func=cmd_export)
+
+    report = commands.add_parser("report", help="Run an analytics report")
+    report.add_argument("name", choices=list(analytics.REPORTS))
+    report.add_argument("--output", "-o", help="File to write (default: stdout)")
+    report.add_argument("--format", choices=["csv", "table"], default="table")
+    report.set_defaults(func=cmd_report)
+
+    reports = commands.add_parser("client-reports", help="Render a month-end HTML report for every client")
+    reports.add_argument("--month", help="Report month as YYYY-MM (default: this month)")
+    reports.add_argument("--output-dir", default=client_reports.OUTPUT_DIR)
+    reports.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    reports.add_argument("--client", action="append", dest="clients", help="Only report on this client (repeatable)")
+    reports.set_defaults(func=cmd_client_reports)
+
+    recompute = commands.add_parser("recompute", help="Rebuild derived data (all jobs by default)")
+    recompute.add_argument("jobs", nargs="*", metavar="job", help=f"One of: {', '.join(RECOMPUTE_JOBS)}")
+    recompute.add_argument("--full", action="store_true", help="Start over instead of picking up where the last run stopped; for links, ignore cached results")
+    recompute.set_defaults(func=cmd_recompute)
+
+    archive_ = commands.add_parser("archive", help="Move Done tasks and old meetings to the archive database")
+    archive_.add_argument("--task-age-days", type=int, default=archive.TASK_ARCHIVE_AGE_DAYS)
+    archive_.add_argument("--meeting-retention-days", type=int, default=archive.MEETING_RETENTION_DAYS)
+    archive_.add_argument("--dry-run", action="store_true", help="Only report what would be moved")
+    archive_.set_defaults(func=cmd_archive)
+
+    backup_ = commands.add_parser("backup", help="Take an online snapshot of the database")
+    backup_.add_argument("--backup-dir", default=backup.BACKUP_DIR)
+    backup_.add_argument("--keep", type=int, default=backup.BACKUP_KEEP, help="Snapshots to keep")
+    backup_.add_argument("--list", action="store_true", help="List snapshots instead of taking one")
+    backup_.set_defaults(func=cmd_backup)
+
+    restore = commands.add_parser("restore", help="Restore a snapshot (the newest by default)")
+    restore.add_argument("snapshot", nargs="?", help="Snapshot file to restore")
+    restore.add_argument("--at", type=backup.parse_time, help="Restore the newest snapshot taken at or before this time")
+    restore.add_argument("--backup-dir", default=backup.BACKUP_DIR)
+    restore.set_defaults(func=cmd_restore)
+
+    history = commands.add_parser("history", help="Show a record's change history from the audit log")
+    history.add_argument("table", choices=audit.AUDITED_TABLES)
+    history.add_argument("record_id", type=int)
+    history.add_argument("--limit", type=int, default=50, help="Most recent changes to show")
+    history.set_defaults(func=cmd_history)
+
+    compact_audit = commands.add_parser("compact-audit", help="Collapse old audit log entries into one per record")
+    compact_audit.add_argument("--older-than-days", type=int, default=audit.AUDIT_COMPACT_AFTER_DAYS)
+    compact_audit.set_defaults(func=cmd_compact_audit)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.db:
+        tenants.set_router(tenants.TenantRouter({
+            tenants.DEFAULT_TENANT: {"name": args.db, "db_path": args.db},
+        }))
+    if args.tenant:
+        if args.tenant not in tenants.get_router().tenants:
+            sys.exit(f"Unknown tenant: {args.tenant}")
+        tenants.set_current_tenant(args.tenant)
+
+    try:
+        args.func(args)
+    except (ValueError, KeyError, tenants.NoTenantError, backup.BackupError) as e:
+        sys.exit(str(e))
+
+if __name__ == "__main__":
+    main()
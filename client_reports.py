@@ -0,0 +1,273 @@
+"""Month-end performance reports for every client.
+
+Renders one self-contained HTML page per client with their ad spend, ROAS,
+leads and cost per lead by channel, the tasks completed in the month and
+upcoming campaign reviews, plus an index page linking them all.
+
+Only the task list depends on the report month: campaigns hold running
+totals rather than monthly figures, so the campaign numbers are the totals
+as of the report date whichever month is chosen (each report says so), and
+a task counts as completed in the month it was due, as tasks don't record
+when they were finished.
+
+All data is read up front inside a single read transaction, so every report
+reflects the same consistent snapshot of the database even while the
+dashboard keeps writing. Rendering is spread over a process pool, and each
+file is written to a temporary name and then renamed into place, so a reader
+never sees a half-written report.
+
+    python client_reports.py --db masterflo_dashboard.db --month 2025-04
+"""
+import argparse
+import html
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+OUTPUT_DIR = "reports"
+
+# Reviews scheduled within this many days of the report date are listed
+UPCOMING_REVIEW_DAYS = 45
+
+CHANNELS = (("Meta Ads", "meta_ads"), ("Google Ads", "google_ads"))
+
+def load_snapshot(db_path):
+    """Read everything the reports need in one transaction.
+
+    Returns (clients, campaigns, tasks) DataFrames that all reflect the same
+    committed state of the database.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("BEGIN")
+        clients = pd.read_sql_query('''
+        SELECT id, name, services, campaign_status, assigned_team, monthly_budget
+        FROM clients
+        ORDER BY name
+        ''', conn)
+        campaigns = pd.read_sql_query('''
+        SELECT client_name, campaign_manager, last_review_date, next_review_date,
+               meta_ads_spend, meta_ads_roas, meta_ads_leads,
+               google_ads_spend, google_ads_roas, google_ads_leads
+        FROM campaigns
+        ''', conn)
+        tasks = pd.read_sql_query('''
+        SELECT related_client, title, assigned_to, due_date, status
+        FROM tasks
+        WHERE related_client IS NOT NULL
+        ''', conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return clients, campaigns, tasks
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-") or "client"
+
+def summarize_campaigns(campaigns):
+    """Spend, revenue and leads per client and channel, in one vectorized pass"""
+    columns = {"client_name": campaigns["client_name"]}
+    for _, prefix in CHANNELS:
+        spend = pd.to_numeric(campaigns[f"{prefix}_spend"], errors="coerce").fillna(0)
+        roas = pd.to_numeric(campaigns[f"{prefix}_roas"], errors="coerce").fillna(0)
+        columns[f"{prefix}_spend"] = spend
+        columns[f"{prefix}_revenue"] = spend * roas
+        columns[f"{prefix}_leads"] = pd.to_numeric(campaigns[f"{prefix}_leads"], errors="coerce").fillna(0)
+    return pd.DataFrame(columns).groupby("client_name").sum()
+
+def channel_rows(summary):
+    """Per-channel rows (plus a Total row) with ROAS and cost per lead, from one client's summary"""
+    rows = [{"channel": label,
+             "spend": summary.get(f"{prefix}_spend", 0.0),
+             "revenue": summary.get(f"{prefix}_revenue", 0.0),
+             "leads": int(summary.get(f"{prefix}_leads", 0))}
+            for label, prefix in CHANNELS]
+    rows.append({"channel": "Total",
+                 "spend": sum(r["spend"] for r in rows),
+                 "revenue": sum(r["revenue"] for r in rows),
+                 "leads": sum(r["leads"] for r in rows)})
+    for row in rows:
+        row["roas"] = row["revenue"] / row["spend"] if row["spend"] else None
+        row["cost_per_lead"] = row["spend"] / row["leads"] if row["leads"] else None
+    return rows
+
+def render_chart(channels, width=560, height=220):
+    """Spend vs. revenue bars per channel, as an inline SVG"""
+    by_channel = [row for row in channels if row["channel"] != "Total"]
+    peak = max([row["spend"] for row in by_channel] + [row["revenue"] for row in by_channel] + [1])
+    plot_height = height - 40
+    group_width = width / max(len(by_channel), 1)
+    bar_width = group_width / 4
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'role="img" aria-label="Spend vs. revenue by channel" font-size="12">']
+    for i, row in enumerate(by_channel):
+        x = i * group_width + group_width / 2
+        for offset, value, color in ((-bar_width, row["spend"], "#4C78A8"), (0, row["revenue"], "#59A14F")):
+            bar_height = plot_height * value / peak
+            y = 10 + plot_height - bar_height
+            parts.append(f'<rect x="{x + offset:.1f}" y="{y:.1f}" width="{bar_width:.1f}" '
+                         f'height="{bar_height:.1f}" fill="{color}"><title>{_money(value)}</title></rect>')
+        parts.append(f'<text x="{x:.1f}" y="{height - 12}" text-anchor="middle">{html.escape(row["channel"])}</text>')
+    parts.append(f'<rect x="{width - 150}" y="4" width="10" height="10" fill="#4C78A8"/>'
+                 f'<text x="{width - 136}" y="13">Spend</text>'
+                 f'<rect x="{width - 80}" y="4" width="10" height="10" fill="#59A14F"/>'
+                 f'<text x="{width - 66}" y="13">Revenue</text>')
+    parts.append(f'<line x1="0" y1="{10 + plot_height}" x2="{width}" y2="{10 + plot_height}" stroke="#999"/></svg>')
+    return "".join(parts)
+
+def _money(value):
+    return f"${value:,.2f}" if value is not None and pd.notna(value) else "-"
+
+def _table(headers, rows):
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headers)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>"
+                   for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+PAGE_STYLE = '''
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 2rem auto; max-width: 860px; color: #222; }
+h1 { margin-bottom: 0; } .meta { color: #666; margin-top: 0.2rem; }
+table { border-collapse: collapse; width: 100%; margin: 0.5rem 0 1.5rem; }
+th, td { border-bottom: 1px solid #ddd; padding: 0.4rem 0.6rem; text-align: left; }
+th { background: #f5f5f5; } .empty { color: #888; font-style: italic; } .note { color: #666; font-size: 0.9rem; }
+'''
+
+def render_client_report(job):
+    """Render one client's report and write it atomically. Runs in a worker process."""
+    client, channels, completed_rows, review_rows, month, report_date, output_dir = job
+    month_start = pd.Timestamp(f"{month}-01")
+    performance = [[row["channel"], _money(row["spend"]), _money(row["revenue"]), row["leads"],
+                    f"{row['roas']:.2f}x" if row["roas"] is not None else "-", _money(row["cost_per_lead"])]
+                   for row in channels]
+
+    def section(title, headers, rows, empty, note=""):
+        content = _table(headers, rows) if rows else f'<p class="empty">{empty}</p>'
+        note = f'<p class="note">{note}</p>' if note else ""
+        return f"<h2>{title}</h2>{note}{content}"
+
+    chart = render_chart(channels)
+    name = html.escape(str(client["name"]))
+    page = f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} - {month} Performance Report</title>
+<style>{PAGE_STYLE}</style></head>
+<body>
+<h1>{name}</h1>
+<p class="meta">Performance report for {month_start:%B %Y} &middot; Account manager: {html.escape(str(client["assigned_team"] or "-"))}
+&middot; Monthly budget: {_money(client["monthly_budget"])}</p>
+{section("Campaign Performance", ["Channel", "Spend", "Revenue", "Leads", "ROAS", "Cost per Lead"], performance, "",
+         f"Campaign totals to date as of {report_date}, not {month_start:%B %Y} alone: campaign figures aren't recorded per month.")}
+{chart}
+{section("Tasks Completed", ["Task", "Assigned To", "Due Date"], completed_rows, "No tasks were completed this month.",
+         f"Tasks marked Done with a due date in {month_start:%B %Y}.")}
+{section("Upcoming Reviews", ["Review Date", "Campaign Manager"], review_rows, "No campaign reviews scheduled.")}
+<p class="meta">Generated {report_date}</p>
+</body></html>
+'''
+
+    path = os.path.join(output_dir, f"{slugify(client['name'])}-{client['id']}.html")
+    write_atomic(path, page)
+    return {"client": client["name"], "path": path, "spend": channels[-1]["spend"], "leads": channels[-1]["leads"]}
+
+def write_atomic(path, text):
+    """Write a file under a temporary name in the same directory, then rename it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=".html")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def render_index(results, month, output_dir):
+    rows = "".join(
+        f'<tr><td><a href="{html.escape(os.path.basename(r["path"]))}">{html.escape(str(r["client"]))}</a></td>'
+        f'<td>{_money(r["spend"])}</td><td>{r["leads"]}</td></tr>'
+        for r in sorted(results, key=lambda r: str(r["client"])))
+    page = f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Client Reports - {month}</title><style>{PAGE_STYLE}</style></head>
+<body><h1>Client Reports</h1><p class="meta">{month} &middot; {len(results)} client(s)</p>
+<p class="note">Spend and leads are campaign totals to date, not figures for {month} alone.</p>
+<table><thead><tr><th>Client</th><th>Spend</th><th>Leads</th></tr></thead><tbody>{rows}</tbody></table>
+</body></html>
+'''
+    path = os.path.join(output_dir, "index.html")
+    write_atomic(path, page)
+    return path
+
+def generate_reports(db_path=DB_PATH, month=None, output_dir=OUTPUT_DIR, workers=None, clients=None):
+    """Render a report for every client (or the named `clients`) into output_dir/<month>/.
+
+    Returns (results, index path), where results has one dict per report. The
+    index page is only rewritten when every client is reported on.
+    """
+    month = month or date.today().strftime("%Y-%m")
+    month_dir = os.path.join(output_dir, month)
+    os.makedirs(month_dir, exist_ok=True)
+
+    client_df, campaigns, tasks = load_snapshot(db_path)
+    if clients:
+        client_df = client_df[client_df["name"].isin(clients)]
+
+    # Aggregate and filter everything here in vectorized passes; workers only
+    # format HTML and write files
+    month_start = pd.Timestamp(f"{month}-01")
+    month_end = month_start + pd.offsets.MonthEnd(0)
+    today = pd.Timestamp(date.today())
+    summaries = summarize_campaigns(campaigns).to_dict("index")
+
+    due = pd.to_datetime(tasks["due_date"], format="ISO8601", errors="coerce")
+    completed = tasks[(tasks["status"] == "Done") & due.between(month_start, month_end)].fillna("")
+    completed_by_client = {name: list(group[["title", "assigned_to", "due_date"]].itertuples(index=False, name=None))
+                           for name, group in completed.groupby("related_client")}
+
+    review_dates = pd.to_datetime(campaigns["next_review_date"], format="ISO8601", errors="coerce")
+    upcoming = (campaigns[review_dates.between(today, today + pd.Timedelta(days=UPCOMING_REVIEW_DAYS))]
+                .sort_values("next_review_date").fillna(""))
+    reviews_by_client = {name: list(group[["next_review_date", "campaign_manager"]].itertuples(index=False, name=None))
+                         for name, group in upcoming.groupby("client_name")}
+
+    report_date = today.date().isoformat()
+    jobs = [(client, channel_rows(summaries.get(client["name"], {})),
+             completed_by_client.get(client["name"], []), reviews_by_client.get(client["name"], []),
+             month, report_date, month_dir)
+            for client in client_df.to_dict("records")]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [render_client_report(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_client_report, jobs, chunksize=chunksize))
+
+    # A partial run leaves the index of the last full run in place
+    index_path = render_index(results, month, month_dir) if not clients else None
+    return results, index_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a month-end performance report for every client.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--month", help="Report month as YYYY-MM (default: this month)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Directory reports are written under")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--client", action="append", dest="clients", help="Only report on this client (repeatable)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, index_path = generate_reports(args.db, args.month, args.output_dir, args.workers, args.clients)
+    print(f"Rendered {len(results)} report(s) in {time.perf_counter() - start:.1f}s"
+          + (f"; index at {index_path}" if index_path else ""))
+
+if __name__ == "__main__":
+    main()
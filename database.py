@@ -0,0 +1,1337 @@
+"""Data layer for the MasterFLO.ai dashboard.
+
+Schema setup, typed table loading, queries and writes, with no Streamlit
+dependency, so the dashboard (app.py), the command line (cli.py) and
+scheduled jobs all share one implementation. Every function works against
+the current agency's shard (see tenants.py).
+"""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import action_items
+import analytics
+import anomalies
+import archive
+import assignment
+import audit
+import linkcheck
+import tenants
+
+# Shallow copies share memory until one side is modified
+pd.options.mode.copy_on_write = True
+
+# Database setup
+def get_db_path():
+    """Shard file of the agency this session is working in"""
+    return tenants.get_router().db_path()
+
+def get_connection():
+    return tenants.get_router().connect()
+
+def init_db(db_path=None, seed=True):
+    """Initialize the database with tables if they don't exist.
+    
+    With seed=True an empty database is filled with the sample agency data.
+    """
+    conn = sqlite3.connect(db_path) if db_path else get_connection()
+    c = conn.cursor()
+    
+    # Create Clients table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS clients (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        services TEXT,
+        start_date TEXT,
+        campaign_status TEXT,
+        assigned_team TEXT,
+        contract_end_date TEXT,
+        billing_status TEXT,
+        monthly_budget REAL,
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Tasks table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        related_client TEXT,
+        assigned_to TEXT,
+        due_date TEXT,
+        status TEXT,
+        priority TEXT,
+        task_type TEXT,
+        estimated_hours REAL,
+        actual_hours REAL,
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Campaigns table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS campaigns (
+        id INTEGER PRIMARY KEY,
+        client_name TEXT NOT NULL,
+        campaign_manager TEXT,
+        last_review_date TEXT,
+        next_review_date TEXT,
+        meta_ads_spend REAL,
+        meta_ads_roas REAL,
+        meta_ads_leads INTEGER,
+        meta_ads_notes TEXT,
+        google_ads_spend REAL,
+        google_ads_roas REAL,
+        google_ads_leads INTEGER,
+        google_ads_notes TEXT,
+        ghl_status TEXT,
+        landing_page_url TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Operations table for SOPs
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS sops (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        category TEXT,
+        content TEXT,
+        last_updated TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Team Directory table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS team_directory (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        role TEXT,
+        email TEXT,
+        phone TEXT,
+        department TEXT,
+        skills TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Meeting Notes table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS meeting_notes (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        date TEXT,
+        attendees TEXT,
+        meeting_type TEXT,
+        notes TEXT,
+        action_items TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Create Quick Links table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS quick_links (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        category TEXT,
+        url TEXT,
+        description TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Add columns introduced after a database was first created.
+    # due_day is the due date as an integer day number (NULL when the date
+    # is missing or malformed), so deadline queries compare and index plain
+    # integers instead of text.
+    task_columns = [row[1] for row in c.execute("PRAGMA table_xinfo(tasks)")]
+    if 'due_day' not in task_columns:
+        c.execute('''
+        ALTER TABLE tasks ADD COLUMN due_day INTEGER
+        GENERATED ALWAYS AS (CAST(julianday(due_date) AS INTEGER)) VIRTUAL
+        ''')
+    
+    # Indexes for overdue / upcoming / at-risk task queries
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_due_day ON tasks (status, due_day)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assignee_status_due_day ON tasks (assigned_to, status, due_day)")
+    
+    # Create Campaign Metrics History table: one row per change to a
+    # campaign's spend, ROAS or leads, written by triggers so every write
+    # path is captured. Anomaly detection runs over this history.
+    history_exists = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'campaign_metrics_history'"
+    ).fetchone()
+    
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS campaign_metrics_history (
+        id INTEGER PRIMARY KEY,
+        campaign_id INTEGER NOT NULL,
+        recorded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        spend REAL,
+        revenue REAL,
+        leads INTEGER
+    )
+    ''')
+    c.execute('''
+    CREATE INDEX IF NOT EXISTS idx_campaign_metrics_history_campaign
+    ON campaign_metrics_history (campaign_id, id)
+    ''')
+    
+    metrics_snapshot = '''
+    INSERT INTO campaign_metrics_history (campaign_id, spend, revenue, leads)
+    VALUES (NEW.id,
+            COALESCE(NEW.meta_ads_spend, 0) + COALESCE(NEW.google_ads_spend, 0),
+            COALESCE(NEW.meta_ads_spend, 0) * COALESCE(NEW.meta_ads_roas, 0)
+                + COALESCE(NEW.google_ads_spend, 0) * COALESCE(NEW.google_ads_roas, 0),
+            COALESCE(NEW.meta_ads_leads, 0) + COALESCE(NEW.google_ads_leads, 0));
+    '''
+    c.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS campaigns_metrics_history_insert
+    AFTER INSERT ON campaigns
+    BEGIN
+        {metrics_snapshot}
+    END
+    ''')
+    c.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS campaigns_metrics_history_update
+    AFTER UPDATE OF meta_ads_spend, meta_ads_roas, meta_ads_leads,
+                    google_ads_spend, google_ads_roas, google_ads_leads ON campaigns
+    WHEN OLD.meta_ads_spend IS NOT NEW.meta_ads_spend
+      OR OLD.meta_ads_roas IS NOT NEW.meta_ads_roas
+      OR OLD.meta_ads_leads IS NOT NEW.meta_ads_leads
+      OR OLD.google_ads_spend IS NOT NEW.google_ads_spend
+      OR OLD.google_ads_roas IS NOT NEW.google_ads_roas
+      OR OLD.google_ads_leads IS NOT NEW.google_ads_leads
+    BEGIN
+        {metrics_snapshot}
+    END
+    ''')
+    
+    if not history_exists:
+        # Start the history of existing campaigns from their current numbers
+        c.execute('''
+        INSERT INTO campaign_metrics_history (campaign_id, spend, revenue, leads)
+        SELECT id,
+               COALESCE(meta_ads_spend, 0) + COALESCE(google_ads_spend, 0),
+               COALESCE(meta_ads_spend, 0) * COALESCE(meta_ads_roas, 0)
+                   + COALESCE(google_ads_spend, 0) * COALESCE(google_ads_roas, 0),
+               COALESCE(meta_ads_leads, 0) + COALESCE(google_ads_leads, 0)
+        FROM campaigns
+        ''')
+    
+    # Create Campaign Alerts table, written by the anomaly scan
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS campaign_alerts (
+        id INTEGER PRIMARY KEY,
+        campaign_id INTEGER NOT NULL,
+        client_name TEXT,
+        alert_type TEXT NOT NULL,
+        metric_value REAL,
+        baseline REAL,
+        message TEXT,
+        history_id INTEGER,
+        detected_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        resolved INTEGER DEFAULT 0,
+        UNIQUE (campaign_id, alert_type, history_id)
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_campaign_alerts_open ON campaign_alerts (resolved, campaign_id)")
+    
+    # Create Anomaly Scan State table: how far through the history the scan has got
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS anomaly_scan_state (
+        name TEXT PRIMARY KEY,
+        last_history_id INTEGER NOT NULL DEFAULT 0,
+        scanned_at TEXT
+    )
+    ''')
+    
+    # Create Link Checks table, written by the link checker: one row per distinct URL
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS link_checks (
+        url TEXT PRIMARY KEY,
+        status INTEGER,
+        ok INTEGER NOT NULL DEFAULT 0,
+        ttfb_ms REAL,
+        page_bytes INTEGER,
+        error TEXT,
+        checked_at TEXT
+    )
+    ''')
+    
+    # Create Table Versions table, bumped by triggers on every write so
+    # shared snapshots know when a table has changed
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    
+    for table in TABLE_SCHEMAS:
+        c.execute("INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+            END
+            ''')
+    
+    # Create the audit log and the triggers that record every change
+    audit.create_audit_log(conn)
+    
+    # Create the per-assignee load summary that task triggers keep current
+    assignment.create_assignee_load(conn)
+    
+    # Create the action items parsed from meeting notes whenever a meeting is saved
+    action_items.create_action_items(conn)
+    
+    conn.commit()
+    
+    # Check if we need to insert sample data (only if tables are empty)
+    c.execute("SELECT COUNT(*) FROM clients")
+    if seed and c.fetchone()[0] == 0:
+        insert_sample_data(conn)
+    
+    conn.close()
+
+def insert_sample_data(conn):
+    """Insert sample data for a martial arts marketing agency"""
+    c = conn.cursor()
+    
+    # Sample Clients
+    clients = [
+        ("Dragon Martial Arts Academy", "Meta Ads, Google Ads, GHL", "2025-01-15", "Active", "John Smith", 
+         "2026-01-15", "Current", 1500, "Client recently expanded to second location. Need to update ad targeting."),
+        ("Elite Taekwondo Center", "Meta Ads, SEO", "2025-02-01", "Needs Attention", "Sarah Johnson", 
+         "2026-02-01", "Current", 1200, "Website traffic dropping. Need to review SEO strategy."),
+        ("Warrior Jiu-Jitsu", "Google Ads, Web", "2024-12-01", "Active", "Michael Brown", 
+         "2025-12-01", "Current", 1000, "New landing page performing well. Consider upselling Meta Ads."),
+        ("Master Kim's Karate", "Meta Ads, GHL", "2025-03-01", "Paused", "Sarah Johnson", 
+         "2026-03-01", "Overdue", 800, "Client requested pause due to renovation. Follow up on 4/15."),
+        ("Victory MMA & Fitness", "Meta Ads, Google Ads, SEO, Web, GHL", "2024-11-15", "Active", "John Smith", 
+         "2025-11-15", "Current", 2500, "Our highest-value client. Monthly strategy call scheduled for 4/5.")
+    ]
+    
+    c.executemany('''
+    INSERT INTO clients (name, services, start_date, campaign_status, assigned_team, 
+                        contract_end_date, billing_status, monthly_budget, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', clients)
+    
+    # Sample Tasks
+    tasks = [
+        ("Create April Ad Creative for Elite Taekwondo", "Elite Taekwondo Center", "Michael Brown", 
+         "2025-04-01", "To Do", "High", "Ad Creation", 3, None, "Focus on summer camp promotion"),
+        ("Optimize Google Ads Campaign for Dragon Martial Arts", "Dragon Martial Arts Academy", "John Smith", 
+         "2025-03-28", "In Progress", "Medium", "Ad Creation", 2, 1.5, "Targeting new location, adjust geographic settings"),
+        ("Monthly Performance Report - Victory MMA", "Victory MMA & Fitness", "Sarah Johnson", 
+         "2025-04-05", "To Do", "Medium", "Reporting", 2, None, "Include comparison to previous quarter"),
+        ("Update Landing Page for Warrior Jiu-Jitsu", "Warrior Jiu-Jitsu", "Michael Brown", 
+         "2025-03-25", "Review", "High", "Website", 4, 5, "Added testimonials section and lead form"),
+        ("Follow up with Master Kim about payment", "Master Kim's Karate", "John Smith", 
+         "2025-03-30", "To Do", "Urgent", "Client Communication", 0.5, None, "Billing is overdue for March"),
+        ("Team Meeting - April Planning", "Internal", "Sarah Johnson", 
+         "2025-04-02", "To Do", "Medium", "Internal", 1, None, "Prepare agenda and quarterly goals")
+    ]
+    
+    c.executemany('''
+    INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority, 
+                      task_type, estimated_hours, actual_hours, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', tasks)
+    
+    # Sample Campaigns
+    campaigns = [
+        ("Dragon Martial Arts Academy", "John Smith", "2025-03-15", "2025-04-15", 
+         750, 3.2, 25, "Strong performance on parent-targeted ads. Increase budget for April.",
+         650, 2.8, 18, "Keywords performing well, but CTR dropping. Review ad copy.",
+         "Active", "https://dragonmartialarts.com/special-offer"),
+        ("Elite Taekwondo Center", "Sarah Johnson", "2025-03-10", "2025-04-10", 
+         600, 1.8, 12, "Performance declining. Need to refresh creative and targeting.",
+         0, 0, 0, "Not currently running Google Ads.",
+         "Issues", "https://elitetaekwondo.com/trial"),
+        ("Warrior Jiu-Jitsu", "Michael Brown", "2025-03-20", "2025-04-20", 
+         0, 0, 0, "Not currently running Meta Ads.",
+         450, 3.5, 15, "New landing page conversion rate up 25%. Increase budget.",
+         "Active", "https://warriorjiujitsu.com/free-class"),
+        ("Master Kim's Karate", "Sarah Johnson", "2025-03-01", "2025-04-15", 
+         400, 1.2, 8, "Campaign paused on 3/15 due to client request.",
+         0, 0, 0, "Not currently running Google Ads.",
+         "Needs Setup", "https://masterkimskarate.com/special"),
+        ("Victory MMA & Fitness", "John Smith", "2025-03-25", "2025-04-25", 
+         1200, 4.1, 35, "Excellent performance. New creative resonating well with audience.",
+         950, 3.8, 28, "Strong performance across all ad groups. Consider expanding keywords.",
+         "Active", "https://victorymma.com/membership")
+    ]
+    
+    c.executemany('''
+    INSERT INTO campaigns (client_name, campaign_manager, last_review_date, next_review_date,
+                          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+                          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+                          ghl_status, landing_page_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', campaigns)
+    
+    # Sample Team Directory
+    team = [
+        ("John Smith", "Senior Account Manager", "john@masterflo.ai", "555-123-4567", 
+         "Client Services", "Meta Ads, Google Ads, Client Management"),
+        ("Sarah Johnson", "Marketing Strategist", "sarah@masterflo.ai", "555-234-5678", 
+         "Strategy", "SEO, Content Strategy, Analytics"),
+        ("Michael Brown", "Creative Director", "michael@masterflo.ai", "555-345-6789", 
+         "Creative", "Ad Design, Web Development, Copywriting"),
+        ("Lisa Chen", "Operations Manager", "lisa@masterflo.ai", "555-456-7890", 
+         "Operations", "Project Management, Process Optimization"),
+        ("David Wilson", "PPC Specialist", "david@masterflo.ai", "555-567-8901", 
+         "Paid Media", "Google Ads, Meta Ads, Analytics")
+    ]
+    
+    c.executemany('''
+    INSERT INTO team_directory (name, role, email, phone, department, skills)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', team)
+    
+    # Sample SOPs
+    sops = [
+        ("Client Onboarding Process", "Onboarding", 
+         "1. Initial consultation call\n2. Collect client assets\n3. Set up ad accounts\n4. Create initial campaign strategy\n5. Client approval\n6. Launch campaigns\n7. Schedule first review", 
+         "2025-03-01"),
+        ("Meta Ads Optimization SOP", "Ads Optimization", 
+         "1. Review performance metrics\n2. Analyze audience insights\n3. Check ad creative performance\n4. Adjust budgets based on ROAS\n5. Update targeting if needed\n6. Create new ad variations\n7. Document changes and results", 
+         "2025-02-15"),
+        ("Google Ads Optimization SOP", "Ads Optimization", 
+         "1. Review search terms report\n2. Analyze keyword performance\n3. Check quality scores\n4. Adjust bids based on performance\n5. Update ad copy if needed\n6. Test new extensions\n7. Document changes and results", 
+         "2025-02-15"),
+        ("Landing Page Optimization Guide", "Ads Optimization", 
+         "1. Review current conversion rate\n2. Analyze user behavior with heatmaps\n3. Check mobile responsiveness\n4. Improve page load speed\n5. Clarify call-to-action\n6. Add social proof\n7. A/B test variations", 
+         "2025-03-10"),
+        ("Client Welcome Email", "Communication Templates", 
+         "Subject: Welcome to MasterFLO.ai Marketing Services!\n\nDear [Client Name],\n\nWe're thrilled to welcome you to the MasterFLO.ai family! As martial arts marketing specialists, we understand the unique challenges and opportunities in growing your school...", 
+         "2025-01-05"),
+        ("Monthly Report Template", "Communication Templates", 
+         "# Monthly Marketing Performance Report\n\n## Executive Summary\n[Brief overview of performance]\n\n## Campaign Performance\n### Meta Ads\n- Spend: $X,XXX\n- Leads: XX\n- Cost per Lead: $XX\n- ROAS: X.X\n\n### Google Ads\n[Similar metrics]\n\n## Recommendations\n[List of recommendations]", 
+         "2025-03-01")
+    ]
+    
+    c.executemany('''
+    INSERT INTO sops (name, category, content, last_updated)
+    VALUES (?, ?, ?, ?)
+    ''', sops)
+    
+    # Sample Meeting Notes
+    meetings = [
+        ("Weekly Team Huddle", "2025-03-21", "All Staff", "Internal", 
+         "Discussed current client performance and upcoming deadlines. Sarah raised concerns about Elite Taekwondo's declining performance. Michael presented new creative concepts for April campaigns.", 
+         "Update campaign creative for Elite Taekwondo; Review SEO strategy for Dragon Martial Arts"),
+        ("Victory MMA Strategy Session", "2025-03-25", "John Smith, Sarah Johnson", "Client", 
+         "Met with client to discuss Q2 strategy. Client wants to focus on summer membership promotion. Agreed to increase Meta Ads budget by 20% and develop new creative focusing on family packages.", 
+         "Increase Meta Ads budget; Develop summer promotion campaign"),
+        ("Q2 Planning Meeting", "2025-03-28", "All Staff", "Internal", 
+         "Reviewed Q1 performance and set goals for Q2. Key focus areas: improving client retention, optimizing ad performance, and launching new service offerings for martial arts schools.", 
+         "Finalize Q2 goals; Assign new client acquisition targets")
+    ]
+    
+    c.executemany('''
+    INSERT INTO meeting_notes (title, date, attendees, meeting_type, notes, action_items)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', meetings)
+    action_items.sync_all_meetings(conn)
+    
+    # Sample Quick Links
+    links = [
+        ("Meta Ads Manager", "External Tools", "https://business.facebook.com/", 
+         "Meta Ads management platform"),
+        ("Google Ads Dashboard", "External Tools", "https://ads.google.com/", 
+         "Google Ads management platform"),
+        ("Google Analytics", "External Tools", "https://analytics.google.com/", 
+         "Website analytics platform"),
+        ("Go High Level", "External Tools", "https://app.gohighlevel.com/", 
+         "Marketing automation platform"),
+        ("WordPress Admin", "External Tools", "https://clientwebsite.com/wp-admin/", 
+         "Website management platform")
+    ]
+    
+    c.executemany('''
+    INSERT INTO quick_links (name, category, url, description)
+    VALUES (?, ?, ?, ?)
+    ''', links)
+    
+    conn.commit()
+
+# Column types applied to each table when it is loaded. Status-like and
+# team-name columns become categoricals, integer counts are downcast and
+# dates are parsed once into datetime64. REAL columns stay float64 so values
+# written back through the forms keep their exact precision.
+DATE_FORMAT = "%Y-%m-%d"
+
+TABLE_SCHEMAS = {
+    "clients": {
+        "category": ["campaign_status", "billing_status", "assigned_team"],
+        "float": ["monthly_budget"],
+        "date": ["start_date", "contract_end_date"],
+        "timestamp": ["created_at"],
+    },
+    "tasks": {
+        "category": ["status", "priority", "assigned_to", "related_client", "task_type"],
+        "float": ["estimated_hours", "actual_hours"],
+        "date": ["due_date"],
+        "timestamp": ["created_at"],
+        "internal": ["due_day"],
+    },
+    "campaigns": {
+        "category": ["ghl_status", "campaign_manager"],
+        "integer": ["meta_ads_leads", "google_ads_leads"],
+        "float": ["meta_ads_spend", "meta_ads_roas", "google_ads_spend", "google_ads_roas"],
+        "date": ["last_review_date", "next_review_date"],
+        "timestamp": ["created_at"],
+    },
+    "sops": {
+        "category": ["category"],
+        "date": ["last_updated"],
+        "timestamp": ["created_at"],
+    },
+    "team_directory": {
+        "category": ["department"],
+        "timestamp": ["created_at"],
+    },
+    "meeting_notes": {
+        "category": ["meeting_type"],
+        "date": ["date"],
+        "timestamp": ["created_at"],
+    },
+    "quick_links": {
+        "category": ["category"],
+        "timestamp": ["created_at"],
+    },
+}
+
+def apply_schema(df, table):
+    """Convert a raw object-dtype frame to the typed columns declared for its table"""
+    schema = TABLE_SCHEMAS.get(table, {})
+    
+    # Drop generated helper columns that only exist for SQL indexes
+    df = df.drop(columns=[col for col in schema.get("internal", []) if col in df.columns])
+    
+    for col in schema.get("category", []):
+        df[col] = df[col].astype("category")
+    
+    for col in schema.get("integer", []):
+        df[col] = pd.to_numeric(df[col], errors="coerce", downcast="integer")
+    
+    for col in schema.get("float", []):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    
+    for col in schema.get("date", []) + schema.get("timestamp", []):
+        df[col] = pd.to_datetime(df[col], format="ISO8601", errors="coerce")
+    
+    return df
+
+def load_table(table):
+    conn = get_connection()
+    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+    conn.close()
+    return apply_schema(df, table)
+
+def get_table_version(table, conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    row = conn.execute("SELECT version FROM table_versions WHERE table_name = ?", (table,)).fetchone()
+    if own_conn:
+        conn.close()
+    return row[0] if row else 0
+
+def load_table_snapshot(table, exclude=()):
+    """Read a table and its version in one read transaction so they always match.
+    
+    Columns named in `exclude` (e.g. long text bodies) are left out of the read.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN")
+    version = get_table_version(table, conn)
+    columns = ", ".join(col for col in get_table_columns(table, conn) if col not in exclude) if exclude else "*"
+    df = pd.read_sql_query(f"SELECT {columns} FROM {table}", conn)
+    conn.commit()
+    conn.close()
+    return version, apply_schema(df, table)
+
+class SnapshotStore:
+    """Process-wide store holding one immutable typed frame per table version.
+    
+    Every session gets a shallow copy of the shared frame. With pandas
+    copy-on-write enabled that copy shares the column buffers (no memory is
+    duplicated) and any page that mutates its copy transparently gets private
+    columns, leaving the shared snapshot untouched.
+    """
+    
+    def __init__(self):
+        self._snapshots = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+    
+    def _table_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+    
+    def get(self, table, exclude=()):
+        key = (get_db_path(), table, tuple(exclude))
+        version = get_table_version(table)
+        snapshot = self._snapshots.get(key)
+        
+        if snapshot is None or snapshot[0] != version:
+            # Only one session reloads a given table; the others wait and reuse it
+            with self._table_lock(key):
+                snapshot = self._snapshots.get(key)
+                if snapshot is None or snapshot[0] != version:
+                    snapshot = load_table_snapshot(table, exclude)
+                    self._snapshots[key] = snapshot
+                    self.loads += 1
+        
+        return snapshot[1].copy(deep=False)
+    
+    def stats(self):
+        rows = []
+        for (db_path, table, exclude), (version, df) in list(self._snapshots.items()):
+            rows.append({
+                "Database": db_path,
+                "Table": f"{table} (list)" if exclude else table,
+                "Version": version,
+                "Rows": len(df),
+                "Shared (KB)": df.memory_usage(deep=True).sum() / 1024,
+            })
+        return pd.DataFrame(rows, columns=["Database", "Table", "Version", "Rows", "Shared (KB)"])
+
+_snapshot_store = None
+
+def get_snapshot_store():
+    """Snapshot store shared by every session (or script) in this process"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = SnapshotStore()
+    return _snapshot_store
+
+def format_date(value, missing=""):
+    """Format a parsed date as YYYY-MM-DD, returning `missing` for NaT/None"""
+    return value.strftime(DATE_FORMAT) if pd.notna(value) else missing
+
+def format_date_columns(df):
+    """Return a display copy with the table's date columns rendered as YYYY-MM-DD"""
+    display_df = df.copy()
+    for table_schema in TABLE_SCHEMAS.values():
+        for col in table_schema.get("date", []):
+            if col in display_df.columns and pd.api.types.is_datetime64_any_dtype(display_df[col]):
+                display_df[col] = display_df[col].dt.strftime(DATE_FORMAT)
+    return display_df
+
+def get_memory_report():
+    """Compare each table's in-memory footprint as raw object frames and as typed frames"""
+    conn = get_connection()
+    rows = []
+    
+    for table in TABLE_SCHEMAS:
+        raw_df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+        before = raw_df.memory_usage(deep=True).sum()
+        after = apply_schema(raw_df.copy(), table).memory_usage(deep=True).sum()
+        rows.append({
+            "Table": table,
+            "Rows": len(raw_df),
+            "Before (KB)": before / 1024,
+            "After (KB)": after / 1024,
+            "Saved": 1 - after / before if before else 0.0,
+        })
+    
+    conn.close()
+    
+    report = pd.DataFrame(rows)
+    before_total = report["Before (KB)"].sum()
+    after_total = report["After (KB)"].sum()
+    report.loc[len(report)] = ["Total", report["Rows"].sum(), before_total, after_total,
+                               1 - after_total / before_total if before_total else 0.0]
+    return report
+
+# Database functions
+def get_clients():
+    return get_snapshot_store().get("clients")
+
+def get_tasks():
+    return get_snapshot_store().get("tasks")
+
+def get_campaigns():
+    return get_snapshot_store().get("campaigns")
+
+def get_sops():
+    return get_snapshot_store().get("sops")
+
+def get_team_directory():
+    return get_snapshot_store().get("team_directory")
+
+def get_meeting_notes():
+    return get_snapshot_store().get("meeting_notes")
+
+def get_quick_links():
+    return get_snapshot_store().get("quick_links")
+
+# Long text columns. List views load every other column and fetch a record's
+# body by id only when it is opened.
+BODY_COLUMNS = {
+    "sops": ("content",),
+    "meeting_notes": ("notes", "action_items"),
+}
+
+def get_sop_list():
+    return get_snapshot_store().get("sops", exclude=BODY_COLUMNS["sops"])
+
+def get_meeting_list():
+    return get_snapshot_store().get("meeting_notes", exclude=BODY_COLUMNS["meeting_notes"])
+
+def get_record_body(table, id):
+    """Return one record's body columns as a dict, or None if it no longer exists"""
+    columns = BODY_COLUMNS[table]
+    conn = get_connection()
+    row = conn.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (int(id),)).fetchone()
+    conn.close()
+    return dict(zip(columns, row)) if row else None
+
+def get_archived_tasks():
+    df = archive.get_archived("tasks", get_db_path())
+    return apply_schema(df, "tasks") if len(df.columns) else df
+
+def get_archived_meeting_notes():
+    df = archive.get_archived("meeting_notes", get_db_path())
+    return apply_schema(df, "meeting_notes") if len(df.columns) else df
+
+def migrate_all_shards():
+    """Bring every agency's shard up to the current schema (without sample data)"""
+    tenants.get_router().migrate_all(lambda db_path: init_db(db_path, seed=False))
+
+# Leads by Client aggregation
+LEADS_CHART_TOP_N = 10
+OTHER_CLIENTS_LABEL = "All other clients"
+
+LEADS_BY_CLIENT_SQL = '''
+WITH totals AS (
+    SELECT client_name,
+           SUM(COALESCE(meta_ads_leads, 0)) AS meta_ads_leads,
+           SUM(COALESCE(google_ads_leads, 0)) AS google_ads_leads,
+           SUM(COALESCE(meta_ads_leads, 0) + COALESCE(google_ads_leads, 0)) AS total_leads
+    FROM campaigns
+    GROUP BY client_name
+),
+ranked AS (
+    SELECT *, ROW_NUMBER() OVER (ORDER BY total_leads DESC, client_name) AS client_rank
+    FROM totals
+)
+'''
+
+def get_leads_by_client(top_n=LEADS_CHART_TOP_N):
+    """Return leads per client for the top N clients plus one bucket for the rest.
+    
+    The bucket row has is_other set. It is labelled OTHER_CLIENTS_LABEL, or
+    "<label> (2)" and so on if a shown client already has that name.
+    """
+    df, _ = analytics.run_query(get_db_path(), LEADS_BY_CLIENT_SQL + '''
+    , bucketed AS (
+        SELECT CASE WHEN client_rank <= ? THEN client_name END AS client_name,
+               CASE WHEN client_rank <= ? THEN client_rank ELSE ? + 1 END AS bucket_rank,
+               meta_ads_leads, google_ads_leads, total_leads
+        FROM ranked
+    )
+    SELECT client_name,
+           SUM(meta_ads_leads) AS meta_ads_leads,
+           SUM(google_ads_leads) AS google_ads_leads,
+           SUM(total_leads) AS total_leads,
+           COUNT(*) AS client_count,
+           bucket_rank > ? AS is_other
+    FROM bucketed
+    GROUP BY bucket_rank, client_name
+    ORDER BY bucket_rank
+    ''', params=(top_n, top_n, top_n, top_n), tables=("campaigns",))
+    
+    df['is_other'] = df['is_other'].astype(bool)
+    label, n = OTHER_CLIENTS_LABEL, 2
+    while label in set(df.loc[~df['is_other'], 'client_name']):
+        label, n = f"{OTHER_CLIENTS_LABEL} ({n})", n + 1
+    df.loc[df['is_other'], 'client_name'] = label
+    return df
+
+def get_other_clients_leads(top_n=LEADS_CHART_TOP_N, limit=50, offset=0):
+    """Return one page of the clients folded into the other-clients bucket"""
+    df, _ = analytics.run_query(get_db_path(), LEADS_BY_CLIENT_SQL + '''
+    SELECT client_name, meta_ads_leads, google_ads_leads, total_leads
+    FROM ranked
+    WHERE client_rank > ?
+    ORDER BY client_rank
+    LIMIT ? OFFSET ?
+    ''', params=(top_n, limit, offset), tables=("campaigns",))
+    return df
+
+# Task deadlines
+OPEN_TASK_STATUSES = ("To Do", "In Progress", "Review")
+
+# Focused hours per remaining day (including the due date) a task can absorb
+# before it counts as at risk
+AT_RISK_HOURS_PER_DAY = 6
+
+# Only tasks due within this many days are checked for being at risk
+AT_RISK_HORIZON_DAYS = 14
+
+def get_task_deadline_counts():
+    """Overdue, due-this-week and at-risk open task counts per assignee.
+    
+    Uses the (status, due_day) index: overdue tasks plus a bounded window of
+    upcoming ones are read, never the whole table.
+    """
+    today = datetime.now().date()
+    week_end = today + timedelta(days=6 - today.weekday())
+    horizon = today + timedelta(days=max(AT_RISK_HORIZON_DAYS, (week_end - today).days))
+    status_marks = ", ".join("?" for _ in OPEN_TASK_STATUSES)
+    
+    conn = get_connection()
+    df = pd.read_sql_query(f'''
+    WITH bounds AS (
+        SELECT CAST(julianday(?) AS INTEGER) AS today,
+               CAST(julianday(?) AS INTEGER) AS week_end,
+               CAST(julianday(?) AS INTEGER) AS at_risk_end,
+               CAST(julianday(?) AS INTEGER) AS horizon
+    )
+    SELECT t.assigned_to,
+           SUM(t.due_day < b.today) AS overdue,
+           SUM(t.due_day BETWEEN b.today AND b.week_end) AS due_this_week,
+           SUM(t.due_day BETWEEN b.today AND b.at_risk_end
+               AND MAX(COALESCE(t.estimated_hours, 0) - COALESCE(t.actual_hours, 0), 0)
+                   > (t.due_day - b.today + 1) * ?) AS at_risk
+    FROM tasks t, bounds b
+    WHERE t.status IN ({status_marks}) AND t.due_day <= b.horizon
+    GROUP BY t.assigned_to
+    ORDER BY overdue DESC, at_risk DESC, t.assigned_to
+    ''', conn, params=(today.isoformat(), week_end.isoformat(),
+                       (today + timedelta(days=AT_RISK_HORIZON_DAYS)).isoformat(), horizon.isoformat(),
+                       AT_RISK_HOURS_PER_DAY) + OPEN_TASK_STATUSES)
+    conn.close()
+    return df
+
+def get_upcoming_tasks(limit=20):
+    """Open To Do / In Progress tasks ordered by due date, soonest (or most overdue) first"""
+    conn = get_connection()
+    df = pd.read_sql_query('''
+    SELECT title, due_date, assigned_to
+    FROM tasks
+    WHERE status IN ('To Do', 'In Progress') AND due_day IS NOT NULL
+    ORDER BY due_day
+    LIMIT ?
+    ''', conn, params=(limit,))
+    conn.close()
+    return df
+
+def get_campaign_alerts():
+    """Open anomaly alerts for the current agency, newest first"""
+    return anomalies.get_open_alerts(get_db_path())
+
+def get_last_anomaly_scan():
+    conn = get_connection()
+    row = conn.execute("SELECT scanned_at FROM anomaly_scan_state WHERE name = ?",
+                       (anomalies.STATE_NAME,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def get_link_checks():
+    """Latest health check of every quick link and landing page URL"""
+    return linkcheck.get_link_checks(get_db_path())
+
+def get_action_items(owner=None, include_done=False):
+    """Action items for the current agency; owner="" gives the unowned ones"""
+    return action_items.get_action_items(get_db_path(), owner, include_done)
+
+def get_action_item_owners():
+    return action_items.get_owners(get_db_path())
+
+def set_action_items_done(item_ids, done=True):
+    action_items.set_done(item_ids, done, get_db_path())
+
+def promote_action_items(item_ids, related_client="Internal", priority="Medium", task_type="Internal"):
+    """Turn action items into To Do tasks in one transaction; returns the number created"""
+    return action_items.promote_to_tasks(item_ids, related_client, priority, task_type, db_path=get_db_path())
+
+def get_record_history(table, record_id, limit=50):
+    """Latest changes to one record, newest first, one row per changed field"""
+    return audit.get_history(get_db_path(), table, record_id, limit)
+
+def get_report(name):
+    """Run a named analytics report, returning (DataFrame, engine name)"""
+    return analytics.run_report(get_db_path(), name)
+
+def add_client(name, services, start_date, campaign_status, assigned_team, 
+              contract_end_date, billing_status, monthly_budget, notes):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    INSERT INTO clients (name, services, start_date, campaign_status, assigned_team, 
+                        contract_end_date, billing_status, monthly_budget, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (name, services, start_date, campaign_status, assigned_team, 
+          contract_end_date, billing_status, monthly_budget, notes))
+    conn.commit()
+    conn.close()
+
+def update_client(id, name, services, start_date, campaign_status, assigned_team, 
+                 contract_end_date, billing_status, monthly_budget, notes):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    UPDATE clients
+    SET name = ?, services = ?, start_date = ?, campaign_status = ?, assigned_team = ?,
+        contract_end_date = ?, billing_status = ?, monthly_budget = ?, notes = ?
+    WHERE id = ?
+    ''', (name, services, start_date, campaign_status, assigned_team, 
+          contract_end_date, billing_status, monthly_budget, notes, int(id)))
+    conn.commit()
+    conn.close()
+
+def delete_client(id):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("DELETE FROM clients WHERE id = ?", (int(id),))
+    conn.commit()
+    conn.close()
+
+def add_task(title, related_client, assigned_to, due_date, status, priority, 
+            task_type, estimated_hours, actual_hours, notes):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority, 
+                      task_type, estimated_hours, actual_hours, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (title, related_client, assigned_to, due_date, status, priority, 
+          task_type, estimated_hours, actual_hours, notes))
+    conn.commit()
+    conn.close()
+
+def update_task(id, title, related_client, assigned_to, due_date, status, priority, 
+               task_type, estimated_hours, actual_hours, notes):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    UPDATE tasks
+    SET title = ?, related_client = ?, assigned_to = ?, due_date = ?, status = ?, priority = ?,
+        task_type = ?, estimated_hours = ?, actual_hours = ?, notes = ?
+    WHERE id = ?
+    ''', (title, related_client, assigned_to, due_date, status, priority, 
+          task_type, estimated_hours, actual_hours, notes, int(id)))
+    conn.commit()
+    conn.close()
+
+def delete_task(id):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("DELETE FROM tasks WHERE id = ?", (int(id),))
+    conn.commit()
+    conn.close()
+
+def add_campaign(client_name, campaign_manager, last_review_date, next_review_date,
+                meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+                google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+                ghl_status, landing_page_url):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    INSERT INTO campaigns (client_name, campaign_manager, last_review_date, next_review_date,
+                          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+                          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+                          ghl_status, landing_page_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (client_name, campaign_manager, last_review_date, next_review_date,
+          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+          ghl_status, landing_page_url))
+    conn.commit()
+    conn.close()
+
+def update_campaign(id, client_name, campaign_manager, last_review_date, next_review_date,
+                   meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+                   google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+                   ghl_status, landing_page_url):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''
+    UPDATE campaigns
+    SET client_name = ?, campaign_manager = ?, last_review_date = ?, next_review_date = ?,
+        meta_ads_spend = ?, meta_ads_roas = ?, meta_ads_leads = ?, meta_ads_notes = ?,
+        google_ads_spend = ?, google_ads_roas = ?, google_ads_leads = ?, google_ads_notes = ?,
+        ghl_status = ?, landing_page_url = ?
+    WHERE id = ?
+    ''', (client_name, campaign_manager, last_review_date, next_review_date,
+          meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+          google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+          ghl_status, landing_page_url, int(id)))
+    conn.commit()
+    conn.close()
+
+def delete_campaign(id):
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("DELETE FROM campaigns WHERE id = ?", (int(id),))
+    conn.commit()
+    conn.close()
+
+# Single-field and bulk edits
+TASK_STATUSES = ("To Do", "In Progress", "Review", "Done")
+TASK_PRIORITIES = ("Low", "Medium", "High", "Urgent")
+GHL_STATUSES = ("Active", "Needs Setup", "Issues", "Not Applicable")
+CLIENT_CAMPAIGN_STATUSES = ("Active", "Paused", "Needs Attention")
+BILLING_STATUSES = ("Current", "Overdue", "Free Trial", "Pending")
+
+# Values a patched field must take, where it has a fixed set
+FIELD_CHOICES = {
+    ("tasks", "status"): TASK_STATUSES,
+    ("tasks", "priority"): TASK_PRIORITIES,
+    ("campaigns", "ghl_status"): GHL_STATUSES,
+    ("clients", "campaign_status"): CLIENT_CAMPAIGN_STATUSES,
+    ("clients", "billing_status"): BILLING_STATUSES,
+}
+
+def bulk_patch(table, ids, **fields):
+    """Set the same fields on many records in one transaction.
+    
+    Only the given columns are written, with one executemany. Returns the
+    number of records changed.
+    """
+    columns = get_table_columns(table)
+    unknown = [field for field in fields if field not in columns or field == 'id']
+    if unknown or not fields:
+        raise ValueError(f"Cannot patch {', '.join(unknown) or 'no fields'} on {table}")
+    for field, value in fields.items():
+        choices = FIELD_CHOICES.get((table, field))
+        if choices and value not in choices:
+            raise ValueError(f"Unknown {field} for {table}: {value}")
+    
+    values = tuple(fields.values())
+    conn = get_connection()
+    c = conn.cursor()
+    c.executemany(f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?",
+                  [(*values, int(id)) for id in ids])
+    conn.commit()
+    conn.close()
+    return c.rowcount
+
+def patch_record(table, id, **fields):
+    """Update only the given columns of one record. Returns True if it exists."""
+    return bulk_patch(table, [id], **fields) > 0
+
+def set_task_status(id, status):
+    return patch_record("tasks", id, status=status)
+
+def set_task_priority(id, priority):
+    return patch_record("tasks", id, priority=priority)
+
+def set_campaign_ghl_status(id, ghl_status):
+    return patch_record("campaigns", id, ghl_status=ghl_status)
+
+def save_sop(id, name, category, content, last_updated):
+    """Insert an SOP, or update it when `id` is given"""
+    conn = get_connection()
+    c = conn.cursor()
+    if id is None:
+        c.execute('''
+        INSERT INTO sops (name, category, content, last_updated)
+        VALUES (?, ?, ?, ?)
+        ''', (name, category, content, last_updated))
+    else:
+        c.execute('''
+        UPDATE sops
+        SET name = ?, category = ?, content = ?, last_updated = ?
+        WHERE id = ?
+        ''', (name, category, content, last_updated, int(id)))
+    conn.commit()
+    conn.close()
+
+def save_team_member(id, name, role, email, phone, department, skills):
+    """Insert a team member, or update them when `id` is given"""
+    conn = get_connection()
+    c = conn.cursor()
+    if id is None:
+        c.execute('''
+        INSERT INTO team_directory (name, role, email, phone, department, skills)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (name, role, email, phone, department, skills))
+    else:
+        c.execute('''
+        UPDATE team_directory
+        SET name = ?, role = ?, email = ?, phone = ?, department = ?, skills = ?
+        WHERE id = ?
+        ''', (name, role, email, phone, department, skills, int(id)))
+    conn.commit()
+    conn.close()
+
+def save_meeting(id, title, date, attendees, meeting_type, notes, action_item_text):
+    """Insert meeting notes, or update them when `id` is given, and re-parse their action items"""
+    conn = get_connection()
+    c = conn.cursor()
+    if id is None:
+        c.execute('''
+        INSERT INTO meeting_notes (title, date, attendees, meeting_type, notes, action_items)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (title, date, attendees, meeting_type, notes, action_item_text))
+        id = c.lastrowid
+    else:
+        c.execute('''
+        UPDATE meeting_notes
+        SET title = ?, date = ?, attendees = ?, meeting_type = ?, notes = ?, action_items = ?
+        WHERE id = ?
+        ''', (title, date, attendees, meeting_type, notes, action_item_text, int(id)))
+    action_items.sync_meeting(conn, int(id), action_item_text, date)
+    conn.commit()
+    conn.close()
+
+def save_quick_link(id, name, category, url, description):
+    """Insert a quick link, or update it when `id` is given"""
+    conn = get_connection()
+    c = conn.cursor()
+    if id is None:
+        c.execute('''
+        INSERT INTO quick_links (name, category, url, description)
+        VALUES (?, ?, ?, ?)
+        ''', (name, category, url, description))
+    else:
+        c.execute('''
+        UPDATE quick_links
+        SET name = ?, category = ?, url = ?, description = ?
+        WHERE id = ?
+        ''', (name, category, url, description, int(id)))
+    conn.commit()
+    conn.close()
+
+# Bulk import / export
+def get_table_columns(table, conn=None):
+    """Stored (non-generated) columns of one of the TABLE_SCHEMAS tables"""
+    if table not in TABLE_SCHEMAS:
+        raise ValueError(f"Unknown table: {table}")
+    own_conn = conn is None
+    conn = conn or get_connection()
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if own_conn:
+        conn.close()
+    return columns
+
+def export_table(table):
+    """Raw rows of a table, as stored"""
+    conn = get_connection()
+    df = pd.read_sql_query(f"SELECT {', '.join(get_table_columns(table, conn))} FROM {table}", conn)
+    conn.close()
+    return df
+
+def import_rows(table, df, replace=False):
+    """Insert the rows of a DataFrame into a table in one transaction.
+    
+    Columns the table doesn't have are rejected. A row whose id already exists
+    updates that record's imported columns and leaves its other columns as
+    they are; with replace=True the table is emptied first. Returns the number
+    of rows written.
+    """
+    conn = get_connection()
+    
+    try:
+        table_columns = get_table_columns(table, conn)
+        unknown = [col for col in df.columns if col not in table_columns]
+        if unknown:
+            raise ValueError(f"{table} has no column(s): {', '.join(unknown)}")
+        
+        columns = list(df.columns)
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        
+        # Existing ids are updated in place rather than replaced, so update
+        # triggers (audit log, assignee load) see the old values
+        upsert = ""
+        if 'id' in columns:
+            updated = [col for col in columns if col != 'id']
+            upsert = "ON CONFLICT (id) DO " + (
+                "UPDATE SET " + ", ".join(f"{col} = excluded.{col}" for col in updated)
+                if updated else "NOTHING")
+        
+        conn.execute("BEGIN IMMEDIATE")
+        if replace:
+            conn.execute(f"DELETE FROM {table}")
+        conn.executemany(f'''
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join('?' for _ in columns)})
+        {upsert}
+        ''', rows)
+        if table == "meeting_notes":
+            action_items.sync_all_meetings(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    
+    return len(df)
+
+# Grid editing
+# Columns shown in the editable grids, in order, and the ones that can't be empty
+GRID_COLUMNS = {
+    "clients": ["name", "services", "start_date", "campaign_status", "assigned_team",
+                "contract_end_date", "billing_status", "monthly_budget", "notes"],
+    "tasks": ["title", "related_client", "assigned_to", "due_date", "status", "priority",
+              "task_type", "estimated_hours", "actual_hours", "notes"],
+    "campaigns": ["client_name", "campaign_manager", "last_review_date", "next_review_date",
+                  "meta_ads_spend", "meta_ads_roas", "meta_ads_leads", "meta_ads_notes",
+                  "google_ads_spend", "google_ads_roas", "google_ads_leads", "google_ads_notes",
+                  "ghl_status", "landing_page_url"],
+}
+GRID_REQUIRED_COLUMNS = {
+    "clients": ["name"],
+    "tasks": ["title"],
+    "campaigns": ["client_name"],
+}
+
+def to_grid_frame(df, table):
+    """Editable copy of a typed table frame: id plus the grid columns, with
+    categories as text, dates as datetime.date (None when missing) and
+    integers as nullable Int64
+    """
+    schema = TABLE_SCHEMAS[table]
+    grid = df[['id'] + GRID_COLUMNS[table]].reset_index(drop=True)
+    
+    for col in schema.get("category", []):
+        if col in grid:
+            grid[col] = grid[col].astype(object).where(grid[col].notna(), None)
+    for col in schema.get("date", []):
+        if col in grid:
+            grid[col] = grid[col].dt.date.astype(object).where(grid[col].notna(), None)
+    # Loaded integers are downcast; widen them so any edited value fits
+    for col in schema.get("integer", []):
+        if col in grid:
+            grid[col] = grid[col].astype("Int64")
+    
+    return grid
+
+def diff_grid(original, edited, table):
+    """Find what changed between two grid frames.
+    
+    Rows are matched on id: rows without an id are new, ids missing from
+    `edited` were deleted, and for the rest only cells whose value differs are
+    kept. Returns (inserted rows as dicts, {id: {column: new value}}, deleted ids).
+    """
+    columns = GRID_COLUMNS[table]
+    
+    new_rows = edited[edited['id'].isna()]
+    inserted = [{col: value for col, value in row.items() if value is not None}
+                for row in new_rows[columns].astype(object).where(new_rows[columns].notna(), None).to_dict("records")]
+    
+    before = original.set_index('id')[columns]
+    after = edited[edited['id'].notna()].set_index('id')[columns]
+    after.index = after.index.astype(before.index.dtype)
+    
+    deleted = [int(id) for id in before.index.difference(after.index)]
+    
+    # Compare cell by cell over the rows both frames share, treating two
+    # missing values as equal
+    common = before.index.intersection(after.index)
+    before, after = before.loc[common].astype(object), after.loc[common].astype(object)
+    changed = before.ne(after) & ~(before.isna() & after.isna())
+    
+    updated = {}
+    for id in changed.index[changed.any(axis=1)]:
+        row_changed = changed.loc[id]
+        updated[int(id)] = {col: (None if pd.isna(after.at[id, col]) else after.at[id, col])
+                            for col in row_changed.index[row_changed]}
+    
+    return inserted, updated, deleted
+
+def validate_grid_changes(table, inserted, updated):
+    """Problems with a grid edit, as readable messages (empty when it can be saved)"""
+    problems = []
+    for label, fields, check_required in (
+        [(f"New row {n}", row, True) for n, row in enumerate(inserted, 1)]
+        + [(f"Row {id}", fields, False) for id, fields in updated.items()]
+    ):
+        for col in GRID_REQUIRED_COLUMNS[table]:
+            if (check_required or col in fields) and fields.get(col) in (None, ""):
+                problems.append(f"{label}: {col} can't be empty")
+        for col, value in fields.items():
+            choices = FIELD_CHOICES.get((table, col))
+            if choices and value is not None and value not in choices:
+                problems.append(f"{label}: {value!r} isn't a valid {col}")
+    return problems
+
+def _grid_value(value):
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.strftime(DATE_FORMAT)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return value
+
+def save_grid_changes(table, inserted, updated, deleted):
+    """Write a grid edit in one transaction.
+    
+    New rows go in with one executemany, updates are batched by the set of
+    columns they change so each batch is one executemany writing only those
+    columns, and deletes are a single executemany. Raises ValueError (and
+    writes nothing) if the edit doesn't validate.
+    """
+    problems = validate_grid_changes(table, inserted, updated)
+    if problems:
+        raise ValueError("; ".join(problems))
+    
+    update_batches = {}
+    for id, fields in updated.items():
+        columns = tuple(sorted(fields))
+        update_batches.setdefault(columns, []).append(
+            tuple(_grid_value(fields[col]) for col in columns) + (id,))
+    
+    insert_batches = {}
+    for row in inserted:
+        columns = tuple(sorted(row))
+        insert_batches.setdefault(columns, []).append(tuple(_grid_value(row[col]) for col in columns))
+    
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for columns, rows in insert_batches.items():
+            conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                             rows)
+        for columns, rows in update_batches.items():
+            conn.executemany(f"UPDATE {table} SET {', '.join(f'{col} = ?' for col in columns)} WHERE id = ?",
+                             rows)
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(id,) for id in deleted])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    
+    return len(inserted), len(updated), len(deleted)
+
+# Cross-agency reporting
+CROSS_TENANT_KPI_SQL = '''
+SELECT
+    (SELECT COUNT(*) FROM clients) AS clients,
+    (SELECT COUNT(*) FROM clients WHERE campaign_status = 'Active') AS active_clients,
+    (SELECT COUNT(*) FROM clients WHERE campaign_status = 'Needs Attention') AS needs_attention,
+    (SELECT COALESCE(SUM(monthly_budget), 0) FROM clients) AS monthly_revenue,
+    (SELECT COUNT(*) FROM tasks WHERE status != 'Done') AS open_tasks,
+    (SELECT COUNT(*) FROM tasks WHERE status != 'Done' AND due_date < date('now')) AS overdue_tasks,
+    (SELECT COALESCE(SUM(COALESCE(meta_ads_spend, 0) + COALESCE(google_ads_spend, 0)), 0) FROM campaigns) AS ad_spend,
+    (SELECT COALESCE(SUM(COALESCE(meta_ads_leads, 0) + COALESCE(google_ads_leads, 0)), 0) FROM campaigns) AS leads
+'''
+
+def get_cross_tenant_kpis():
+    """Headline KPIs for every agency, queried from all shards in parallel"""
+    return tenants.get_router().query_all(CROSS_TENANT_KPI_SQL)
@@ -0,0 +1,155 @@
+"""Monthly recurring revenue forecast.
+
+Projects each client's monthly_budget over the next FORECAST_MONTHS months:
+
+- a client counts from the month of its start_date;
+- until the month its contract_end_date falls in, revenue is contracted;
+- after that the contract renews every RENEWAL_TERM_MONTHS months with the
+  probability for its billing status (RENEWAL_PROBABILITY), so expected
+  revenue decays by that probability at each renewal. Contracts that have
+  already ended are up for renewal now. Clients without an end date are
+  treated as rolling and never lapse;
+- a free trial earns nothing until FREE_TRIAL_DAYS after its start, then
+  converts with probability FREE_TRIAL_CONVERSION.
+
+The months are computed together as one clients x months array of month
+numbers, so the cost is a few array operations whatever the client count.
+Results are cached per version of the clients table (see table_versions)
+and per forecast month, so repeated page loads cost a single version lookup.
+
+    python forecast.py --db masterflo_dashboard.db
+"""
+import argparse
+import sqlite3
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = "masterflo_dashboard.db"
+
+# Months projected, starting with the current month
+FORECAST_MONTHS = 12
+
+# Chance a client renews when its contract term ends, by billing status.
+# Free trials that convert are billed like current clients from then on.
+RENEWAL_PROBABILITY = {
+    "Current": 0.85,
+    "Pending": 0.7,
+    "Overdue": 0.5,
+    "Free Trial": 0.85,
+}
+DEFAULT_RENEWAL_PROBABILITY = 0.7
+
+# Length of a renewed contract
+RENEWAL_TERM_MONTHS = 12
+
+# Free trials run this long from their start date, then convert with this probability
+FREE_TRIAL_DAYS = 30
+FREE_TRIAL_CONVERSION = 0.4
+
+def get_clients_version(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT version FROM table_versions WHERE table_name = 'clients'").fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+def load_client_revenue(db_path):
+    """Load only the columns the forecast needs"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query('''
+    SELECT name, monthly_budget, start_date, contract_end_date, billing_status
+    FROM clients
+    ''', conn)
+    conn.close()
+    return df
+
+def month_number(dates):
+    """Months since year 0 for each date (NaN where the date is missing)"""
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=float)
+
+def compute_forecast(clients, today, months=FORECAST_MONTHS):
+    """Return {"monthly": ..., "renewals": ...} frames for a clients frame.
+
+    monthly has one row per month with contracted, expected and best_case
+    revenue and the number of contracts ending that month. renewals lists
+    the clients whose contract ends in the forecast window.
+    """
+    today = pd.Timestamp(today)
+    first_month = today.year * 12 + today.month - 1
+    budget = pd.to_numeric(clients["monthly_budget"], errors="coerce").fillna(0).to_numpy()
+    start = pd.to_datetime(clients["start_date"], format="ISO8601", errors="coerce")
+    end = pd.to_datetime(clients["contract_end_date"], format="ISO8601", errors="coerce")
+    billing = clients["billing_status"].astype(str)
+    is_trial = (billing == "Free Trial").to_numpy()
+    renewal = billing.map(RENEWAL_PROBABILITY).fillna(DEFAULT_RENEWAL_PROBABILITY).to_numpy()
+
+    # clients x months grid of month numbers
+    month = first_month + np.arange(months)[np.newaxis, :]
+    start_month = np.nan_to_num(month_number(start), nan=first_month)[:, np.newaxis]
+    trial_end_month = np.nan_to_num(month_number(start + pd.Timedelta(days=FREE_TRIAL_DAYS)),
+                                    nan=first_month)[:, np.newaxis]
+    # Missing end dates never lapse; ended contracts come up for renewal this month
+    end_month = np.maximum(np.nan_to_num(month_number(end), nan=np.inf), first_month)[:, np.newaxis]
+
+    started = month >= start_month
+    in_contract = month <= end_month
+    renewals = np.ceil(np.clip(month - end_month, 0, None) / RENEWAL_TERM_MONTHS)
+    in_trial = is_trial[:, np.newaxis] & (month < trial_end_month)
+    conversion = np.where(is_trial, FREE_TRIAL_CONVERSION, 1.0)[:, np.newaxis]
+
+    paying = started & ~in_trial
+    base = np.where(paying, budget[:, np.newaxis], 0.0)
+    contracted = np.where(in_contract & ~is_trial[:, np.newaxis], base, 0.0)
+    expected = base * conversion * renewal[:, np.newaxis] ** renewals
+    ending = (month == end_month) & np.isfinite(end_month) & (month_number(end)[:, np.newaxis] >= first_month)
+
+    month_starts = pd.date_range(today.replace(day=1).normalize(), periods=months, freq="MS")
+    monthly = pd.DataFrame({
+        "month": month_starts,
+        "contracted": contracted.sum(axis=0),
+        "expected": expected.sum(axis=0),
+        "best_case": base.sum(axis=0),
+        "contracts_ending": ending.sum(axis=0),
+    })
+
+    window_end = month_starts[-1] + pd.offsets.MonthEnd(1)
+    upcoming = end.notna() & (end >= month_starts[0]) & (end <= window_end)
+    renewals_df = pd.DataFrame({
+        "name": clients["name"],
+        "contract_end_date": end,
+        "billing_status": billing,
+        "monthly_budget": budget,
+        "renewal_probability": renewal,
+    })[upcoming.to_numpy()].sort_values("contract_end_date", ignore_index=True)
+
+    return {"monthly": monthly, "renewals": renewals_df}
+
+@lru_cache(maxsize=32)
+def _cached_forecast(db_path, clients_version, month_start, months):
+    return compute_forecast(load_client_revenue(db_path), month_start, months)
+
+def get_forecast(db_path, today=None, months=FORECAST_MONTHS):
+    """Forecast frames for a database, recomputed only when the clients table changes.
+
+    The returned frames are shared between callers and must not be modified.
+    """
+    month_start = (today or date.today()).replace(day=1)
+    return _cached_forecast(db_path, get_clients_version(db_path), month_start, months)
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast monthly recurring revenue.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--months", type=int, default=FORECAST_MONTHS, help="Months to project")
+    args = parser.parse_args()
+
+    forecast = get_forecast(args.db, months=args.months)
+    monthly = forecast["monthly"].assign(month=forecast["monthly"]["month"].dt.strftime("%Y-%m"))
+    print(monthly.round(2).to_string(index=False))
+    if len(forecast["renewals"]):
+        print()
+        print(forecast["renewals"].to_string(index=False))
+
+if __name__ == "__main__":
+    main()
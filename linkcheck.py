@@ -0,0 +1,244 @@
+"""Health checks for quick links and campaign landing pages.
+
+Every http(s) URL in quick_links.url and campaigns.landing_page_url is
+fetched concurrently and the outcome goes to the link_checks table (see
+init_db in database.py), one row per distinct URL:
+
+- status: the final HTTP status after redirects (NULL if no response);
+- ttfb_ms: time from sending the request to receiving the response headers;
+- page_bytes: size of the page body itself (not its images or scripts),
+  capped at MAX_PAGE_BYTES;
+- error: why the check failed (timeout, DNS, refused connection, ...).
+
+Results are cached for LINK_CHECK_TTL_MINUTES: a run only re-checks URLs
+whose last check is older than that, or that were never checked.
+
+Requests go through one pooled aiohttp session (aiohttp is in
+requirements.txt). If it isn't installed each request runs on a worker
+thread with urllib instead, which opens a new connection per request. Either way no more
+than MAX_CONCURRENT_CHECKS requests are in flight, and no more than
+MAX_CHECKS_PER_HOST to any one host.
+
+Run it from cron (or any scheduler) with:
+
+    python linkcheck.py --db masterflo_dashboard.db
+"""
+import argparse
+import asyncio
+import http.client
+import logging
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DB_PATH = "masterflo_dashboard.db"
+
+# Where URLs are found: table -> column
+LINK_SOURCES = {
+    "quick_links": "url",
+    "campaigns": "landing_page_url",
+}
+
+# A URL's last result is reused for this long before it is checked again
+LINK_CHECK_TTL_MINUTES = 60
+
+# How often the in-app scheduler checks for stale URLs
+LINK_CHECK_INTERVAL_MINUTES = 15
+
+MAX_CONCURRENT_CHECKS = 20
+MAX_CHECKS_PER_HOST = 4
+
+# Seconds allowed to connect, and for the whole request including the body
+CONNECT_TIMEOUT = 5
+REQUEST_TIMEOUT = 15
+
+# Page bodies are read up to this size; larger pages are reported at the cap
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+USER_AGENT = "MasterFLO-LinkCheck/1.0"
+
+logger = logging.getLogger(__name__)
+
+def _host(url):
+    """The URL's host, or None if it has none or can't be parsed"""
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
+
+def collect_urls(conn):
+    """Distinct http(s) URLs referenced by LINK_SOURCES"""
+    selects = " UNION ".join(f"SELECT {column} FROM {table}" for table, column in LINK_SOURCES.items())
+    urls = [row[0].strip() for row in conn.execute(selects) if row[0]]
+    return sorted({url for url in urls if url.lower().startswith(("http://", "https://")) and _host(url)})
+
+def stale_urls(conn, urls, ttl_minutes=LINK_CHECK_TTL_MINUTES, now=None):
+    """The URLs with no check newer than the TTL"""
+    cutoff = ((now or datetime.now()) - timedelta(minutes=ttl_minutes)).strftime("%Y-%m-%d %H:%M:%S")
+    fresh = {row[0] for row in conn.execute("SELECT url FROM link_checks WHERE checked_at >= ?", (cutoff,))}
+    return [url for url in urls if url not in fresh]
+
+def _result(url, status=None, ttfb=None, page_bytes=None, error=None):
+    return {
+        "url": url,
+        "status": status,
+        "ok": int(status is not None and 200 <= status < 400),
+        "ttfb_ms": round(ttfb * 1000, 1) if ttfb is not None else None,
+        "page_bytes": page_bytes,
+        "error": error,
+    }
+
+def _describe(error):
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "Timed out"
+    if isinstance(error, urllib.error.URLError) and not isinstance(error, urllib.error.HTTPError):
+        error = error.reason
+    return str(error) or type(error).__name__
+
+async def _check_aiohttp(session, url):
+    started = time.perf_counter()
+    try:
+        async with session.get(url) as response:
+            ttfb = time.perf_counter() - started
+            page_bytes = 0
+            async for chunk in response.content.iter_chunked(READ_CHUNK_BYTES):
+                page_bytes += len(chunk)
+                if page_bytes >= MAX_PAGE_BYTES:
+                    break
+            return _result(url, response.status, ttfb, min(page_bytes, MAX_PAGE_BYTES))
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        return _result(url, error=_describe(e))
+
+def _fetch_urllib(url):
+    started = time.perf_counter()
+    try:
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        response = urllib.request.urlopen(request, timeout=CONNECT_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        # 4xx/5xx still have a status and a body worth measuring
+        response = e
+    except (urllib.error.URLError, OSError, http.client.HTTPException, ValueError) as e:
+        # HTTPException/ValueError: a malformed URL (spaces, bad port, ...) or response
+        return _result(url, error=_describe(e))
+
+    ttfb = time.perf_counter() - started
+    page_bytes = 0
+    try:
+        with response:
+            while page_bytes < MAX_PAGE_BYTES:
+                if time.perf_counter() - started > REQUEST_TIMEOUT:
+                    return _result(url, response.status, ttfb, error="Timed out reading the page")
+                chunk = response.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                page_bytes += len(chunk)
+    except (OSError, http.client.HTTPException) as e:
+        return _result(url, response.status, ttfb, error=_describe(e))
+    return _result(url, response.status, ttfb, min(page_bytes, MAX_PAGE_BYTES))
+
+async def check_urls(urls):
+    """Check every URL concurrently, within the global and per-host limits"""
+    overall = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+    per_host = defaultdict(lambda: asyncio.Semaphore(MAX_CHECKS_PER_HOST))
+
+    async def limited(check, url):
+        async with overall, per_host[_host(url)]:
+            try:
+                return await check(url)
+            except Exception as e:
+                # One bad URL is recorded as its own failure, never aborts the run
+                logger.warning("Checking %s failed: %r", url, e)
+                return _result(url, error=_describe(e))
+
+    if aiohttp is not None:
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_CHECKS, limit_per_host=MAX_CHECKS_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, sock_connect=CONNECT_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"User-Agent": USER_AGENT}) as session:
+            return await asyncio.gather(*(limited(lambda u: _check_aiohttp(session, u), url) for url in urls))
+
+    return await asyncio.gather(*(limited(lambda u: asyncio.to_thread(_fetch_urllib, u), url) for url in urls))
+
+def run_checks(db_path=DB_PATH, force=False, ttl_minutes=LINK_CHECK_TTL_MINUTES):
+    """Check every URL whose cached result has expired (all of them with force=True).
+
+    Returns {"urls": distinct URLs found, "checked": URLs checked this run,
+    "broken": of those, how many failed}.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        urls = collect_urls(conn)
+        due = urls if force else stale_urls(conn, urls, ttl_minutes)
+    finally:
+        conn.close()
+
+    if not due:
+        return {"urls": len(urls), "checked": 0, "broken": 0}
+
+    # No connection is held open while the requests are in flight
+    results = asyncio.run(check_urls(due))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+    INSERT INTO link_checks (url, status, ok, ttfb_ms, page_bytes, error, checked_at)
+    VALUES (:url, :status, :ok, :ttfb_ms, :page_bytes, :error, CURRENT_TIMESTAMP)
+    ON CONFLICT(url) DO UPDATE SET status = excluded.status, ok = excluded.ok, ttfb_ms = excluded.ttfb_ms,
+                                   page_bytes = excluded.page_bytes, error = excluded.error,
+                                   checked_at = excluded.checked_at
+    ''', results)
+    conn.commit()
+    conn.close()
+
+    return {"urls": len(urls), "checked": len(results), "broken": sum(not r["ok"] for r in results)}
+
+def get_link_checks(db_path=DB_PATH):
+    """The latest result for every checked URL"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query('''
+    SELECT url, status, ok, ttfb_ms, page_bytes, error, checked_at
+    FROM link_checks
+    ''', conn)
+    conn.close()
+    return df
+
+def start_scheduler(db_path=DB_PATH, interval_minutes=LINK_CHECK_INTERVAL_MINUTES):
+    """Check stale URLs now and then every `interval_minutes` on a daemon thread"""
+    def run():
+        while True:
+            try:
+                run_checks(db_path)
+            except Exception:
+                # Keep checking on the next interval whatever went wrong
+                logger.exception("Link check run failed")
+            time.sleep(interval_minutes * 60)
+
+    thread = threading.Thread(target=run, name="masterflo-link-checker", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Check quick links and campaign landing pages.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the dashboard database")
+    parser.add_argument("--force", action="store_true", help="Re-check every URL, even ones checked recently")
+    parser.add_argument("--ttl-minutes", type=int, default=LINK_CHECK_TTL_MINUTES,
+                        help="Reuse results newer than this")
+    args = parser.parse_args()
+
+    result = run_checks(args.db, args.force, args.ttl_minutes)
+    print(f"Checked {result['checked']} of {result['urls']} URL(s): {result['broken']} broken")
+
+if __name__ == "__main__":
+    main()
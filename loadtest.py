@@ -0,0 +1,532 @@
+"""Load test for the dashboard: many simulated users against a running server.
+
+A `streamlit run app.py` server is started on a local port against a
+generated dataset (or --url points at one already running), and each
+simulated user opens its own websocket session, speaking the same protocol
+as a browser tab: widget values go up in rerun requests and the page comes
+back as element deltas. So every timed rerun includes what users wait for:
+script execution on the server's shared caches and connections, delta
+serialization, and the websocket round trip. Sessions repeat realistic
+click paths and the report shows, per page and overall:
+
+- latency percentiles (p50/p95/p99) and error rates,
+- reruns per second across all sessions.
+
+Results are saved as JSON; pass an earlier result to --compare to see how a
+change moved the numbers.
+
+    python loadtest.py --sessions 8 --duration 60 --output results/baseline.json
+    python loadtest.py --sessions 8 --duration 60 --compare results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+import action_items
+import database
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Seconds a single rerun may take before it counts as an error
+RERUN_TIMEOUT = 60
+
+# Seconds to wait for the test server to come up
+SERVER_START_TIMEOUT = 60
+
+# Page label for a session's first load, kept apart from the page numbers
+# because it includes the one-off work of starting a session
+SESSION_START = "(session start)"
+
+# Generated dataset
+DATASET_SIZES = {"clients": 100, "tasks": 300, "team": 20, "sops": 40, "meetings": 150}
+
+STYLES = ["Karate", "Taekwondo", "BJJ", "Muay Thai", "Judo", "Kung Fu", "Krav Maga", "MMA"]
+SERVICES = ["Meta Ads", "Google Ads", "GHL", "Website", "SEO"]
+DEPARTMENTS = ["Ads", "Content", "Client Success", "Operations"]
+SOP_CATEGORIES = ["Onboarding", "Ads Optimization", "Communication Templates", "Other"]
+TASK_TYPES = ["Ad Creation", "Content", "Website", "Reporting", "Client Communication", "Internal", "GHL"]
+
+def generate_dataset(db_path, sizes=DATASET_SIZES, seed=0):
+    """Create a database at `db_path` filled with a realistic agency of the given size"""
+    rng = random.Random(seed)
+    today = datetime.now()
+    day = lambda offset: (today + timedelta(days=offset)).strftime(database.DATE_FORMAT)
+
+    database.init_db(db_path, seed=False)
+    conn = sqlite3.connect(db_path)
+
+    team = [(f"Team Member {n:02d}", rng.choice(["Ads Manager", "Designer", "Account Manager", "Copywriter"]),
+             f"member{n:02d}@masterflo.ai", f"555-01{n:02d}", rng.choice(DEPARTMENTS),
+             ", ".join(rng.sample(SERVICES, 2)))
+            for n in range(1, sizes["team"] + 1)]
+    conn.executemany('''
+    INSERT INTO team_directory (name, role, email, phone, department, skills)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', team)
+    team_names = [member[0] for member in team]
+
+    clients = [(f"{rng.choice(STYLES)} Academy {n:03d}", ", ".join(rng.sample(SERVICES, rng.randint(1, 3))),
+                day(-rng.randint(30, 900)), rng.choice(database.CLIENT_CAMPAIGN_STATUSES), rng.choice(team_names),
+                day(rng.randint(-30, 365)), rng.choice(database.BILLING_STATUSES),
+                float(rng.randrange(500, 5000, 50)), "Generated for load testing")
+               for n in range(1, sizes["clients"] + 1)]
+    conn.executemany('''
+    INSERT INTO clients (name, services, start_date, campaign_status, assigned_team,
+                         contract_end_date, billing_status, monthly_budget, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', clients)
+    client_names = [client[0] for client in clients]
+
+    conn.executemany('''
+    INSERT INTO tasks (title, related_client, assigned_to, due_date, status, priority,
+                       task_type, estimated_hours, actual_hours, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(f"Task {n:05d}", rng.choice(client_names), rng.choice(team_names), day(rng.randint(-45, 60)),
+           rng.choice(database.TASK_STATUSES), rng.choice(database.TASK_PRIORITIES), rng.choice(TASK_TYPES),
+           float(rng.randint(1, 16)) / 2, None, "")
+          for n in range(1, sizes["tasks"] + 1)])
+
+    conn.executemany('''
+    INSERT INTO campaigns (client_name, campaign_manager, last_review_date, next_review_date,
+                           meta_ads_spend, meta_ads_roas, meta_ads_leads, meta_ads_notes,
+                           google_ads_spend, google_ads_roas, google_ads_leads, google_ads_notes,
+                           ghl_status, landing_page_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(name, rng.choice(team_names), day(-rng.randint(1, 30)), day(rng.randint(1, 30)),
+           float(rng.randrange(0, 4000, 25)), round(rng.uniform(0, 6), 1), rng.randint(0, 80), "",
+           float(rng.randrange(0, 3000, 25)), round(rng.uniform(0, 6), 1), rng.randint(0, 60), "",
+           rng.choice(database.GHL_STATUSES), f"https://example.com/{n}")
+          for n, name in enumerate(client_names, 1)])
+
+    conn.executemany('''
+    INSERT INTO sops (name, category, content, last_updated)
+    VALUES (?, ?, ?, ?)
+    ''', [(f"SOP {n:03d}", rng.choice(SOP_CATEGORIES), "Step one.\n" * rng.randint(5, 60), day(-rng.randint(0, 400)))
+          for n in range(1, sizes["sops"] + 1)])
+
+    conn.executemany('''
+    INSERT INTO meeting_notes (title, date, attendees, meeting_type, notes, action_items)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(f"Meeting {n:03d}", day(-rng.randint(0, 300)), ", ".join(rng.sample(team_names, 3)),
+           rng.choice(["Team", "Client", "Strategy"]), "Discussed progress.\n" * rng.randint(2, 20),
+           f"- {rng.choice(team_names)}: follow up")
+          for n in range(1, sizes["meetings"] + 1)])
+    action_items.sync_all_meetings(conn)
+
+    conn.commit()
+    conn.close()
+
+class ServerSession:
+    """One simulated browser tab, talking to the server over its websocket.
+
+    It speaks the same protocol as the browser: each interaction sends the
+    widget values the tab holds in a rerun request, and the rerun lasts
+    until the server reports the script finished. The elements the server
+    sends are kept (per delta path, replaced on the next full run or on a
+    rerun of their fragment) so click paths can find widgets by label or key.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.elements = {}
+        self.exception = None
+        self._ws = None
+        self._values = {}
+        self._cache = {}
+
+    async def connect(self):
+        self._ws = await websocket_connect(self.url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream")
+        await self.rerun()
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+
+    async def rerun(self, triggers=()):
+        """Send the tab's widget values (plus one-off button triggers) and wait for the run to finish"""
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        for state in self._values.values():
+            message.rerun_script.widget_states.widgets.append(state)
+        for widget_id in triggers:
+            message.rerun_script.widget_states.widgets.add(id=widget_id, trigger_value=True)
+        self.exception = None
+        await self._ws.write_message(message.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._read_until_finished(), RERUN_TIMEOUT)
+
+        # Widgets that are gone no longer send their values, as in a browser
+        shown = {widget.id for _, widget in self.elements.values() if hasattr(widget, "id")}
+        self._values = {widget_id: state for widget_id, state in self._values.items() if widget_id in shown}
+
+    async def _read_until_finished(self):
+        while True:
+            raw = await self._ws.read_message()
+            if raw is None:
+                raise ConnectionError("The server closed the session")
+            message = ForwardMsg()
+            message.ParseFromString(raw)
+            kind = message.WhichOneof("type")
+            if kind == "ref_hash":
+                message = self._cache[message.ref_hash]
+                kind = message.WhichOneof("type")
+            elif message.metadata.cacheable:
+                self._cache[message.hash] = message
+
+            if kind == "new_session":
+                fragments = set(message.new_session.fragment_ids_this_run)
+                self.elements = {path: (fragment, element) for path, (fragment, element) in self.elements.items()
+                                 if fragments and fragment not in fragments}
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception" and self.exception is None:
+                    self.exception = getattr(element, element_type).message
+                self.elements[tuple(message.metadata.delta_path)] = (message.delta.fragment_id,
+                                                                      getattr(element, element_type))
+            elif kind == "script_finished" and message.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return
+
+    def widgets(self, kind):
+        return [element for _, element in self.elements.values() if type(element).__name__ == kind]
+
+    def find(self, kind, label=None, key=None, key_prefix=None):
+        """The first widget of a kind ("Radio", "Button", ...) with this label or user key"""
+        for widget in self.widgets(kind):
+            user_key = widget.id.split("-", 2)[-1]
+            if ((label is None or widget.label == label) and (key is None or user_key == key)
+                    and (key_prefix is None or user_key.startswith(key_prefix))):
+                return widget
+        raise LookupError(f"No {kind} widget with label={label!r} key={key or key_prefix!r}")
+
+    def value(self, widget):
+        """A text or number widget's current value in this tab"""
+        state = self._values.get(widget.id)
+        if state is not None:
+            return getattr(state, state.WhichOneof("value"))
+        return widget.value if widget.set_value else widget.default
+
+    def set_value(self, widget, value):
+        """Change a widget's value in the tab; it is sent with the next rerun"""
+        state = WidgetState(id=widget.id)
+        kind = type(widget).__name__
+        if kind in ("Radio", "Selectbox"):
+            state.int_value = list(widget.options).index(value)
+        elif kind == "MultiSelect":
+            state.int_array_value.data.extend(list(widget.options).index(option) for option in value)
+        elif kind == "Checkbox":
+            state.bool_value = value
+        elif kind == "NumberInput":
+            # Registered as a double whether the input holds ints or floats
+            state.double_value = float(value)
+        else:
+            state.string_value = value
+        self._values[widget.id] = state
+
+    async def change(self, widget, value):
+        self.set_value(widget, value)
+        await self.rerun()
+
+    async def click(self, button):
+        await self.rerun(triggers=[button.id])
+
+# Click paths. Each step is (page, action); the action makes exactly one
+# rerun of the session, which is what gets timed.
+def go_to(page):
+    return lambda session: session.change(session.find("Radio", label="Navigation"), page)
+
+def filter_open_tasks(session):
+    return session.change(session.find("MultiSelect", label="Status"), ["To Do", "In Progress"])
+
+def click(key):
+    return lambda session: session.click(session.find("Button", key=key))
+
+def save_campaign(session):
+    leads = session.find("NumberInput", label="Meta Ads Leads")
+    session.set_value(leads, session.value(leads) + 1)
+    return session.click(session.find("Button", label="Save Campaign"))
+
+def open_first_sop(session):
+    return session.change(session.find("Checkbox", key_prefix="open_sop_"), True)
+
+def edit_first_sop(session):
+    return session.click(session.find("Button", key_prefix="edit_sop_"))
+
+def save_sop(session):
+    content = session.find("TextArea", label="Content")
+    session.set_value(content, f"{session.value(content).rstrip()}\nReviewed {datetime.now():%H:%M:%S}")
+    return session.click(session.find("Button", label="Save SOP"))
+
+SCENARIOS = {
+    "open_dashboard": [
+        ("Dashboard", go_to("Dashboard")),
+    ],
+    "filter_tasks": [
+        ("Team Tasks", go_to("Team Tasks")),
+        ("Team Tasks", filter_open_tasks),
+    ],
+    "edit_campaign": [
+        ("Campaign Tracker", go_to("Campaign Tracker")),
+        ("Campaign Tracker", click("edit_campaign_btn")),
+        ("Campaign Tracker", save_campaign),
+    ],
+    "save_sop": [
+        ("Operations Hub", go_to("Operations Hub")),
+        ("Operations Hub", open_first_sop),
+        ("Operations Hub", edit_first_sop),
+        ("Operations Hub", save_sop),
+    ],
+}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(db_path, port=None):
+    """Start `streamlit run app.py` on a local port against `db_path`; returns (process, url)"""
+    port = port or free_port()
+    workdir = tempfile.mkdtemp(prefix="masterflo-loadtest-server-")
+    env = dict(os.environ, MASTERFLO_DB_PATH=os.path.abspath(db_path),
+               MASTERFLO_TENANTS_FILE=os.path.join(workdir, "tenants.json"))
+    process = subprocess.Popen([sys.executable, "-m", "streamlit", "run", APP_PATH,
+                                "--server.port", str(port), "--server.address", "127.0.0.1",
+                                "--server.headless", "true", "--server.fileWatcherType", "none",
+                                "--browser.gatherUsageStats", "false"],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited while starting: {process.stderr.read()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1):
+                return process, url
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"The server did not start within {SERVER_START_TIMEOUT}s")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+async def run_session(session_id, url, deadline, samples, scenarios, think_time, seed):
+    """One simulated user: open a tab, then run random click paths until the deadline"""
+    rng = random.Random(seed + session_id)
+    session = None
+
+    def record(scenario, page, started, error):
+        samples.append({"session": session_id, "scenario": scenario, "page": page,
+                        "latency_ms": (time.perf_counter() - started) * 1000, "error": error})
+
+    def describe(e):
+        return "Timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+
+    while time.time() < deadline:
+        if session is None:
+            started = time.perf_counter()
+            session = ServerSession(url)
+            try:
+                await session.connect()
+                error = session.exception
+            except Exception as e:
+                error = describe(e)
+            record("start", SESSION_START, started, error)
+            if error:
+                session.close()
+                session = None
+                await asyncio.sleep(1)
+                continue
+
+        scenario = rng.choice(scenarios)
+        for page, action in SCENARIOS[scenario]:
+            if time.time() >= deadline:
+                break
+            started = time.perf_counter()
+            try:
+                await action(session)
+                error = session.exception
+            except Exception as e:
+                error = describe(e)
+            record(scenario, page, started, error)
+            if error:
+                # Start over with a fresh tab rather than clicking on in a broken one
+                session.close()
+                session = None
+                break
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+    if session is not None:
+        session.close()
+
+async def run_sessions(url, sessions, duration, scenarios, think_time, seed):
+    samples = []
+    deadline = time.time() + duration
+    await asyncio.gather(*(run_session(n, url, deadline, samples, scenarios, think_time, seed)
+                           for n in range(sessions)))
+    return samples
+
+def summarize(samples, duration):
+    """Latency percentiles, throughput and error rate per page and overall"""
+    df = pd.DataFrame(samples, columns=["session", "scenario", "page", "latency_ms", "error"])
+
+    def stats(group):
+        latency = group["latency_ms"]
+        return {
+            "reruns": len(group),
+            "errors": int(group["error"].notna().sum()),
+            "error_rate": round(float(group["error"].notna().mean()), 4) if len(group) else 0.0,
+            "throughput_per_s": round(len(group) / duration, 2),
+            "p50_ms": round(float(latency.quantile(0.50)), 1) if len(group) else None,
+            "p95_ms": round(float(latency.quantile(0.95)), 1) if len(group) else None,
+            "p99_ms": round(float(latency.quantile(0.99)), 1) if len(group) else None,
+            "max_ms": round(float(latency.max()), 1) if len(group) else None,
+        }
+
+    timed = df[df["page"] != SESSION_START]
+    return {
+        "overall": stats(timed),
+        "pages": {page: stats(group) for page, group in df.groupby("page", sort=True)},
+        "errors": df["error"].dropna().value_counts().head(10).to_dict(),
+    }
+
+def count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ("clients", "tasks", "campaigns", "sops", "team_directory", "meeting_notes")}
+    conn.close()
+    return counts
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(APP_PATH),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_load_test(db_path=None, sessions=4, duration=30, scenarios=None, think_time=0.0, seed=0,
+                  sizes=DATASET_SIZES, url=None, port=None):
+    """Run `sessions` simulated users for `duration` seconds and return the results dict.
+
+    Unless `url` points at a server that is already running, a server is
+    started on a local port for the test and stopped afterwards. It uses
+    `db_path` as it is, or without one a dataset of `sizes` generated in a
+    temporary directory.
+    """
+    scenarios = list(scenarios or SCENARIOS)
+    server = None
+    if url is None:
+        if db_path is None:
+            db_path = os.path.join(tempfile.mkdtemp(prefix="masterflo-loadtest-"), "loadtest.db")
+            generate_dataset(db_path, sizes, seed)
+        server, url = start_server(db_path, port)
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    try:
+        samples = asyncio.run(run_sessions(url, sessions, duration, scenarios, think_time, seed))
+    finally:
+        if server is not None:
+            stop_server(server)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "server": url,
+            "sessions": sessions,
+            "duration_s": round(elapsed, 1),
+            "think_time_s": think_time,
+            "scenarios": scenarios,
+            "db_path": db_path,
+            "dataset": count_rows(db_path) if db_path else None,
+        },
+        **summarize(samples, elapsed),
+    }
+
+def format_report(results, baseline=None):
+    """Plain-text table of the per-page numbers, with changes against a baseline if given"""
+    meta = results["meta"]
+    width = 17 if baseline else 9
+    lines = [f"{meta['sessions']} session(s) for {meta['duration_s']}s at revision {meta['revision'] or '?'}",
+             f"{'page':<20} {'reruns':>7} {'err%':>6} {'rerun/s':>8} "
+             f"{'p50 ms':>{width}} {'p95 ms':>{width}} {'p99 ms':>{width}}"]
+
+    def row(name, stats, before):
+        def cell(key, width):
+            value = stats.get(key)
+            text = "-" if value is None else f"{value:,.1f}"
+            if before and before.get(key) and value is not None:
+                text += f" ({(value - before[key]) / before[key]:+.0%})"
+            return f"{text:>{width}}"
+        return (f"{name:<20} {stats['reruns']:>7} {stats['error_rate'] * 100:>5.1f}% {stats['throughput_per_s']:>8.2f} "
+                f"{cell('p50_ms', width)} {cell('p95_ms', width)} {cell('p99_ms', width)}")
+
+    for page, stats in results["pages"].items():
+        lines.append(row(page, stats, (baseline or {}).get("pages", {}).get(page)))
+    lines.append(row("overall", results["overall"], (baseline or {}).get("overall")))
+    for error, count in results["errors"].items():
+        lines.append(f"  {count} x {error}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run for")
+    parser.add_argument("--scenario", action="append", dest="scenarios", choices=list(SCENARIOS),
+                        help="Click path to run (repeatable; all by default)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Average pause between clicks, in seconds")
+    parser.add_argument("--db", help="Use this database instead of generating one (it will be written to)")
+    parser.add_argument("--url", help="Test a server that is already running (e.g. http://localhost:8501) "
+                                      "instead of starting one")
+    parser.add_argument("--port", type=int, help="Port for the test server (a free one by default)")
+    parser.add_argument("--tasks", type=int, default=DATASET_SIZES["tasks"], help="Tasks in the generated dataset")
+    parser.add_argument("--clients", type=int, default=DATASET_SIZES["clients"], help="Clients in the generated dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = dict(DATASET_SIZES, tasks=args.tasks, clients=args.clients)
+    results = run_load_test(args.db, args.sessions, args.duration, args.scenarios, args.think_time, args.seed, sizes,
+                            args.url, args.port)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(results, baseline))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Install required dependencies
-pip install streamlit pandas matplotlib plotly
+pip install streamlit pandas matplotlib plotly aiohttp
 
 # Run the Streamlit app
 echo "Starting MasterFLO.ai Dashboard..."
@@ -0,0 +1,135 @@
+"""Ranked fuzzy search over the team directory.
+
+Name, role, department and skills are split into lowercase word tokens, and
+every distinct token is indexed by its trigrams (padded at the front, so a
+token's first letters form trigrams of their own). A query word matches a
+token when:
+
+- the token starts with it (so results narrow as you type), or
+- enough of their trigrams are shared (Jaccard similarity of at least
+  MIN_SIMILARITY), which tolerates typos such as "copywritter".
+
+A member matches when every query word matches one of their tokens, and is
+ranked by the sum over query words of the best similarity times the weight
+of the field it was found in (FIELD_WEIGHTS). Only tokens sharing a trigram
+with the query are ever scored, so a search costs a few dictionary lookups
+however many members the directory holds.
+
+The index is built once per version of the team_directory table (see
+table_versions), so it is rebuilt only after the directory changes.
+"""
+import heapq
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+# How much a match in each field counts towards a member's rank
+FIELD_WEIGHTS = {"name": 3.0, "role": 2.0, "skills": 1.5, "department": 1.0}
+
+# Trigram similarity below which a token does not match a query word
+MIN_SIMILARITY = 0.3
+
+# Results returned by a search
+SEARCH_LIMIT = 25
+
+MEMBER_COLUMNS = ["id", "name", "role", "email", "phone", "department", "skills"]
+
+def get_directory_version(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT version FROM table_versions WHERE table_name = 'team_directory'").fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+def load_members(db_path):
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {', '.join(MEMBER_COLUMNS)} FROM team_directory", conn)
+    conn.close()
+    return df
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower()) if isinstance(text, str) else []
+
+def trigrams(token, prefix=False):
+    """Trigrams of a token padded with two leading blanks (and one trailing, unless it's a prefix)"""
+    padded = f"  {token}" + ("" if prefix else " ")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TeamSearchIndex:
+    """Trigram index from directory tokens to the members whose fields contain them"""
+
+    def __init__(self, members):
+        self.members = members.set_index("id", drop=False)
+        self._names = dict(zip(members["id"], members["name"].fillna("")))
+        # token -> {member id: weight of the best field the token appears in}
+        self._postings = defaultdict(dict)
+        # trigram -> tokens containing it, and each token's trigram count
+        self._trigram_tokens = defaultdict(set)
+        self._trigram_counts = {}
+
+        for field, weight in FIELD_WEIGHTS.items():
+            for member_id, text in zip(members["id"], members[field]):
+                for token in tokenize(text):
+                    postings = self._postings[token]
+                    postings[member_id] = max(postings.get(member_id, 0), weight)
+
+        for token in self._postings:
+            grams = trigrams(token)
+            self._trigram_counts[token] = len(grams)
+            for gram in grams:
+                self._trigram_tokens[gram].add(token)
+
+    def _similar_tokens(self, word):
+        """{token: similarity} for every indexed token matching one query word"""
+        grams = trigrams(word, prefix=True)
+        shared = Counter(token for gram in grams for token in self._trigram_tokens.get(gram, ()))
+
+        matches = {}
+        for token, count in shared.items():
+            if token == word:
+                similarity = 1.0
+            elif token.startswith(word):
+                # Prefixes rank above fuzzy matches, longer prefixes higher
+                similarity = 0.9 + 0.1 * len(word) / len(token)
+            else:
+                similarity = count / (len(grams) + self._trigram_counts[token] - count)
+            if similarity >= MIN_SIMILARITY:
+                matches[token] = similarity
+        return matches
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Members matching every word of the query, best first, with a `score` column"""
+        words = tokenize(query)
+        if not words:
+            return self.members.iloc[:0].assign(score=pd.Series(dtype=float))
+
+        scores = None
+        for word in words:
+            word_scores = {}
+            for token, similarity in self._similar_tokens(word).items():
+                for member_id, weight in self._postings[token].items():
+                    word_scores[member_id] = max(word_scores.get(member_id, 0), similarity * weight)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {member_id: score + word_scores[member_id]
+                          for member_id, score in scores.items() if member_id in word_scores}
+            if not scores:
+                break
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+        results = self.members.loc[[member_id for member_id, _ in ranked]]
+        return results.assign(score=[score for _, score in ranked])
+
+@lru_cache(maxsize=16)
+def _cached_index(db_path, directory_version):
+    return TeamSearchIndex(load_members(db_path))
+
+def get_index(db_path):
+    """The search index for a database's current team directory"""
+    return _cached_index(db_path, get_directory_version(db_path))
+
+def search_team(db_path, query, limit=SEARCH_LIMIT):
+    return get_index(db_path).search(query, limit)
@@ -0,0 +1,174 @@
+"""Multi-tenant routing for the MasterFLO.ai dashboard.
+
+Each franchise agency (tenant) gets its own SQLite file, so agencies no
+longer share one writer lock or one growing dataset. Tenants are listed in
+tenants.json next to the app:
+
+    {
+        "masterflo": {"name": "MasterFLO.ai", "db_path": "masterflo_dashboard.db"},
+        "dojo-north": {"name": "Dojo North Marketing", "db_path": "shards/dojo-north.db"}
+    }
+
+An agency can be given an "access_code"; the dashboard then only opens it
+for sessions that have entered that code. Agencies without one are open to
+every session, so a tenants.json without codes has no access control.
+
+Without a tenants.json the app runs as a single tenant on
+masterflo_dashboard.db (or the file named by MASTERFLO_DB_PATH), exactly as
+before.
+
+The data layer resolves the current tenant itself, so functions don't take
+a tenant argument. The app registers a resolver that reads the session's
+tenant from st.session_state (see set_tenant_resolver): a Streamlit session
+runs each rerun, callback and fragment on a new thread, so nothing set on
+the thread survives from one to the next. Scripts and the CLI set it with
+set_current_tenant, which lasts for the rest of the process's context. With
+more than one tenant configured and none resolved, routing raises
+NoTenantError rather than guessing a shard.
+"""
+import contextvars
+import hmac
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+TENANTS_FILE = os.environ.get("MASTERFLO_TENANTS_FILE", "tenants.json")
+DEFAULT_TENANT = "masterflo"
+DEFAULT_DB_PATH = os.environ.get("MASTERFLO_DB_PATH", "masterflo_dashboard.db")
+
+# Seconds a connection waits on a locked shard before raising
+SHARD_BUSY_TIMEOUT = 10
+
+# Upper bound on shards queried at once by cross-tenant reports
+MAX_PARALLEL_SHARDS = 8
+
+_current_tenant = contextvars.ContextVar("masterflo_tenant", default=None)
+
+# Callable returning the tenant for the current app session (or None)
+_tenant_resolver = None
+
+class NoTenantError(LookupError):
+    """Raised when several tenants are configured and none was selected"""
+
+def load_tenants(tenants_file=TENANTS_FILE):
+    """Return {tenant_id: {"name": ..., "db_path": ...}} from the tenants file"""
+    if not os.path.exists(tenants_file):
+        return {DEFAULT_TENANT: {"name": "MasterFLO.ai", "db_path": DEFAULT_DB_PATH}}
+
+    with open(tenants_file) as f:
+        tenants = json.load(f)
+
+    for tenant_id, tenant in tenants.items():
+        tenant.setdefault("name", tenant_id)
+        tenant.setdefault("db_path", os.path.join("shards", f"{tenant_id}.db"))
+
+    return tenants
+
+class TenantRouter:
+    """Map tenants to their shard files and run work against one or all shards"""
+
+    def __init__(self, tenants=None):
+        self.tenants = tenants if tenants is not None else load_tenants()
+
+    @property
+    def default_tenant(self):
+        return DEFAULT_TENANT if DEFAULT_TENANT in self.tenants else next(iter(self.tenants))
+
+    def current_tenant(self):
+        """The selected tenant; only a single-tenant setup falls back to the default"""
+        tenant = (_tenant_resolver() if _tenant_resolver is not None else None) or _current_tenant.get()
+        if tenant is None:
+            if len(self.tenants) > 1:
+                raise NoTenantError(f"No tenant selected (one of: {', '.join(self.tenants)})")
+            return self.default_tenant
+        if tenant not in self.tenants:
+            raise KeyError(f"Unknown tenant: {tenant}")
+        return tenant
+
+    def open_tenants(self):
+        """Tenants without an access code, which any session may use"""
+        return [tenant for tenant, config in self.tenants.items() if not config.get("access_code")]
+
+    def tenants_for_code(self, code):
+        """Tenants whose access code is `code`"""
+        return [tenant for tenant, config in self.tenants.items()
+                if config.get("access_code")
+                and hmac.compare_digest(str(config["access_code"]).encode(), code.encode())]
+
+    def db_path(self, tenant=None):
+        tenant = tenant or self.current_tenant()
+        if tenant not in self.tenants:
+            raise KeyError(f"Unknown tenant: {tenant}")
+        return self.tenants[tenant]["db_path"]
+
+    def connect(self, tenant=None):
+        """Open a connection to a tenant's shard (the current tenant by default)"""
+        db_path = self.db_path(tenant)
+        shard_dir = os.path.dirname(db_path)
+        if shard_dir:
+            os.makedirs(shard_dir, exist_ok=True)
+        return sqlite3.connect(db_path, timeout=SHARD_BUSY_TIMEOUT)
+
+    def migrate_all(self, migrate):
+        """Run `migrate(db_path)` against every shard, one shard at a time"""
+        for tenant in self.tenants:
+            db_path = self.db_path(tenant)
+            shard_dir = os.path.dirname(db_path)
+            if shard_dir:
+                os.makedirs(shard_dir, exist_ok=True)
+            migrate(db_path)
+
+    def query_all(self, sql, params=()):
+        """Run one read query on every shard in parallel and stack the results.
+
+        The result has `tenant` and `tenant_name` columns identifying the shard
+        each row came from; a shard that fails is reported in an `error` column
+        instead of failing the whole query.
+        """
+        def query_shard(tenant):
+            try:
+                conn = self.connect(tenant)
+                try:
+                    df = pd.read_sql_query(sql, conn, params=params)
+                finally:
+                    conn.close()
+                error = None
+            except (sqlite3.Error, pd.errors.DatabaseError) as e:
+                df = pd.DataFrame([{}])
+                error = str(e)
+            df.insert(0, "tenant_name", self.tenants[tenant]["name"])
+            df.insert(0, "tenant", tenant)
+            df["error"] = error
+            return df
+
+        workers = max(1, min(MAX_PARALLEL_SHARDS, len(self.tenants)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(query_shard, self.tenants))
+
+        return pd.concat(frames, ignore_index=True)
+
+_router = None
+
+def get_router():
+    """Process-wide tenant router"""
+    global _router
+    if _router is None:
+        _router = TenantRouter()
+    return _router
+
+def set_router(router):
+    """Replace the process-wide router (e.g. to point scripts at one database file)"""
+    global _router
+    _router = router
+
+def set_current_tenant(tenant):
+    """Route the rest of this CLI invocation or script to `tenant`"""
+    _current_tenant.set(tenant)
+
+def set_tenant_resolver(resolver):
+    """Resolve the current tenant with `resolver()` first (e.g. from the app session)"""
+    global _tenant_resolver
+    _tenant_resolver = resolver
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import database  # noqa: E402
+import tenants  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+@pytest.fixture
+def two_shards(tmp_path, monkeypatch):
+    """Two agencies on separate seeded shard files, routed through the process-wide router"""
+    monkeypatch.chdir(tmp_path)
+    shards = {
+        "masterflo": {"name": "MasterFLO.ai", "db_path": str(tmp_path / "masterflo.db")},
+        "north": {"name": "Dojo North Marketing", "db_path": str(tmp_path / "north.db")},
+    }
+    for shard in shards.values():
+        database.init_db(shard["db_path"])
+
+    monkeypatch.setattr(tenants, "_router", tenants.TenantRouter(shards))
+    monkeypatch.setattr(tenants, "_tenant_resolver", None)
+    return {tenant: shard["db_path"] for tenant, shard in shards.items()}
@@ -0,0 +1,57 @@
+import sqlite3
+
+import action_items
+import database
+
+MEMBERS = {"sarah johnson": "Sarah Johnson", "sarah": "Sarah Johnson",
+           "michael brown": "Michael Brown", "michael": "Michael Brown"}
+
+def parse_one(text):
+    items = action_items.parse_action_items(text, "2025-03-21", MEMBERS)
+    assert len(items) == 1
+    return items[0]
+
+def test_mention_followed_by_capitalized_word_keeps_the_word():
+    item = parse_one("@Sarah Review SEO strategy")
+    assert (item["owner"], item["description"]) == ("Sarah Johnson", "Review SEO strategy")
+
+def test_mention_of_unknown_person_keeps_the_next_word():
+    item = parse_one("@Dana Draft the Q2 plan")
+    assert (item["owner"], item["description"]) == ("Dana", "Draft the Q2 plan")
+
+def test_mention_of_full_member_name():
+    item = parse_one("Update creative @Michael Brown by 4/12")
+    assert (item["owner"], item["description"], item["due_date"]) == ("Michael Brown", "Update creative", "2025-04-12")
+
+def test_owner_prefix_suffix_and_checkbox():
+    items = action_items.parse_action_items("[x] Sarah: send report; Book venue (Michael) due 2025-04-05",
+                                            "2025-03-21", MEMBERS)
+    assert items == [
+        {"owner": "Sarah Johnson", "description": "send report", "due_date": None, "done": True},
+        {"owner": "Michael Brown", "description": "Book venue", "due_date": "2025-04-05", "done": False},
+    ]
+
+def test_resave_keeps_done_flag_and_promotion_is_once(tmp_path):
+    db_path = str(tmp_path / "items.db")
+    database.init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    meeting_id = conn.execute("SELECT id FROM meeting_notes ORDER BY id LIMIT 1").fetchone()[0]
+    action_items.sync_meeting(conn, meeting_id, "@Sarah Review SEO strategy; Book venue", "2025-03-21")
+    conn.commit()
+    conn.close()
+
+    items = action_items.get_action_items(db_path)
+    item_ids = items.loc[items["meeting_id"] == meeting_id, "id"].tolist()
+    assert action_items.promote_to_tasks(item_ids, db_path=db_path) == 2
+    assert action_items.promote_to_tasks(item_ids, db_path=db_path) == 0
+    action_items.set_done(item_ids[:1], db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    action_items.sync_meeting(conn, meeting_id, "@Sarah Review SEO strategy; Book venue; Order mats", "2025-03-21")
+    conn.commit()
+    conn.close()
+
+    items = action_items.get_action_items(db_path, include_done=True).set_index("description")
+    assert items.loc["Review SEO strategy", "done"] == 1
+    assert items.loc["Book venue", "task_id"] > 0
+    assert "Order mats" in items.index
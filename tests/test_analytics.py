@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import analytics
+import database
+
+pytest.importorskip("duckdb")
+
+@pytest.fixture
+def empty_shard(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_ENGINE", "auto")
+    db_path = str(tmp_path / "new-agency.db")
+    database.init_db(db_path, seed=False)
+    return db_path
+
+@pytest.mark.parametrize("name", sorted(analytics.REPORTS))
+def test_reports_run_on_duckdb_for_an_empty_shard(empty_shard, name, caplog):
+    df, engine = analytics.run_report(empty_shard, name)
+    assert engine == "duckdb"
+    assert df.empty or name == "campaign_totals"
+    assert not caplog.records
+
+def test_mirror_keeps_declared_types(empty_shard):
+    analytics.run_report(empty_shard, "roas_by_manager_month")
+    types = dict(analytics.get_mirror(empty_shard).con.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'campaigns'").fetchall())
+    assert types["last_review_date"] == "VARCHAR"
+    assert types["meta_ads_leads"] == "BIGINT"
+    assert types["meta_ads_spend"] == "DOUBLE"
+
+@pytest.mark.parametrize("name", sorted(analytics.REPORTS))
+def test_duckdb_matches_sqlite_on_seeded_data(tmp_path, name):
+    db_path = str(tmp_path / "seeded.db")
+    database.init_db(db_path)
+    sql, tables = analytics.REPORTS[name]
+
+    duck = analytics.get_mirror(db_path).query(sql, (), tables)
+    lite = analytics.query_sqlite(db_path, sql)
+    pd.testing.assert_frame_equal(duck, lite, check_dtype=False)
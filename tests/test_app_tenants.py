@@ -0,0 +1,99 @@
+"""The app writes to the agency selected in the session, including from
+on_change callbacks and fragment reruns, which run without main()."""
+import sqlite3
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import tenants
+from conftest import APP_PATH
+
+def fetch(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(sql, params).fetchone()
+    conn.close()
+    return row
+
+@pytest.fixture
+def north_app(two_shards):
+    at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+    at.sidebar.selectbox(key="tenant").set_value("north").run()
+    assert not at.exception
+    return at
+
+def test_kanban_status_change_writes_to_selected_shard(two_shards, north_app):
+    at = north_app
+    at.sidebar.radio[0].set_value("Team Tasks").run()
+
+    status = next(widget for widget in at.selectbox if widget.key and widget.key.startswith("task_status_1_"))
+    status.set_value("Done").run()
+
+    assert not at.exception
+    assert fetch(two_shards["north"], "SELECT status FROM tasks WHERE id = 1") == ("Done",)
+    assert fetch(two_shards["masterflo"], "SELECT status FROM tasks WHERE id = 1") == ("To Do",)
+
+def test_ghl_status_change_writes_to_selected_shard(two_shards, north_app):
+    at = north_app
+    at.sidebar.radio[0].set_value("Campaign Tracker").run()
+    before = fetch(two_shards["masterflo"], "SELECT ghl_status FROM campaigns WHERE id = 1")
+
+    ghl_status = next(widget for widget in at.selectbox if widget.key and widget.key.startswith("ghl_status_1_"))
+    new_status = next(status for status in ghl_status.options if status != ghl_status.value)
+    ghl_status.set_value(new_status).run()
+
+    assert not at.exception
+    assert fetch(two_shards["north"], "SELECT ghl_status FROM campaigns WHERE id = 1") == (new_status,)
+    assert fetch(two_shards["masterflo"], "SELECT ghl_status FROM campaigns WHERE id = 1") == before
+
+def test_team_search_reads_selected_shard(two_shards, north_app):
+    conn = sqlite3.connect(two_shards["north"])
+    conn.execute("INSERT INTO team_directory (name, role, skills) VALUES ('Nora North', 'Coach', 'Kicks')")
+    conn.commit()
+    conn.close()
+
+    at = north_app
+    at.sidebar.radio[0].set_value("Operations Hub").run()
+    at.text_input(key="team_search").set_value("Nora").run()
+
+    assert not at.exception
+    assert "Nora North - Coach" in [expander.label for expander in at.expander]
+
+def test_sop_save_writes_to_selected_shard(two_shards, north_app):
+    at = north_app
+    at.sidebar.radio[0].set_value("Operations Hub").run()
+    next(button for button in at.button if button.label == "Add New SOP").click().run()
+
+    next(widget for widget in at.text_input if widget.label == "SOP Name").set_value("North Onboarding")
+    next(widget for widget in at.text_area if widget.label == "Content").set_value("Step one.")
+    next(button for button in at.button if button.label == "Save SOP").click().run()
+
+    assert not at.exception
+    sql = "SELECT COUNT(*) FROM sops WHERE name = 'North Onboarding'"
+    assert fetch(two_shards["north"], sql) == (1,)
+    assert fetch(two_shards["masterflo"], sql) == (0,)
+
+@pytest.fixture
+def access_codes(two_shards):
+    router = tenants.get_router()
+    router.tenants["masterflo"]["access_code"] = "mf-secret"
+    router.tenants["north"]["access_code"] = "north-secret"
+    return router
+
+def test_locked_agencies_need_their_access_code(access_codes):
+    at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+    assert not at.exception
+    assert not at.sidebar.selectbox
+    assert "access code" in at.info[0].value
+
+    at.sidebar.text_input(key="access_code").set_value("wrong").run()
+    assert at.sidebar.error
+    assert not at.sidebar.selectbox
+
+    at.sidebar.text_input(key="access_code").set_value("north-secret").run()
+    assert not at.exception
+    assert at.sidebar.selectbox(key="tenant").options == ["Dojo North Marketing"]
+    assert "Agency Admin" not in at.sidebar.radio[0].options
+
+    at.sidebar.text_input(key="access_code").set_value("mf-secret").run()
+    assert at.sidebar.selectbox(key="tenant").options == ["MasterFLO.ai", "Dojo North Marketing"]
+    assert "Agency Admin" in at.sidebar.radio[0].options
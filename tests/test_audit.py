@@ -0,0 +1,35 @@
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import database
+import tenants
+
+@pytest.fixture
+def north(two_shards, monkeypatch):
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "north")
+    return two_shards["north"]
+
+def audit_entries(db_path, table, record_id):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+    SELECT action, changes FROM audit_log WHERE table_name = ? AND record_id = ? ORDER BY id
+    ''', (table, record_id)).fetchall()
+    conn.close()
+    return [(action, json.loads(changes)) for action, changes in rows]
+
+def test_import_over_an_existing_row_logs_one_update(north):
+    before = audit_entries(north, "campaigns", 1)
+    campaign = database.export_table("campaigns").set_index("id").loc[1]
+    new_status = "Issues" if campaign["ghl_status"] != "Issues" else "Active"
+
+    # Only ghl_status differs; the unchanged client_name must not be logged
+    database.import_rows("campaigns", pd.DataFrame({
+        "id": [1], "client_name": [campaign["client_name"]], "ghl_status": [new_status],
+    }))
+
+    assert audit_entries(north, "campaigns", 1)[len(before):] == [
+        ("update", {"ghl_status": [campaign["ghl_status"], new_status]}),
+    ]
@@ -0,0 +1,26 @@
+import re
+
+import client_reports
+import database
+
+def report_pages(db_path, month, output_dir):
+    results, index_path = client_reports.generate_reports(db_path, month, str(output_dir), workers=1)
+    pages = {r["client"]: open(r["path"], encoding="utf-8").read() for r in results}
+    return pages, open(index_path, encoding="utf-8").read()
+
+def test_reports_say_campaign_figures_are_not_monthly(tmp_path):
+    db_path = str(tmp_path / "reports.db")
+    database.init_db(db_path)
+
+    april, april_index = report_pages(db_path, "2025-04", tmp_path / "out")
+    may, _ = report_pages(db_path, "2025-05", tmp_path / "out")
+
+    def performance(page):
+        return re.search(r"<h2>Campaign Performance</h2>.*?</table>", page, re.S).group(0)
+
+    for client, page in april.items():
+        assert "not April 2025 alone" in page
+        assert "due date in April 2025" in page
+        # Same figures whichever month, apart from the month named in the note
+        assert performance(page).replace("April", "May") == performance(may[client])
+    assert "not figures for 2025-04 alone" in april_index
@@ -0,0 +1,90 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import analytics
+import assignment
+import database
+import tenants
+
+@pytest.fixture
+def north(two_shards, monkeypatch):
+    """Route every database call to the seeded north shard; returns its path"""
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "north")
+    return two_shards["north"]
+
+def fetch_one(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(sql, params).fetchone()
+    conn.close()
+    return row
+
+def test_updates_and_deletes_accept_numpy_ids(north):
+    # Ids read from a DataFrame row are numpy integers, which sqlite3 would bind as BLOBs
+    campaign = database.get_campaigns().iloc[0]
+    database.update_campaign(campaign["id"], campaign["client_name"], "Alex", "2025-01-01", "2025-02-01",
+                             1000.0, 2.0, 999, "", 500.0, 3.0, 10, "", "Active", "")
+
+    task_id = database.get_tasks()["id"].iloc[0]
+    database.delete_task(task_id)
+
+    assert fetch_one(north, "SELECT meta_ads_leads FROM campaigns WHERE id = ?", (int(campaign["id"]),))[0] == 999
+    assert fetch_one(north, "SELECT COUNT(*) FROM tasks WHERE id = ?", (int(task_id),))[0] == 0
+
+def test_import_of_some_columns_keeps_the_others(north):
+    before = fetch_one(north, "SELECT meta_ads_spend, meta_ads_leads, created_at FROM campaigns WHERE id = 1")
+
+    database.import_rows("campaigns", pd.DataFrame({"id": [1], "client_name": ["Renamed"], "ghl_status": ["Issues"]}))
+
+    after = fetch_one(north, "SELECT client_name, ghl_status, meta_ads_spend, meta_ads_leads, created_at "
+                             "FROM campaigns WHERE id = 1")
+    assert after == ("Renamed", "Issues", *before)
+
+def test_import_without_ids_adds_rows(north):
+    count = fetch_one(north, "SELECT COUNT(*) FROM clients")[0]
+    database.import_rows("clients", pd.DataFrame({"name": ["New Client A", "New Client B"]}))
+    assert fetch_one(north, "SELECT COUNT(*) FROM clients")[0] == count + 2
+
+def assignee_load(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+    SELECT member, task_type, due_day, open_tasks, ROUND(open_hours, 6), done_tasks
+    FROM assignee_load
+    ORDER BY 1, 2, 3
+    ''').fetchall()
+    conn.close()
+    return rows
+
+def test_assignee_load_triggers_match_a_rebuild(north):
+    database.import_rows("tasks", database.export_table("tasks"))
+    task_ids = database.get_tasks()["id"].tolist()
+    database.bulk_patch("tasks", task_ids[:2], status="Done")
+    database.bulk_patch("tasks", task_ids[2:4], assigned_to="John Smith", estimated_hours=7.5)
+    database.save_grid_changes(
+        "tasks",
+        inserted=[{"title": "Grid task", "assigned_to": "Michael Brown", "status": "To Do",
+                   "estimated_hours": 4.0, "due_date": "2025-05-01", "task_type": "Content"}],
+        updated={int(task_ids[3]): {"status": "Done"}, int(task_ids[4]): {"assigned_to": "Sarah Johnson"}},
+        deleted=[int(task_ids[5])],
+    )
+
+    maintained = assignee_load(north)
+    assignment.rebuild(north)
+    assert maintained == assignee_load(north)
+
+@pytest.mark.parametrize("engine", ["auto", "sqlite"])
+def test_other_clients_bucket_never_shares_a_client_name(north, monkeypatch, engine):
+    monkeypatch.setattr(analytics, "ANALYTICS_ENGINE", engine)
+    conn = sqlite3.connect(north)
+    conn.executemany("INSERT INTO campaigns (client_name, meta_ads_leads) VALUES (?, ?)",
+                     [("Other", 900), (database.OTHER_CLIENTS_LABEL, 800)])
+    conn.commit()
+    conn.close()
+
+    leads = database.get_leads_by_client(top_n=2)
+
+    assert leads["client_name"].tolist() == ["Other", database.OTHER_CLIENTS_LABEL,
+                                             f"{database.OTHER_CLIENTS_LABEL} (2)"]
+    assert leads["is_other"].tolist() == [False, False, True]
+    assert leads["client_count"].iloc[-1] == len(database.get_other_clients_leads(top_n=2))
@@ -0,0 +1,132 @@
+"""Grid edits (to_grid_frame / diff_grid / save_grid_changes) and bulk_patch."""
+import sqlite3
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import database
+import tenants
+
+@pytest.fixture
+def north(two_shards, monkeypatch):
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "north")
+    return two_shards["north"]
+
+@pytest.fixture
+def statements(north, monkeypatch):
+    """Record every executemany the database layer makes, as (sql, row count)"""
+    calls = []
+
+    class RecordingConnection(sqlite3.Connection):
+        def executemany(self, sql, rows):
+            rows = list(rows)
+            calls.append((" ".join(sql.split()), len(rows)))
+            return super().executemany(sql, rows)
+
+    monkeypatch.setattr(database, "get_connection", lambda: sqlite3.connect(north, factory=RecordingConnection))
+    return calls
+
+def table_rows(db_path, table):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+def campaigns_grid():
+    return database.to_grid_frame(database.get_campaigns(), "campaigns")
+
+def test_missing_values_are_not_changes(north):
+    database.patch_record("campaigns", 1, meta_ads_notes=None, meta_ads_leads=None, last_review_date=None)
+    original = campaigns_grid()
+    edited = original.copy()
+    # The editor hands missing cells back as NaN / pd.NA rather than None
+    first = edited.index[edited["id"] == 1][0]
+    edited.loc[first, "meta_ads_notes"] = np.nan
+    edited.loc[first, "last_review_date"] = pd.NaT
+
+    assert database.diff_grid(original, edited, "campaigns") == ([], {}, [])
+
+def test_integer_and_date_edits_round_trip(north):
+    original = campaigns_grid()
+    assert str(original["meta_ads_leads"].dtype) == "Int64"
+    edited = original.copy()
+    first = edited.index[edited["id"] == 1][0]
+    edited.loc[first, "meta_ads_leads"] = 41
+    edited.loc[first, "last_review_date"] = date(2025, 3, 14)
+
+    inserted, updated, deleted = database.diff_grid(original, edited, "campaigns")
+    assert (inserted, deleted) == ([], [])
+    assert updated == {1: {"meta_ads_leads": 41, "last_review_date": date(2025, 3, 14)}}
+    database.save_grid_changes("campaigns", inserted, updated, deleted)
+
+    conn = sqlite3.connect(north)
+    stored = conn.execute("SELECT meta_ads_leads, typeof(meta_ads_leads), last_review_date FROM campaigns WHERE id = 1").fetchone()
+    conn.close()
+    assert stored == (41, "integer", "2025-03-14")
+
+    reloaded = campaigns_grid().set_index("id")
+    assert reloaded.at[1, "meta_ads_leads"] == 41
+    assert reloaded.at[1, "last_review_date"] == date(2025, 3, 14)
+    assert database.diff_grid(campaigns_grid(), campaigns_grid(), "campaigns") == ([], {}, [])
+
+def test_edits_are_batched_by_column_set(north, statements):
+    tasks = database.to_grid_frame(database.get_tasks(), "tasks")
+    ids = tasks["id"].tolist()
+    edited = tasks[tasks["id"] != ids[0]].copy()
+    edited.loc[edited["id"] == ids[1], "status"] = "Done"
+    edited.loc[edited["id"] == ids[2], "status"] = "Review"
+    edited.loc[edited["id"] == ids[3], ["priority", "status"]] = ["Urgent", "Done"]
+    new_rows = pd.DataFrame({"id": [pd.NA, pd.NA], "title": ["First new task", "Second new task"],
+                             "status": ["To Do", "To Do"]})
+    edited = pd.concat([edited, new_rows], ignore_index=True)
+
+    inserted, updated, deleted = database.diff_grid(tasks, edited, "tasks")
+    assert database.save_grid_changes("tasks", inserted, updated, deleted) == (2, 3, 1)
+
+    assert sorted(statements) == sorted([
+        ("INSERT INTO tasks (status, title) VALUES (?, ?)", 2),
+        ("UPDATE tasks SET status = ? WHERE id = ?", 2),
+        ("UPDATE tasks SET priority = ?, status = ? WHERE id = ?", 1),
+        ("DELETE FROM tasks WHERE id = ?", 1),
+    ])
+    saved = database.export_table("tasks").set_index("id")
+    assert ids[0] not in saved.index
+    assert saved.loc[[ids[1], ids[2], ids[3]], "status"].tolist() == ["Done", "Review", "Done"]
+    assert saved.at[ids[3], "priority"] == "Urgent"
+    assert {"First new task", "Second new task"} <= set(saved["title"])
+
+def test_invalid_edit_writes_nothing(north):
+    before = {table: table_rows(north, table) for table in ("tasks", "audit_log")}
+    tasks = database.to_grid_frame(database.get_tasks(), "tasks")
+    ids = tasks["id"].tolist()
+
+    with pytest.raises(ValueError, match="isn't a valid status"):
+        database.save_grid_changes(
+            "tasks",
+            inserted=[{"title": "Would be added", "status": "To Do"}],
+            updated={ids[0]: {"priority": "High"}, ids[1]: {"status": "Someday"}},
+            deleted=[ids[2]],
+        )
+    with pytest.raises(ValueError, match="title can't be empty"):
+        database.save_grid_changes("tasks", [{"status": "To Do"}], {}, [])
+
+    assert {table: table_rows(north, table) for table in before} == before
+
+def test_bulk_patch_rejects_values_outside_the_field_choices(north):
+    before = table_rows(north, "tasks")
+    with pytest.raises(ValueError, match="Unknown status"):
+        database.bulk_patch("tasks", [1, 2], status="Someday")
+    with pytest.raises(ValueError, match="Cannot patch"):
+        database.bulk_patch("tasks", [1], id=5)
+    assert table_rows(north, "tasks") == before
+
+def test_bulk_patch_returns_the_records_changed(north):
+    assert database.bulk_patch("tasks", [1, np.int64(2), 9999], status="Done", priority="Low") == 2
+    assert database.patch_record("tasks", 9999, status="Done") is False
+
+    conn = sqlite3.connect(north)
+    patched = conn.execute("SELECT id, status, priority FROM tasks WHERE id IN (1, 2) ORDER BY id").fetchall()
+    conn.close()
+    assert patched == [(1, "Done", "Low"), (2, "Done", "Low")]
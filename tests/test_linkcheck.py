@@ -0,0 +1,122 @@
+"""Link checks against a local stand-in HTTP server on an ephemeral port."""
+import asyncio
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import database
+import linkcheck
+
+PAGE = b"x" * 2048
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(2)
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(params=["aiohttp", "urllib"])
+def fetcher(request, monkeypatch):
+    """Run a test with the pooled aiohttp client and again with the urllib fallback"""
+    if request.param == "aiohttp":
+        pytest.importorskip("aiohttp")
+    else:
+        monkeypatch.setattr(linkcheck, "aiohttp", None)
+    return request.param
+
+@pytest.fixture(autouse=True)
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(linkcheck, "CONNECT_TIMEOUT", 0.5)
+    monkeypatch.setattr(linkcheck, "REQUEST_TIMEOUT", 1)
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def check(*urls):
+    return {result["url"]: result for result in asyncio.run(linkcheck.check_urls(list(urls)))}
+
+def test_ok_page_records_status_timing_and_size(server, fetcher):
+    result = check(f"{server}/ok")[f"{server}/ok"]
+    assert (result["status"], result["ok"], result["page_bytes"], result["error"]) == (200, 1, len(PAGE), None)
+    assert result["ttfb_ms"] >= 0
+
+def test_missing_page_is_broken(server, fetcher):
+    result = check(f"{server}/missing")[f"{server}/missing"]
+    assert (result["status"], result["ok"]) == (404, 0)
+
+def test_slow_page_times_out(server, fetcher):
+    result = check(f"{server}/slow")[f"{server}/slow"]
+    assert result["ok"] == 0
+    assert "timed out" in result["error"].lower()
+
+def test_refused_connection_is_broken(fetcher):
+    url = f"http://127.0.0.1:{closed_port()}/"
+    result = check(url)[url]
+    assert (result["status"], result["ok"]) == (None, 0)
+    assert result["error"]
+
+def test_malformed_url_fails_alone(server, fetcher):
+    bad = f"http://127.0.0.1:{closed_port()}/a b"
+    results = check(bad, f"{server}/ok")
+    assert results[bad]["ok"] == 0 and results[bad]["error"]
+    assert results[f"{server}/ok"]["ok"] == 1
+
+def test_run_checks_records_every_url(server, fetcher, tmp_path):
+    db_path = str(tmp_path / "links.db")
+    database.init_db(db_path, seed=False)
+    urls = [f"{server}/ok", f"{server}/missing", "http://127.0.0.1:9/a b", "http://[::1/"]
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO quick_links (name, category, url) VALUES ('Link', 'Other', ?)", [(u,) for u in urls])
+    conn.commit()
+    conn.close()
+
+    result = linkcheck.run_checks(db_path)
+
+    assert (result["checked"], result["broken"]) == (3, 2)
+    checks = linkcheck.get_link_checks(db_path).set_index("url")
+    assert checks.loc[f"{server}/ok", "status"] == 200
+    assert checks.loc["http://127.0.0.1:9/a b", "error"]
+
+def test_scheduler_survives_failed_runs(monkeypatch, tmp_path):
+    calls = []
+    parked = threading.Event()
+
+    def failing_run(db_path):
+        calls.append(db_path)
+        if len(calls) >= 2:
+            # Park the daemon thread once the test has seen enough
+            parked.wait()
+        raise ValueError("boom")
+
+    monkeypatch.setattr(linkcheck, "run_checks", failing_run)
+    linkcheck.start_scheduler(str(tmp_path / "unused.db"), interval_minutes=0.001)
+
+    deadline = time.time() + 5
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    assert len(calls) >= 2
@@ -0,0 +1,48 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import archive
+import audit
+import backup
+
+# Module, the job its scheduler runs, and the keyword for a short interval
+SCHEDULERS = [
+    (archive, "run_archival", {"interval_hours": 1e-5}),
+    (audit, "compact", {"interval_hours": 1e-5}),
+    (backup, "create_snapshot", {"interval_hours": 1e-5, "backup_dir": "unused-backups"}),
+]
+
+@pytest.mark.parametrize("module, job, interval", SCHEDULERS, ids=lambda s: getattr(s, "__name__", None))
+def test_scheduler_logs_failures_and_keeps_running(module, job, interval, monkeypatch, tmp_path, caplog):
+    calls = []
+    parked = threading.Event()
+
+    def failing_job(db_path, *args):
+        calls.append(db_path)
+        if len(calls) >= 2:
+            # Park the daemon thread once the test has seen enough
+            parked.wait()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(module, job, failing_job)
+    module.start_scheduler(str(tmp_path / "unused.db"), **interval)
+
+    deadline = time.time() + 5
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    assert len(calls) >= 2
+    assert any(record.name == module.__name__ and record.exc_info for record in caplog.records)
+
+def test_first_backup_is_due_from_the_newest_snapshot(tmp_path):
+    db_path = str(tmp_path / "agency.db")
+    backup_dir = str(tmp_path / "backups")
+    now = datetime(2025, 4, 1, 12, 0)
+    assert backup.next_snapshot_delay(db_path, backup_dir, interval_hours=6, now=now) == 0
+
+    backup.create_snapshot(db_path, backup_dir, now=now - timedelta(hours=2))
+    assert backup.next_snapshot_delay(db_path, backup_dir, interval_hours=6, now=now) == 4 * 3600
+
+    assert backup.next_snapshot_delay(db_path, backup_dir, interval_hours=1, now=now) == 0
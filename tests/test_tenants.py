@@ -0,0 +1,51 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import database
+import tenants
+
+def test_multi_tenant_router_without_a_tenant_raises(two_shards):
+    with pytest.raises(tenants.NoTenantError):
+        tenants.get_router().db_path()
+
+def test_single_tenant_router_falls_back_to_default(tmp_path):
+    router = tenants.TenantRouter({"solo": {"name": "Solo", "db_path": str(tmp_path / "solo.db")}})
+    assert router.current_tenant() == "solo"
+
+def test_resolver_selects_tenant(two_shards, monkeypatch):
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "north")
+    assert tenants.get_router().db_path() == two_shards["north"]
+
+def test_unknown_tenant_raises(two_shards, monkeypatch):
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "south")
+    with pytest.raises(KeyError):
+        tenants.get_router().current_tenant()
+
+def test_migrating_shards_does_not_seed_sample_data(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "new-agency.db")
+    monkeypatch.setattr(tenants, "_router", tenants.TenantRouter({"new": {"name": "New", "db_path": db_path}}))
+
+    database.migrate_all_shards()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0] == 0
+    conn.close()
+
+def test_resolver_routes_threads_that_never_set_the_context(two_shards, monkeypatch):
+    # Streamlit runs callbacks and fragment reruns on fresh threads
+    monkeypatch.setattr(tenants, "_tenant_resolver", lambda: "north")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(lambda: tenants.get_router().db_path()).result() == two_shards["north"]
+
+def test_access_codes_select_tenants(tmp_path):
+    router = tenants.TenantRouter({
+        "open": {"name": "Open", "db_path": str(tmp_path / "open.db")},
+        "north": {"name": "North", "db_path": str(tmp_path / "north.db"), "access_code": "n-code"},
+        "south": {"name": "South", "db_path": str(tmp_path / "south.db"), "access_code": "s-code"},
+    })
+    assert router.open_tenants() == ["open"]
+    assert router.tenants_for_code("n-code") == ["north"]
+    assert router.tenants_for_code("nope") == []
@@ -0,0 +1,116 @@
+"""Team capacity and workload analytics.
+
+Computes, from the tasks table:
+
+- committed vs. available hours per team member and week, where committed
+  hours are the remaining estimate (estimated minus actual) of open tasks
+  due that week;
+- estimate accuracy (actual / estimated hours) on completed tasks;
+- the overdue backlog of open tasks past their due date.
+
+Everything is a vectorized groupby over a narrow column projection, and
+results are cached per version of the tasks table (see table_versions), so
+repeated page loads cost a single version lookup.
+"""
+import sqlite3
+from datetime import date, timedelta
+from functools import lru_cache
+
+import pandas as pd
+
+# Hours each team member can take on per week
+WEEKLY_CAPACITY_HOURS = 40
+
+# Weeks shown in the capacity heatmap, starting with the current week
+HEATMAP_WEEKS = 8
+
+def get_tasks_version(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT version FROM table_versions WHERE table_name = 'tasks'").fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+def load_task_hours(db_path):
+    """Load only the columns the workload engine needs"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query('''
+    SELECT assigned_to, due_date, status, estimated_hours, actual_hours
+    FROM tasks
+    WHERE assigned_to IS NOT NULL
+    ''', conn)
+    conn.close()
+    return df
+
+def week_start(dates):
+    """Monday of the week each date falls in"""
+    return (dates - pd.to_timedelta(dates.dt.dayofweek, unit="D")).dt.normalize()
+
+def compute_workload(tasks, today, capacity=WEEKLY_CAPACITY_HOURS):
+    """Return {"weekly": ..., "accuracy": ..., "overdue": ...} frames for a tasks frame"""
+    today = pd.Timestamp(today)
+    member = tasks["assigned_to"]
+    estimated = pd.to_numeric(tasks["estimated_hours"], errors="coerce").fillna(0)
+    actual = pd.to_numeric(tasks["actual_hours"], errors="coerce").fillna(0)
+    due = pd.to_datetime(tasks["due_date"], format="ISO8601", errors="coerce")
+    is_open = tasks["status"].astype(str).ne("Done")
+    remaining = (estimated - actual).clip(lower=0)
+
+    # Committed vs. available hours per member and week
+    scheduled = is_open & due.notna()
+    weekly = (pd.DataFrame({"member": member, "week": week_start(due), "committed_hours": remaining})[scheduled]
+              .groupby(["member", "week"], observed=True)
+              .agg(committed_hours=("committed_hours", "sum"), open_tasks=("committed_hours", "size"))
+              .reset_index())
+    weekly["available_hours"] = capacity - weekly["committed_hours"]
+    weekly["utilization"] = weekly["committed_hours"] / capacity
+
+    # Estimate accuracy on completed tasks that recorded both numbers
+    measured = ~is_open & (estimated > 0) & (actual > 0)
+    accuracy = (pd.DataFrame({"member": member, "estimated_hours": estimated, "actual_hours": actual})[measured]
+                .groupby("member", observed=True)
+                .agg(completed_tasks=("estimated_hours", "size"),
+                     estimated_hours=("estimated_hours", "sum"),
+                     actual_hours=("actual_hours", "sum"))
+                .reset_index())
+    accuracy["accuracy"] = accuracy["actual_hours"] / accuracy["estimated_hours"]
+
+    # Overdue backlog
+    overdue_mask = is_open & (due < today)
+    overdue = (pd.DataFrame({"member": member, "remaining_hours": remaining, "due_date": due})[overdue_mask]
+               .groupby("member", observed=True)
+               .agg(overdue_tasks=("remaining_hours", "size"),
+                    remaining_hours=("remaining_hours", "sum"),
+                    oldest_due_date=("due_date", "min"))
+               .reset_index()
+               .sort_values("remaining_hours", ascending=False))
+    overdue["days_overdue"] = (today - overdue["oldest_due_date"]).dt.days
+
+    return {"weekly": weekly, "accuracy": accuracy, "overdue": overdue}
+
+@lru_cache(maxsize=32)
+def _cached_workload(db_path, tasks_version, today, capacity):
+    return compute_workload(load_task_hours(db_path), today, capacity)
+
+def get_workload(db_path, today=None, capacity=WEEKLY_CAPACITY_HOURS):
+    """Workload frames for a database, recomputed only when the tasks table changes.
+
+    The returned frames are shared between callers and must not be modified.
+    """
+    today = today or date.today()
+    return _cached_workload(db_path, get_tasks_version(db_path), today, capacity)
+
+def capacity_heatmap(weekly, members, start=None, weeks=HEATMAP_WEEKS):
+    """Pivot weekly utilization into a members x weeks grid (0 where nothing is due)"""
+    start = pd.Timestamp(start or date.today())
+    first_week = start - timedelta(days=start.weekday())
+    week_index = pd.date_range(first_week, periods=weeks, freq="7D")
+    members = sorted(set(members) | set(weekly["member"].astype(str)))
+
+    in_window = weekly[(weekly["week"] >= week_index[0]) & (weekly["week"] <= week_index[-1])]
+    in_window = in_window.assign(member=in_window["member"].astype(str))
+    grid = (in_window.pivot_table(index="member", columns="week", values="utilization",
+                                  aggfunc="sum", fill_value=0, observed=True)
+            .reindex(index=members, columns=week_index, fill_value=0))
+    grid.index = grid.index.astype(str)
+    grid.columns = [week.strftime("%b %d") for week in grid.columns]
+    return grid